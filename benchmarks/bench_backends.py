@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from argparse import SUPPRESS, ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'javalang'))
+
+from discovery import JavaFileDiscovery
+from parser_backends import BACKENDS, create_backend
+from synthetic_repo import generate_repository
+
+
+def setup_args():
+    parser = ArgumentParser(description='Compare parser backends on throughput and memory over the same corpus')
+    parser.add_argument('--path', help='Repository to parse (default: a generated synthetic repository).')
+    parser.add_argument('--plugins', type=int, default=200, help='Plugins in the generated repository.')
+    parser.add_argument('--backends', default=','.join(BACKENDS),
+                        help='Comma separated backends to compare (default: ' + ','.join(BACKENDS) + ').')
+    # Internal: measure one backend in this process
+    parser.add_argument('--child', metavar='BACKEND', help=SUPPRESS)
+    parser.add_argument('--table-dir', help=SUPPRESS)
+    return parser.parse_args()
+
+
+def max_rss_kib():
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss // 1024 if sys.platform == 'darwin' else max_rss
+
+
+def class_summary(java_class):
+    # Backend independent view of a parsed class, used to check that the backends agree
+    fields = []
+    for field in java_class.fields:
+        annotations = [(annotation.name, annotation.argument, annotation.error is not None)
+                       for annotation in field.annotations]
+        fields.append((field.type, field.names, field.modifiers, annotations))
+    return [java_class.kind, java_class.name, java_class.extends, java_class.implements, java_class.modifiers,
+            [(annotation.name, annotation.argument) for annotation in java_class.annotations], fields,
+            [class_summary(nested_class) for nested_class in java_class.classes]]
+
+
+def measure_backend(backend_name, path, table_dir):
+    # Runs in a child process so that every backend starts from the same memory baseline
+    java_files = JavaFileDiscovery().find_java_files(path)
+    contents = []
+    for java_file in java_files:
+        with open(java_file, 'rb') as source_file:
+            contents.append(source_file.read().decode('utf-8'))
+
+    backend = create_backend(backend_name, table_dir)
+    baseline_kib = max_rss_kib()
+
+    parsed = []
+    failures = 0
+    start_time = time.time()
+    for java_file, file_contents in zip(java_files, contents):
+        try:
+            parsed.append((java_file, backend.parse(java_file, file_contents)))
+        except Exception:
+            failures += 1
+    parse_seconds = time.time() - start_time
+
+    summaries = dict((java_file, [class_summary(java_class) for java_class in java_file_model.types])
+                     for java_file, java_file_model in parsed)
+    return {'backend': backend_name, 'tables': backend.tables or '-', 'files': len(java_files), 'failures': failures,
+            'startup_seconds': backend.startup_seconds,
+            'parse_seconds': parse_seconds, 'files_per_second': len(parsed) / parse_seconds if parse_seconds else 0.0,
+            'rss_growth_kib': max_rss_kib() - baseline_kib, 'max_rss_kib': max_rss_kib(), 'summaries': summaries}
+
+
+def run_child(backend_name, path, table_dir):
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--child', backend_name,
+                                      '--path', path, '--table-dir', table_dir])
+    return json.loads(output.decode('utf-8'))
+
+
+def main():
+    args = setup_args()
+    if args.child:
+        sys.stdout.write(json.dumps(measure_backend(args.child, args.path, args.table_dir)))
+        return
+
+    work_dir = tempfile.mkdtemp(prefix='plugin-parser-backends-')
+    path = args.path
+    if path is None:
+        path = os.path.join(work_dir, 'repo')
+        generate_repository(path, args.plugins)
+    try:
+        # Every backend runs twice against an empty table directory: once generating its tables, once loading them
+        results = []
+        for backend_name in args.backends.split(','):
+            table_dir = os.path.join(work_dir, 'tables-' + backend_name)
+            results += [run_child(backend_name, path, table_dir), run_child(backend_name, path, table_dir)]
+    finally:
+        shutil.rmtree(work_dir)
+
+    print('%-10s %-10s %8s %8s %12s %12s %10s %14s %12s' % ('backend', 'tables', 'files', 'failed', 'startup (s)',
+                                                            'parse (s)', 'files/s', 'rss growth MiB', 'max rss MiB'))
+    for result in results:
+        print('%-10s %-10s %8d %8d %12.3f %12.3f %10.1f %14.1f %12.1f' %
+              (result['backend'], result['tables'], result['files'], result['failures'], result['startup_seconds'],
+               result['parse_seconds'], result['files_per_second'], result['rss_growth_kib'] / 1024.0,
+               result['max_rss_kib'] / 1024.0))
+
+    # Files parsed by every backend must produce the same neutral model
+    reference = results[0]
+    for result in results[1:]:
+        common = set(reference['summaries']) & set(result['summaries'])
+        mismatches = sorted(java_file for java_file in common
+                            if reference['summaries'][java_file] != result['summaries'][java_file])
+        print(result['backend'] + ' vs ' + reference['backend'] + ': ' + str(len(mismatches)) + ' of ' +
+              str(len(common)) + ' files differ' + (' (first: ' + mismatches[0] + ')' if mismatches else ''))
+
+
+if __name__ == "__main__":
+    main()
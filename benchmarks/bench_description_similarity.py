@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import random
+import sys
+import time
+
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'javalang'))
+
+from description_similarity import DEFAULT_SIMILARITY_THRESHOLD, compare_descriptions, normalize_word, word_limit
+
+WORDS = ['the', 'name', 'of', 'table', 'field', 'schema', 'path', 'to', 'read', 'from', 'defaults', 'value', 'if',
+         'not', 'specified', 'list', 'key', 'format', 'output', 'input', 'records', 'dataset', 'column', 'when']
+
+
+def setup_args():
+    parser = ArgumentParser(description='Check the banded description similarity against a full edit distance and ' +
+                                        'time it for growing description lengths')
+    parser.add_argument('--pairs', type=int, default=20000, help='Description pairs scored per length.')
+    parser.add_argument('--lengths', default='10,40,160', help='Comma-separated description lengths in words.')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_SIMILARITY_THRESHOLD,
+                        help='Similarity threshold the limit on the edit distance is derived from.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated descriptions.')
+    return parser.parse_args()
+
+
+def generate_pair(rng, word_count):
+    # A third each of descriptions with a few changed words, with a longer markdown text, and rewritten ones
+    plugin_words = [rng.choice(WORDS) for _ in range(word_count)]
+    markdown_words = list(plugin_words)
+    kind = rng.randint(0, 2)
+    if kind == 0:
+        for _ in range(rng.randint(1, 3)):
+            markdown_words[rng.randint(0, len(markdown_words) - 1)] = rng.choice(WORDS)
+    elif kind == 1:
+        markdown_words += [rng.choice(WORDS) for _ in range(rng.randint(1, word_count))]
+    else:
+        markdown_words = [rng.choice(WORDS) for _ in range(word_count)]
+    return ' '.join(plugin_words), ' '.join(markdown_words)
+
+
+def full_prefix_distance(source, target):
+    # Unbounded reference: the whole table, then the closest prefix of the target
+    previous = list(range(len(target) + 1))
+    for row_index in range(1, len(source) + 1):
+        row = [row_index]
+        for column in range(1, len(target) + 1):
+            row.append(min(previous[column] + 1, row[-1] + 1,
+                           previous[column - 1] + (source[row_index - 1] != target[column - 1])))
+        previous = row
+    return min(previous)
+
+
+def main():
+    args = setup_args()
+    rng = random.Random(args.seed)
+    mismatches = 0
+    print('%8s %12s %12s %10s' % ('words', 'banded (ms)', 'full (ms)', 'scored'))
+    for word_count in [int(length) for length in args.lengths.split(',')]:
+        pairs = [generate_pair(rng, word_count) for _ in range(args.pairs)]
+
+        start_time = time.time()
+        results = [compare_descriptions(plugin_description, markdown_description, args.threshold)
+                   for plugin_description, markdown_description in pairs]
+        banded_seconds = time.time() - start_time
+
+        # The reference is quadratic, so it only runs on a sample
+        sample = pairs[:max(1, args.pairs // 20)]
+        start_time = time.time()
+        expected = [full_prefix_distance([normalize_word(word) for word in plugin_description.split()],
+                                         [normalize_word(word) for word in markdown_description.split()])
+                    for plugin_description, markdown_description in sample]
+        full_seconds = (time.time() - start_time) * len(pairs) / len(sample)
+
+        limit = word_limit(word_count, args.threshold)
+        for distance, (similarity, word_diff) in zip(expected, results):
+            expected_similarity = 1.0 - float(distance) / word_count if distance <= limit else None
+            if similarity != expected_similarity:
+                mismatches += 1
+        print('%8d %12.1f %12.1f %10d' % (word_count, banded_seconds * 1000, full_seconds * 1000,
+                                          sum(1 for similarity, word_diff in results if similarity is not None)))
+    print('Parity mismatches: ' + str(mismatches))
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import random
+import sys
+import time
+
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'javalang'))
+
+from description_text import DescriptionNormalizer, render_text
+from markdown_properties import find_properties_section, parse_property_names_from_markdown
+
+WORDS = ['the', 'name', 'of', 'table', 'field', 'schema', 'path', 'to', 'read', 'from', 'defaults', 'e.g.', '1.',
+         'value', 'if', 'not', 'specified', '(optional)', 'comma-separated', 'list', 'key:value', '\'quoted\'']
+MARKUP = ['*emphasis*', '**strong**', '`code`', '[link](http://example.com)', 'a & b', '<b>html</b>', '_under_',
+          '\\*escaped\\*']
+
+
+def setup_args():
+    parser = ArgumentParser(description='Check parity and time the markdown description normaliser')
+    parser.add_argument('--files', type=int, default=200, help='Number of generated markdown documents.')
+    parser.add_argument('--properties', type=int, default=20, help='Properties per generated document.')
+    parser.add_argument('--markup-ratio', type=float, default=0.2,
+                        help='Fraction of descriptions that contain inline markup.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated documents.')
+    return parser.parse_args()
+
+
+def generate_description(rng, markup_ratio):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(3, 30))]
+    if rng.random() < markup_ratio:
+        words.insert(rng.randint(0, len(words)), rng.choice(MARKUP))
+    lines = [' '.join(words[index:index + 8]) for index in range(0, len(words), 8)]
+    return ' ' + '\n'.join(lines)
+
+
+def generate_document(rng, property_count, markup_ratio):
+    lines = ['Properties', '----------']
+    for index in range(property_count):
+        lines.append('**property' + str(index) + ':**' + generate_description(rng, markup_ratio))
+        lines.append('')
+    lines += ['Example', '-------']
+    return '\n'.join(lines)
+
+
+def main():
+    args = setup_args()
+    rng = random.Random(args.seed)
+    documents = [parse_property_names_from_markdown(find_properties_section(
+        generate_document(rng, args.properties, args.markup_ratio))[2]) for _ in range(args.files)]
+
+    # Previous behaviour: markdown() + BeautifulSoup for every property
+    start_time = time.time()
+    expected = [dict((name, render_text(description)) for name, description in properties.items())
+                for properties in documents]
+    render_seconds = time.time() - start_time
+
+    normalizer = DescriptionNormalizer()
+    start_time = time.time()
+    actual = [dict((name, normalizer.normalize(description)) for name, description in properties.items())
+              for properties in documents]
+    normalize_seconds = time.time() - start_time
+
+    mismatches = sum(1 for expected_properties, actual_properties in zip(expected, actual)
+                     for name in expected_properties if expected_properties[name] != actual_properties[name])
+    print('Documents: ' + str(args.files) + ', properties per document: ' + str(args.properties))
+    print('Render per file:    %.3f ms' % (render_seconds * 1000 / args.files))
+    print('Normalise per file: %.3f ms (%d stripped, %d rendered)' %
+          (normalize_seconds * 1000 / args.files, normalizer.stripped, normalizer.rendered))
+    print('Parity mismatches:  ' + str(mismatches))
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
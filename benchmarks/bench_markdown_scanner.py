@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import sys
+import timeit
+
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'javalang'))
+
+from markdown_properties import find_properties_section, parse_property_names_from_markdown
+
+
+def setup_args():
+    parser = ArgumentParser(description='Benchmark the markdown property scanner on generated documents')
+    parser.add_argument('--sizes', default='500,1000,2000,4000,8000,16000',
+                        help='Comma separated property counts of the generated documents.')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing repetitions per size (best is reported).')
+    parser.add_argument('--legacy', action='store_true',
+                        help='Also time the previous re-slicing scanner for comparison.')
+    return parser.parse_args()
+
+
+def generate_document(property_count):
+    lines = ['# Generated Plugin', '', 'Properties', '----------']
+    for index in range(property_count):
+        lines.append('**property' + str(index) + ':** Description of *property* ' + str(index) +
+                     ' that spans\nmore than one line.')
+        lines.append('')
+    lines += ['Example', '-------', 'Nothing to see here.']
+    return '\n'.join(lines)
+
+
+def legacy_scan(properties_section):
+    # The scanner this benchmark replaced, which re-slices the section after every property
+    markdown_properties = {}
+    while properties_section and properties_section != '\n':
+        name_start_index = properties_section.find('**')
+        name_end_index = properties_section.find(':**')
+        if name_end_index == -1:
+            break
+        next_property_index = properties_section.find('\n\n')
+        markdown_properties[properties_section[name_start_index + 2:name_end_index]] = \
+            properties_section[name_end_index + 3:next_property_index]
+        properties_section = properties_section[next_property_index + 2:]
+    return markdown_properties
+
+
+def best_time(function, argument, repeat):
+    return min(timeit.repeat(lambda: function(argument), number=1, repeat=repeat))
+
+
+def main():
+    args = setup_args()
+    print('%10s %10s %12s %14s' % ('properties', 'bytes', 'scan (ms)', 'us/property') +
+          (' %12s' % 'legacy (ms)' if args.legacy else ''))
+    for property_count in [int(size) for size in args.sizes.split(',')]:
+        document = generate_document(property_count)
+        properties_section = find_properties_section(document)[2]
+        if len(parse_property_names_from_markdown(properties_section)) != property_count:
+            raise Exception('Scanner found the wrong number of properties for size ' + str(property_count))
+        seconds = best_time(parse_property_names_from_markdown, properties_section, args.repeat)
+        row = '%10d %10d %12.2f %14.3f' % (property_count, len(document), seconds * 1000,
+                                          seconds * 1000000 / property_count)
+        if args.legacy:
+            row += ' %12.2f' % (best_time(legacy_scan, properties_section, args.repeat) * 1000)
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
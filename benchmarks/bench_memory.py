@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from argparse import SUPPRESS, ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'javalang'))
+
+from synthetic_repo import generate_repository
+
+
+def setup_args():
+    parser = ArgumentParser(description='Measure the peak RSS of a validation run over a synthetic repository')
+    parser.add_argument('--path', help='Repository to validate (default: a generated synthetic repository).')
+    parser.add_argument('--plugins', type=int, default=10000, help='Plugins in the generated repository.')
+    parser.add_argument('--work-dir', help='Directory for the generated repository (default: a temporary one).')
+    # Internal: run the validator in this process and report its peak RSS
+    parser.add_argument('--child', action='store_true', help=SUPPRESS)
+    return parser.parse_args()
+
+
+def max_rss_kib():
+    # ru_maxrss is reported in KiB on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss // 1024 if sys.platform == 'darwin' else max_rss
+
+
+def measure(path):
+    import validate_plugin_docs as validator
+    from reporters import create_reporter
+
+    baseline_kib = max_rss_kib()
+    args = validator.setup_args(['--path', path, '--format', 'jsonl', '--output', os.devnull])
+    reporter = create_reporter(args.format, args.output)
+    start_time = time.time()
+    try:
+        validator.run_with_reporter(args, reporter)
+    finally:
+        reporter.close()
+    return {'seconds': time.time() - start_time, 'baseline_kib': baseline_kib, 'max_rss_kib': max_rss_kib()}
+
+
+def main():
+    args = setup_args()
+    if args.child:
+        # Statistics notes go to stderr and are not needed here
+        sys.stderr = open(os.devnull, 'w')
+        sys.stdout.write(json.dumps(measure(args.path)))
+        return
+
+    work_dir = None
+    path = args.path
+    if path is None:
+        work_dir = args.work_dir or tempfile.mkdtemp(prefix='plugin-parser-memory-')
+        path = os.path.join(work_dir, 'repo-' + str(args.plugins))
+        if not os.path.isdir(path):
+            generate_repository(path, args.plugins)
+    try:
+        output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--child', '--path', path])
+    finally:
+        if work_dir and not args.work_dir:
+            shutil.rmtree(work_dir)
+
+    result = json.loads(output.decode('utf-8'))
+    print('Validated "' + path + '" in %.1fs' % result['seconds'])
+    print('Peak RSS:        %8.1f MiB' % (result['max_rss_kib'] / 1024.0))
+    print('Growth over imports: %4.1f MiB' % ((result['max_rss_kib'] - result['baseline_kib']) / 1024.0))
+
+
+if __name__ == "__main__":
+    main()
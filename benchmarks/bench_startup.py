@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from argparse import ArgumentParser
+
+SCRIPT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'javalang')
+
+# Modules that only the stages needing them may import: parsers, markdown rendering, the --jobs pool, JUnit output
+# and --profile-dump
+DEFERRED_MODULES = ['javalang', 'plyj', 'markdown', 'bs4', 'BeautifulSoup', 'multiprocessing', 'xml', 'cProfile']
+
+IMPORT_TIME_LINE = re.compile(r'^import time:\s*(\d+) \|\s*(\d+) \|( *)(\S+)$')
+
+
+def setup_args():
+    parser = ArgumentParser(description='Measure the cold start of every entry point and fail when one of them '
+                                        'imports a module that is meant to load only when it is needed')
+    parser.add_argument('--runs', type=int, default=5, help='Runs per entry point; the fastest one is reported.')
+    parser.add_argument('--top', type=int, default=5, help='Slowest top-level imports listed per entry point.')
+    parser.add_argument('--max-ms', type=float,
+                        help='Fail when an entry point takes longer than this, interpreter start-up excluded.')
+    return parser.parse_args()
+
+
+def entry_points(empty_dir):
+    # (label, script, arguments): --help covers the imports and argument parsing of each tool, the run over an
+    # empty tree everything validate_plugin_docs.py does before it finds a file
+    return [
+        ('validate_plugin_docs (empty tree)', 'validate_plugin_docs.py', ['--path', empty_dir]),
+        ('validate_plugin_docs --help', 'validate_plugin_docs.py', ['--help']),
+        ('validate_markdown --help', 'validate_markdown.py', ['--help']),
+        ('print_fields --help', 'print_fields.py', ['--help']),
+        ('merge_shard_reports --help', 'merge_shard_reports.py', ['--help']),
+        ('plugin_docs_client --help', 'plugin_docs_client.py', ['--help']),
+    ]
+
+
+def child_environment():
+    # Cold start as installed tools see it: bytecode cached, so the sources are not compiled again on every run
+    environment = dict(os.environ)
+    environment.pop('PYTHONDONTWRITEBYTECODE', None)
+    return environment
+
+
+def run(command, environment):
+    with open(os.devnull, 'w') as devnull:
+        start_time = time.time()
+        subprocess.call(command, stdout=devnull, stderr=devnull, cwd=SCRIPT_DIR, env=environment)
+        return time.time() - start_time
+
+
+def fastest_run(command, environment, runs):
+    # The first run writes the bytecode and is not counted
+    run(command, environment)
+    return min(run(command, environment) for _ in range(runs))
+
+
+def import_times(command, environment):
+    # [(module, self us, cumulative us, depth)] in the order -X importtime reports them
+    process = subprocess.Popen(command[:1] + ['-X', 'importtime'] + command[1:], stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, cwd=SCRIPT_DIR, env=environment)
+    output, errors = process.communicate()
+    imports = []
+    for line in errors.decode('utf-8').splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if match:
+            imports.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return imports
+
+
+def main():
+    args = setup_args()
+    if sys.version_info < (3, 7):
+        sys.exit('bench_startup.py needs Python 3.7 or later for -X importtime')
+
+    environment = child_environment()
+    interpreter_seconds = fastest_run([sys.executable, '-c', 'pass'], environment, args.runs)
+    interpreter_modules = set(module for module, self_us, cumulative_us, depth
+                              in import_times([sys.executable, '-c', 'pass'], environment))
+    print('Interpreter start-up: %.1f ms (excluded below)' % (interpreter_seconds * 1000))
+
+    failures = []
+    empty_dir = tempfile.mkdtemp(prefix='plugin-parser-startup-')
+    try:
+        for label, script, script_args in entry_points(empty_dir):
+            command = [sys.executable, script] + script_args
+            milliseconds = (fastest_run(command, environment, args.runs) - interpreter_seconds) * 1000
+            imports = [entry for entry in import_times(command, environment) if entry[0] not in interpreter_modules]
+            top_level = sorted((entry for entry in imports if entry[3] == 0), key=lambda entry: -entry[2])
+            print('')
+            print('%-36s %8.1f ms, %d modules imported in %.1f ms' %
+                  (label, milliseconds, len(imports), sum(entry[2] for entry in top_level) / 1000.0))
+            for module, self_us, cumulative_us, depth in top_level[:args.top]:
+                print('    %-32s %8.1f ms' % (module, cumulative_us / 1000.0))
+
+            deferred = sorted(set(module for module, self_us, cumulative_us, depth in imports
+                                  if module.split('.')[0] in DEFERRED_MODULES))
+            if deferred:
+                failures.append(label + ' imports ' + ', '.join(deferred) + ' at start-up')
+            if args.max_ms is not None and milliseconds > args.max_ms:
+                failures.append(label + ' took %.1f ms, more than --max-ms %.1f' % (milliseconds, args.max_ms))
+    finally:
+        shutil.rmtree(empty_dir)
+
+    print('')
+    for failure in failures:
+        print('FAIL: ' + failure)
+    if failures:
+        sys.exit(1)
+    print('No deferred module imported at start-up.')
+
+
+if __name__ == "__main__":
+    main()
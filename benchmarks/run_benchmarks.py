@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'javalang'))
+
+import javalang
+import validate_plugin_docs as validator
+
+from class_index import ClassIndex
+from discovery import JavaFileDiscovery
+from markdown_properties import find_properties_section, parse_property_names_from_markdown
+from parser_backends import BACKENDS, DEFAULT_BACKEND, create_backend
+from plugin_model import FileModel, merge_config_layers
+from reporters import Reporter
+from synthetic_repo import generate_repository
+
+STAGES = ['discovery', 'java_parse', 'extraction', 'markdown_parse', 'comparison', 'end_to_end']
+
+
+def setup_args():
+    parser = ArgumentParser(description='Benchmark validate_plugin_docs on synthetic plugin repositories')
+    parser.add_argument('--sizes', default='100,1000,10000', help='Comma separated plugin counts to benchmark.')
+    parser.add_argument('--properties', type=int, default=8, help='Config properties per generated plugin.')
+    parser.add_argument('--output', default='benchmark-results.json',
+                        help='JSON file the results are appended to (default: benchmark-results.json).')
+    parser.add_argument('--work-dir', help='Directory for the generated repositories (default: a temporary one).')
+    parser.add_argument('--keep', action='store_true', help='Keep the generated repositories.')
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help='Java parser backend to benchmark (default: ' + DEFAULT_BACKEND + ').')
+    return parser.parse_args()
+
+
+class CountingReporter(Reporter):
+    # Discards output but keeps the plugin context report_notice needs
+
+    def __init__(self):
+        Reporter.__init__(self, None)
+        self.findings = 0
+
+    def finding(self, finding):
+        self.findings += 1
+
+    def note(self, text):
+        pass
+
+    def close(self):
+        pass
+
+
+def benchmark_stages(path, backend_name):
+    timings = dict((stage, 0.0) for stage in STAGES)
+
+    start_time = time.time()
+    java_files = JavaFileDiscovery().find_java_files(path)
+    timings['discovery'] = time.time() - start_time
+
+    backend = create_backend(backend_name)
+    trees = []
+    start_time = time.time()
+    for plugin_path in java_files:
+        trees.append((plugin_path, validator.parse_file(plugin_path, os.path.basename(plugin_path), backend)))
+    timings['java_parse'] = time.time() - start_time
+
+    plugins = []
+    start_time = time.time()
+    file_models = []
+    class_index = ClassIndex()
+    for plugin_path, tree in trees:
+        class_records = []
+        for type_declaration in tree.types:
+            validator.get_class_records(type_declaration, class_records)
+        constants = validator.get_file_constants(tree)
+        class_index.add_file(plugin_path, class_records, constants)
+        file_models.append((plugin_path, FileModel(class_records, validator.get_plugin(tree.types[0]), constants)))
+    for plugin_path, file_model in file_models:
+        plugin_model = validator.resolve_plugin(plugin_path, file_model, class_index)
+        if plugin_model is not None:
+            plugins.append((plugin_path, plugin_model['class_name'], plugin_model['plugin_properties'],
+                            merge_config_layers(plugin_model['config_layers'])))
+    timings['extraction'] = time.time() - start_time
+    del trees
+
+    documented = []
+    start_time = time.time()
+    for plugin_path, class_name, plugin_properties, config_properties in plugins:
+        markdown_file_path = validator.find_markdown_file(plugin_path, plugin_properties)
+        try:
+            with open(markdown_file_path, 'r') as markdown_file:
+                properties_section = find_properties_section(markdown_file.read())[2]
+        except IOError:
+            continue
+        documented.append((plugin_path, class_name, plugin_properties, config_properties, markdown_file_path,
+                           parse_property_names_from_markdown(properties_section)))
+    timings['markdown_parse'] = time.time() - start_time
+
+    args = validator.setup_args(['--path', path, '--backend', backend_name])
+    reporter = CountingReporter()
+    start_time = time.time()
+    for plugin_path, class_name, plugin_properties, config_properties, markdown_file_path, markdown_properties \
+            in documented:
+        class_filename = os.path.basename(plugin_path)
+        markdown_filename = os.path.basename(markdown_file_path)
+        reporter.begin_plugin(plugin_path, class_name, plugin_properties['name'], plugin_properties['type'],
+                              markdown_file_path)
+        validator.validate_properties_present(class_filename, markdown_filename, config_properties,
+                                              markdown_properties, args, reporter)
+        validator.validate_descriptions_match(class_filename, markdown_filename, config_properties,
+                                              markdown_properties, args, reporter)
+        reporter.end_plugin()
+    timings['comparison'] = time.time() - start_time
+
+    reporter = CountingReporter()
+    start_time = time.time()
+    validator.run_with_reporter(args, reporter)
+    timings['end_to_end'] = time.time() - start_time
+
+    return timings, {'java_files': len(java_files), 'plugins': len(plugins), 'documented': len(documented),
+                     'findings': reporter.findings}
+
+
+def load_history(output_path):
+    if not os.path.exists(output_path):
+        return []
+    with open(output_path, 'r') as history_file:
+        return json.load(history_file)
+
+
+def main():
+    args = setup_args()
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix='plugin-parser-bench-')
+    run = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+           'backend': args.backend, 'javalang': javalang.__version__, 'results': []}
+    try:
+        for plugin_count in [int(size) for size in args.sizes.split(',')]:
+            repository_path = os.path.join(work_dir, 'repo-' + str(plugin_count))
+            if not os.path.isdir(repository_path):
+                generate_repository(repository_path, plugin_count, args.properties)
+            timings, counts = benchmark_stages(repository_path, args.backend)
+            run['results'].append({'size': plugin_count, 'counts': counts, 'seconds': timings})
+            print('%6d plugins: ' % plugin_count + ', '.join('%s %.3fs' % (stage, timings[stage]) for stage in STAGES))
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work_dir)
+
+    history = load_history(args.output)
+    history.append(run)
+    with open(args.output, 'w') as history_file:
+        json.dump(history, history_file, indent=2, sort_keys=True)
+    print('Results appended to "' + args.output + '".')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import random
+import sys
+
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'javalang'))
+
+from validate_plugin_docs import PLUGIN_TYPES
+
+# Distinct plugin types, each paired with the constant-style annotation argument that maps to it
+PLUGIN_TYPE_CONSTANTS = sorted((plugin_type, constant) for constant, plugin_type in PLUGIN_TYPES.items()
+                               if constant != plugin_type)
+PACKAGE = 'co.cask.hydrator.plugin'
+PLUGINS_PER_MODULE = 50
+WORDS = ['the', 'name', 'of', 'table', 'field', 'schema', 'path', 'to', 'read', 'from', 'defaults', 'value', 'if',
+         'not', 'specified', 'records', 'dataset', 'output', 'input', 'format', 'delimiter', 'key', 'timeout']
+
+
+def setup_args():
+    parser = ArgumentParser(description='Generate a synthetic Hydrator plugins repository')
+    parser.add_argument('--path', required=True, help='Directory to generate the repository in.')
+    parser.add_argument('--plugins', type=int, default=100, help='Number of plugins, spread over every plugin type.')
+    parser.add_argument('--properties', type=int, default=8, help='Config properties per plugin.')
+    parser.add_argument('--non-plugin-files', type=int, default=None,
+                        help='Number of utility and test classes (default: one per plugin).')
+    parser.add_argument('--mismatch-ratio', type=float, default=0.1,
+                        help='Fraction of documented properties whose markdown description differs.')
+    parser.add_argument('--undocumented-ratio', type=float, default=0.05,
+                        help='Fraction of plugins without a markdown file.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+    return parser.parse_args()
+
+
+def random_int(rng, low, high):
+    # randint() and choice() draw differently on Python 2 and 3 while random() does not, so building on random()
+    # generates the same repository from the same seed on both
+    return low + int(rng.random() * (high - low + 1))
+
+
+def sentence(rng, word_count):
+    return ' '.join(WORDS[random_int(rng, 0, len(WORDS) - 1)] for _ in range(word_count)).capitalize() + '.'
+
+
+def java_string_concatenation(text, rng):
+    # Split descriptions into concatenated literals the way long @Description values are written
+    pieces = []
+    while text:
+        split_index = min(len(text), random_int(rng, 10, 40))
+        pieces.append('"' + text[:split_index] + '"')
+        text = text[split_index:]
+    return ' +\n      '.join(pieces) if pieces else '""'
+
+
+def config_fields(rng, properties):
+    lines = []
+    for name, description in properties:
+        lines.append('    @Name("' + name + '")')
+        lines.append('    @Description(' + java_string_concatenation(description, rng) + ')')
+        lines.append('    @Nullable')
+        lines.append('    private String ' + name + ';')
+        lines.append('')
+    return lines
+
+
+def plugin_source(rng, class_name, plugin_name, type_argument, config_name, properties, standalone_config):
+    lines = ['package ' + PACKAGE + ';', '',
+             'import co.cask.cdap.api.annotation.Description;',
+             'import co.cask.cdap.api.annotation.Name;',
+             'import co.cask.cdap.api.annotation.Plugin;', '',
+             '/**', ' * Generated plugin ' + plugin_name + '.', ' */',
+             '@Plugin(type = ' + type_argument + ')',
+             '@Name("' + plugin_name + '")',
+             '@Description("' + sentence(rng, 6) + '")',
+             'public class ' + class_name + ' {',
+             '  private final ' + config_name + ' config;', '',
+             '  public ' + class_name + '(' + config_name + ' config) {',
+             '    this.config = config;',
+             '  }', '']
+    if not standalone_config:
+        lines.append('  public static class ' + config_name + ' extends PluginConfig {')
+        lines += config_fields(rng, properties)
+        lines.append('  }')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def config_source(rng, config_name, properties):
+    lines = ['package ' + PACKAGE + ';', '', 'public class ' + config_name + ' extends PluginConfig {']
+    lines += config_fields(rng, properties)
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def markdown_source(rng, plugin_name, properties, mismatch_ratio):
+    lines = ['# ' + plugin_name, '', 'Description', '-----------', sentence(rng, 10), '',
+             'Properties', '----------']
+    for name, description in properties:
+        if rng.random() < mismatch_ratio:
+            description = sentence(rng, 8)
+        lines.append('**' + name + ':** ' + description)
+        lines.append('')
+    lines += ['Example', '-------', 'This example uses the ' + plugin_name + ' plugin.', '']
+    return '\n'.join(lines)
+
+
+def non_plugin_source(class_name, is_test):
+    if is_test:
+        return ('package ' + PACKAGE + ';\n\npublic class ' + class_name + ' {\n  @Test\n  public void testIt() {\n' +
+                '    Assert.assertTrue(true);\n  }\n}\n')
+    return ('package ' + PACKAGE + ';\n\npublic final class ' + class_name + ' {\n  private ' + class_name +
+            '() {\n  }\n\n  public static String join(String a, String b) {\n    return a + b;\n  }\n}\n')
+
+
+def write_file(file_path, contents):
+    directory = os.path.dirname(file_path)
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(file_path, 'w') as output_file:
+        output_file.write(contents)
+
+
+def generate_repository(path, plugin_count, property_count=8, non_plugin_count=None, mismatch_ratio=0.1,
+                        undocumented_ratio=0.05, seed=0):
+    # Returns counts describing what was generated
+    rng = random.Random(seed)
+    if non_plugin_count is None:
+        non_plugin_count = plugin_count
+    package_path = PACKAGE.replace('.', '/')
+    counts = {'plugins': plugin_count, 'java_files': 0, 'markdown_files': 0, 'standalone_configs': 0}
+
+    for index in range(plugin_count):
+        module_path = os.path.join(path, 'module-' + str(index // PLUGINS_PER_MODULE))
+        source_path = os.path.join(module_path, 'src', 'main', 'java', package_path)
+        plugin_type, type_constant = PLUGIN_TYPE_CONSTANTS[index % len(PLUGIN_TYPE_CONSTANTS)]
+        type_argument = type_constant if index % 2 else '"' + plugin_type + '"'
+        plugin_name = 'Generated' + str(index)
+        class_name = plugin_name + plugin_type.capitalize()
+        config_name = class_name + 'Config'
+        properties = [('property' + str(number), sentence(rng, random_int(rng, 4, 20)))
+                      for number in range(property_count)]
+        standalone_config = index % 5 == 4
+
+        write_file(os.path.join(source_path, class_name + '.java'),
+                   plugin_source(rng, class_name, plugin_name, type_argument, config_name, properties,
+                                 standalone_config))
+        counts['java_files'] += 1
+        if standalone_config:
+            write_file(os.path.join(source_path, config_name + '.java'), config_source(rng, config_name, properties))
+            counts['java_files'] += 1
+            counts['standalone_configs'] += 1
+        if rng.random() >= undocumented_ratio:
+            write_file(os.path.join(module_path, 'docs', plugin_name + '-' + plugin_type + '.md'),
+                       markdown_source(rng, plugin_name, properties, mismatch_ratio))
+            counts['markdown_files'] += 1
+
+    module_count = max(1, (plugin_count + PLUGINS_PER_MODULE - 1) // PLUGINS_PER_MODULE)
+    for index in range(non_plugin_count):
+        module_path = os.path.join(path, 'module-' + str(index % module_count))
+        is_test = index % 2 == 1
+        class_name = ('Generated' + str(index) + 'Test') if is_test else ('Generated' + str(index) + 'Utils')
+        source_root = 'test' if is_test else 'main'
+        write_file(os.path.join(module_path, 'src', source_root, 'java', package_path, class_name + '.java'),
+                   non_plugin_source(class_name, is_test))
+        counts['java_files'] += 1
+    return counts
+
+
+def main():
+    args = setup_args()
+    counts = generate_repository(args.path, args.plugins, args.properties, args.non_plugin_files,
+                                 args.mismatch_ratio, args.undocumented_ratio, args.seed)
+    print('Generated ' + str(counts['plugins']) + ' plugins (' + str(counts['standalone_configs']) +
+          ' with standalone configs), ' + str(counts['java_files']) + ' Java files and ' +
+          str(counts['markdown_files']) + ' markdown files in "' + args.path + '".')
+
+
+if __name__ == "__main__":
+    main()
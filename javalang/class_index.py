@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+
+from constant_values import ConstantResolver, render_parts
+from parser_backends import simple_name
+
+TERMINAL_SUPERCLASS = 'PluginConfig'
+
+
+class ClassIndex(object):
+    # Project-wide map of class name -> declarations, built from the class records extracted from every Java file.
+    # Simple names are not unique across a repository, so lookups prefer the declaration closest to the referencing
+    # file: same file, then same package directory, then the longest shared path. String constants are indexed the
+    # same way, by the simple name of their class, to resolve references left over from the file they appear in.
+
+    def __init__(self):
+        self.classes = {}
+        self.constants = {}
+        self.files = {}
+        self.resolver = ConstantResolver(self.lookup_constant)
+
+    def add_file(self, file_path, class_records, class_constants=()):
+        self.files[file_path] = ([class_record.name for class_record in class_records],
+                                 [class_name for class_name, constants in class_constants])
+        for class_record in class_records:
+            self.classes.setdefault(class_record.name, []).append((file_path, class_record))
+        for class_name, constants in class_constants:
+            self.constants.setdefault(class_name, []).append((file_path, dict(constants)))
+        if class_constants:
+            self.resolver = ConstantResolver(self.lookup_constant)
+
+    def remove_file(self, file_path):
+        class_names, constant_class_names = self.files.pop(file_path, ([], []))
+        for names, index in ((class_names, self.classes), (constant_class_names, self.constants)):
+            for class_name in names:
+                candidates = [candidate for candidate in index[class_name] if candidate[0] != file_path]
+                if candidates:
+                    index[class_name] = candidates
+                else:
+                    del index[class_name]
+        if constant_class_names:
+            self.resolver = ConstantResolver(self.lookup_constant)
+
+    def lookup(self, class_name, from_path):
+        return closest(self.classes.get(class_name), from_path)
+
+    def lookup_constant(self, qualifier, member, from_path):
+        # Unqualified references were either resolved within their own file or name an inherited constant
+        if not qualifier:
+            return None
+        class_name = simple_name(qualifier)
+        file_path, constants = closest([candidate for candidate in self.constants.get(class_name, [])
+                                        if member in candidate[1]], from_path)
+        if constants is None:
+            return None
+        return (file_path, class_name, member), constants[member], file_path
+
+    def resolve_value(self, value, from_path, used_files):
+        # Annotation values still holding references are tuples of parts, anything else is final
+        if not isinstance(value, tuple):
+            return value
+        used = set()
+        parts = self.resolver.resolve(value, from_path, used)
+        used_files.update(key[0] for key in used)
+        return render_parts(parts)
+
+    def superclass_chain(self, class_name, from_path):
+        # Declarations from class_name up to, but excluding, PluginConfig or the first class outside the repository
+        chain = []
+        seen = set()
+        while class_name and class_name != TERMINAL_SUPERCLASS and class_name not in seen:
+            seen.add(class_name)
+            file_path, class_record = self.lookup(class_name, from_path)
+            if class_record is None:
+                break
+            chain.append((file_path, class_record))
+            class_name = class_record.extends
+            from_path = file_path
+        return chain
+
+    def is_config_class(self, class_name, from_path):
+        if class_name.endswith('Config'):
+            return True
+        chain = self.superclass_chain(class_name, from_path)
+        return bool(chain) and chain[-1][1].extends == TERMINAL_SUPERCLASS
+
+    def find_config_class(self, plugin, plugin_path):
+        # A nested config class wins, otherwise the first field whose type is a config class declared elsewhere
+        if plugin.config_class:
+            return plugin.config_class
+        for type_name in plugin.field_types:
+            if type_name in self.classes and self.is_config_class(type_name, plugin_path):
+                return type_name
+        return None
+
+    def config_layers(self, config_class, plugin_path):
+        # Fields inherited from base configs come first and are overridden by redeclarations in subclasses
+        chain = self.superclass_chain(config_class, plugin_path)
+        config_layers = []
+        used_files = set()
+        for file_path, class_record in reversed(chain):
+            config_layers.append(class_record.resolved_fields(
+                lambda value: self.resolve_value(value, file_path, used_files)))
+        config_files = [file_path for file_path, class_record in chain]
+        # Files declaring constants used by the properties count as config files too
+        return config_layers, config_files + sorted(used_files - set(config_files))
+
+
+def closest(candidates, from_path):
+    # (file path, item) of the candidate declared closest to from_path
+    if not candidates:
+        return None, None
+    if len(candidates) == 1:
+        return candidates[0]
+    from_directory = os.path.dirname(from_path)
+    return max(candidates, key=lambda candidate: (candidate[0] == from_path,
+                                                  os.path.dirname(candidate[0]) == from_directory,
+                                                  len(os.path.commonprefix([candidate[0], from_path]))))
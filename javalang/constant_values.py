@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Annotation arguments and String constants are evaluated to a tuple of parts: text, and (qualifier, member)
+# references to constants. References are replaced by the text of the constant they name, first with the constants
+# of the same file while converting it, then with the constants of the whole repository once the class index is
+# built. References that cannot be resolved are rendered as qualifier.member, like they always were.
+
+
+def is_resolved(parts):
+    return parts is None or not any(isinstance(part, tuple) for part in parts)
+
+
+def merge_parts(parts):
+    # Joins adjacent text so that a fully resolved value is a single string part
+    merged = []
+    for part in parts:
+        if not isinstance(part, tuple) and merged and not isinstance(merged[-1], tuple):
+            merged[-1] += part
+        else:
+            merged.append(part)
+    return tuple(merged)
+
+
+def render_parts(parts):
+    return ''.join(part[0] + '.' + part[1] if isinstance(part, tuple) else part for part in parts)
+
+
+def parts_to_state(value):
+    # Resolved values are stored as plain strings, the others as lists of strings and [qualifier, member] lists
+    if isinstance(value, tuple):
+        return [list(part) if isinstance(part, tuple) else part for part in value]
+    return value
+
+
+def parts_from_state(value):
+    if isinstance(value, list):
+        return tuple(tuple(part) if isinstance(part, list) else part for part in value)
+    return value
+
+
+def evaluate_expression(expression, expand):
+    # Evaluates an annotation or constant expression without recursing, so that concatenations of any length are
+    # fine. expand(expression) returns either ('text', text), ('reference', (qualifier, member)) or
+    # ('operands', [expressions]) for concatenations and element value pairs.
+    parts = []
+    pending = [expression]
+    while pending:
+        kind, value = expand(pending.pop())
+        if kind == 'operands':
+            pending.extend(reversed(value))
+        else:
+            parts.append(value)
+    return merge_parts(parts)
+
+
+class ConstantResolver(object):
+    # Replaces references by the values of the constants they name. lookup(qualifier, member, context) returns the
+    # (key, parts, context) of the constant a reference names, or None. Resolved constants are memoised by key, so a
+    # description fragment shared by many properties is expanded once; chains of constants are followed with an
+    # explicit stack and cycles are left unresolved.
+
+    def __init__(self, lookup):
+        self.lookup = lookup
+        self.values = {}
+        # Keys of the constants each memoised value was built from
+        self.dependencies = {}
+
+    def resolve(self, parts, context, used=None):
+        # Adds the keys of every constant the result was built from to used, when given
+        if is_resolved(parts):
+            return parts
+        resolved = []
+        stack = [(None, iter(parts), context, resolved, set())]
+        in_progress = set()
+        while stack:
+            key, remaining, context, output, dependencies = stack[-1]
+            for part in remaining:
+                if not isinstance(part, tuple):
+                    output.append(part)
+                    continue
+                target = self.lookup(part[0], part[1], context)
+                if target is None or target[0] in in_progress:
+                    output.append(part)
+                elif target[0] in self.values:
+                    output.extend(self.values[target[0]])
+                    dependencies.add(target[0])
+                    dependencies.update(self.dependencies[target[0]])
+                else:
+                    in_progress.add(target[0])
+                    stack.append((target[0], iter(target[1]), target[2], [], set()))
+                    break
+            else:
+                stack.pop()
+                if key is None:
+                    if used is not None:
+                        used.update(dependencies)
+                    continue
+                in_progress.discard(key)
+                self.values[key] = merge_parts(output)
+                self.dependencies[key] = frozenset(dependencies)
+                stack[-1][3].extend(self.values[key])
+                stack[-1][4].add(key)
+                stack[-1][4].update(dependencies)
+        return merge_parts(resolved)
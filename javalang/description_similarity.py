@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import math
+import string
+
+# A markdown description should begin with the @Description text, so the plugin description is compared in words
+# with the closest prefix of the markdown one. Only edit distances up to a limit are computed, on a band of the
+# dynamic programming table around its diagonal, so the cost grows with the length of the description times the
+# limit rather than with the product of both lengths, and the comparison stops as soon as a whole row exceeds it.
+
+# Threshold the limit on the edit distance is derived from when no other is given
+DEFAULT_SIMILARITY_THRESHOLD = 1.0
+# Smallest edit distance, in words, still scored and diffed when the threshold alone would allow less
+MIN_WORD_LIMIT = 8
+# Unchanged words kept around each change in a word diff
+DIFF_CONTEXT = 3
+
+
+def normalize_word(word):
+    return word.strip(string.punctuation).lower()
+
+
+def word_limit(word_count, threshold):
+    # Largest distance that can still score at or above the threshold, but at least MIN_WORD_LIMIT
+    return max(MIN_WORD_LIMIT, int(math.ceil((1.0 - threshold) * word_count)))
+
+
+def prefix_distance(source, target, limit, keep_rows=False):
+    # Edit distance between the source words and the closest prefix of the target words, as (distance, prefix
+    # length, rows), or None when it is over limit. Each row is (first column, distances) restricted to the band.
+    target = target[:len(source) + limit]
+    outside = limit + 1
+    previous_start, previous = 0, list(range(min(len(target), limit) + 1))
+    rows = [(previous_start, previous)] if keep_rows else None
+    for row_index in range(1, len(source) + 1):
+        source_word = source[row_index - 1]
+        start = max(0, row_index - limit)
+        end = min(len(target), row_index + limit)
+        if start > end:
+            return None
+        row = []
+        for column in range(start, end + 1):
+            previous_index = column - previous_start
+            # Dropping a source word
+            best = (previous[previous_index] if previous_index < len(previous) else outside) + 1
+            if column > start:
+                # Adding a target word
+                best = min(best, row[-1] + 1)
+            if column > 0 and 0 <= previous_index - 1 < len(previous):
+                best = min(best, previous[previous_index - 1] + (source_word != target[column - 1]))
+            row.append(min(best, outside))
+        if min(row) > limit:
+            return None
+        previous_start, previous = start, row
+        if keep_rows:
+            rows.append((start, row))
+    distance = min(previous)
+    if distance > limit:
+        return None
+    # The longest prefix among the closest ones, so that replaced words show as replaced rather than dropped
+    return distance, previous_start + len(previous) - 1 - previous[::-1].index(distance), rows
+
+
+def word_edits(source_words, target_words, source, target, prefix_length, rows):
+    # Walks the kept rows back from the end of the prefix into ('equal' | 'delete' | 'insert', word) edits
+    edits = []
+    row_index, column = len(source), prefix_length
+
+    def distance_at(row_at, column_at):
+        start, row = rows[row_at]
+        if start <= column_at < start + len(row):
+            return row[column_at - start]
+        return None
+
+    while row_index > 0 or column > 0:
+        current = distance_at(row_index, column)
+        if row_index > 0 and column > 0:
+            diagonal = distance_at(row_index - 1, column - 1)
+            if source[row_index - 1] == target[column - 1] and diagonal == current:
+                edits.append(('equal', target_words[column - 1]))
+                row_index -= 1
+                column -= 1
+                continue
+            if diagonal is not None and diagonal + 1 == current:
+                edits.append(('insert', target_words[column - 1]))
+                edits.append(('delete', source_words[row_index - 1]))
+                row_index -= 1
+                column -= 1
+                continue
+        if row_index > 0 and distance_at(row_index - 1, column) is not None and \
+                distance_at(row_index - 1, column) + 1 == current:
+            edits.append(('delete', source_words[row_index - 1]))
+            row_index -= 1
+        else:
+            edits.append(('insert', target_words[column - 1]))
+            column -= 1
+    edits.reverse()
+    return edits
+
+
+def format_word_diff(edits):
+    # git --word-diff style: [-removed-] {+added+}, with long unchanged runs shortened to their context
+    groups = []
+    for kind, word in edits:
+        if groups and groups[-1][0] == kind:
+            groups[-1][1].append(word)
+        else:
+            groups.append((kind, [word]))
+    parts = []
+    for index, (kind, words) in enumerate(groups):
+        if kind == 'delete':
+            parts.append('[-' + ' '.join(words) + '-]')
+        elif kind == 'insert':
+            parts.append('{+' + ' '.join(words) + '+}')
+        else:
+            if len(groups) == 1:
+                parts.append(' '.join(words))
+                continue
+            keep_before = DIFF_CONTEXT if index > 0 else 0
+            keep_after = DIFF_CONTEXT if index < len(groups) - 1 else 0
+            if len(words) > keep_before + keep_after + 1:
+                words = words[:keep_before] + ['...'] + (words[-keep_after:] if keep_after else [])
+            parts.append(' '.join(words))
+    return ' '.join(parts)
+
+
+def compare_descriptions(plugin_description, markdown_description, threshold=DEFAULT_SIMILARITY_THRESHOLD,
+                         with_diff=True):
+    # (similarity, word diff) of the plugin description against the start of the markdown one. The similarity is
+    # one minus the word distance over the number of plugin words, or None when the distance is over the limit.
+    plugin_words = plugin_description.split()
+    markdown_words = markdown_description.split()
+    limit = word_limit(len(plugin_words), threshold)
+    source = [normalize_word(word) for word in plugin_words]
+    target = [normalize_word(word) for word in markdown_words[:len(plugin_words) + limit]]
+    # Leading words in common are always part of a closest alignment, so only the rest goes through the table
+    common = 0
+    while common < len(source) and common < len(target) and source[common] == target[common]:
+        common += 1
+    result = prefix_distance(source[common:], target[common:], limit, with_diff)
+    if result is None:
+        return None, None
+    distance, prefix_length, rows = result
+    similarity = 1.0 - float(distance) / max(len(source), 1)
+    if not with_diff:
+        return similarity, None
+    edits = [('equal', word) for word in markdown_words[:common]]
+    edits += word_edits(plugin_words[common:], markdown_words[common:], source[common:], target[common:],
+                        prefix_length, rows)
+    return similarity, format_word_diff(edits)
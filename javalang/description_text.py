@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import re
+
+# Descriptions made only of these characters cannot contain inline markup, entities or HTML
+PLAIN_TEXT_PATTERN = re.compile(r'[^*_`\[\]<>&\\!#|~\t]*\Z')
+# Line starts that turn the first line into a list, and lines that turn the paragraph into a heading or rule
+LIST_START_PATTERN = re.compile(r'(?:\d+\.|[-+])(?:[ ]|\Z)')
+UNDERLINE_PATTERN = re.compile(r'[ ]*[-=][-= ]*\Z')
+MAX_MEMOISED_DESCRIPTIONS = 100000
+
+# markdown() and a function listing the text nodes of an HTML document, loaded by the first rendered description
+RENDERER = []
+
+
+class DescriptionNormalizer(object):
+    # Turns a markdown property description into the plain text markdown() + BeautifulSoup would produce. Plain
+    # paragraphs, by far the most common case, are handled without rendering, and every result is memoised by
+    # description text so descriptions shared between documents are only processed once.
+
+    def __init__(self):
+        self.memo = {}
+        self.rendered = 0
+        self.stripped = 0
+
+    def normalize(self, description):
+        try:
+            return self.memo[description]
+        except KeyError:
+            pass
+        if len(self.memo) >= MAX_MEMOISED_DESCRIPTIONS:
+            self.memo.clear()
+        if is_plain_paragraph(description):
+            self.stripped += 1
+            text = description.lstrip().rstrip('\n')
+        else:
+            self.rendered += 1
+            text = render_text(description)
+        self.memo[description] = text
+        return text
+
+
+def is_plain_paragraph(description):
+    if not PLAIN_TEXT_PATTERN.match(description):
+        return False
+    lines = description.strip('\n').split('\n')
+    first_line = lines[0]
+    # Four spaces of indentation start a code block
+    if len(first_line) - len(first_line.lstrip(' ')) >= 4 or LIST_START_PATTERN.match(first_line.lstrip(' ')):
+        return False
+    for line in lines:
+        if UNDERLINE_PATTERN.match(line) or not line.strip():
+            return False
+    # Trailing spaces before a line break render as <br />
+    for line in lines[:-1]:
+        if line.endswith(' '):
+            return False
+    return True
+
+
+def load_renderer():
+    # markdown and BeautifulSoup take longer to import than most runs spend rendering, and runs that never read a
+    # markdown file, or only meet plain paragraphs, never need them. BeautifulSoup 4 is used where available (it is
+    # the only one on Python 3) and BeautifulSoup 3 otherwise.
+    if not RENDERER:
+        from markdown import markdown
+        try:
+            from bs4 import BeautifulSoup
+
+            def text_nodes(html):
+                return BeautifulSoup(html, 'html.parser').find_all(string=True)
+        except ImportError:
+            from BeautifulSoup import BeautifulSoup
+
+            def text_nodes(html):
+                return BeautifulSoup(html).findAll(text=True)
+        RENDERER.extend([markdown, text_nodes])
+    return RENDERER
+
+
+def render_text(description):
+    markdown, text_nodes = load_renderer()
+    return ''.join(text_nodes(markdown(description)))
+
+
+default_normalizer = DescriptionNormalizer()
+
+
+def markdown_to_text(description):
+    return default_normalizer.normalize(description)
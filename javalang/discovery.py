@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import time
+
+from fnmatch import fnmatch
+
+try:
+    from os import scandir
+except ImportError:
+    from scandir import scandir
+
+# Directories that never hold plugin sources: VCS metadata, UI dependencies and generated code
+DEFAULT_PRUNED_DIRECTORIES = ['.git', '.hg', '.svn', '.idea', '.plugin-parser-cache', 'node_modules',
+                              'bower_components', 'generated-sources', 'generated-test-sources']
+# Build output, only pruned next to the build file of a module: a Java package may carry the same name
+BUILD_OUTPUT_DIRECTORIES = ['target', 'build']
+BUILD_FILES = ['pom.xml', 'build.gradle', 'build.gradle.kts']
+
+
+class JavaFileDiscovery(object):
+    # Walks a tree with scandir, pruning directories as early as possible so that their contents are never listed.
+    # The markdown files of docs/ directories met on the way are kept in markdown_files, so that the plugin docs can
+    # be indexed without a second walk.
+
+    def __init__(self, include=None, exclude=None, main_only=False, default_prune=True):
+        self.include = include or []
+        self.exclude = exclude or []
+        self.main_only = main_only
+        self.pruned_names = set(DEFAULT_PRUNED_DIRECTORIES if default_prune else [])
+        self.pruned_build_names = set(BUILD_OUTPUT_DIRECTORIES if default_prune else [])
+        self.directories = 0
+        self.entries = 0
+        self.pruned = 0
+        self.files = 0
+        self.seconds = 0.0
+        self.markdown_files = []
+
+    def is_pruned(self, relative_path, dir_name, parent_name, grandparent_name, in_module=False):
+        # in_module tells whether the parent directory holds a build file
+        if dir_name in self.pruned_names:
+            return True
+        if in_module and dir_name in self.pruned_build_names:
+            return True
+        if any(fnmatch(relative_path, pattern) for pattern in self.exclude):
+            return True
+        if self.main_only:
+            # Only descend into src/main, and within it only into src/main/java
+            if parent_name == 'src' and dir_name != 'main':
+                return True
+            if grandparent_name == 'src' and parent_name == 'main' and dir_name != 'java':
+                return True
+        return False
+
+    def is_selected(self, relative_path, file_path):
+        if any(fnmatch(relative_path, pattern) for pattern in self.exclude):
+            return False
+        if self.include and not any(fnmatch(relative_path, pattern) for pattern in self.include):
+            return False
+        if self.main_only and '/src/main/java/' not in file_path:
+            return False
+        return True
+
+    def find_java_files(self, path):
+        start_time = time.time()
+        java_files = []
+        markdown_files = []
+        # Each pending entry is (path, path relative to the root, directory name, parent directory name)
+        if len(path) > 1:
+            path = path.rstrip('/')
+        root_path = os.path.abspath(path)
+        pending = [(path, '', os.path.basename(root_path), os.path.basename(os.path.dirname(root_path)))]
+        while pending:
+            dir_path, relative_dir, dir_name, parent_name = pending.pop()
+            self.directories += 1
+            try:
+                entries = list(scandir(dir_path))
+            except OSError:
+                continue
+            in_module = any(entry.name in BUILD_FILES for entry in entries)
+            for entry in entries:
+                self.entries += 1
+                relative_path = relative_dir + '/' + entry.name if relative_dir else entry.name
+                entry_path = dir_path + '/' + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if self.is_pruned(relative_path, entry.name, dir_name, parent_name, in_module):
+                        self.pruned += 1
+                    else:
+                        pending.append((entry_path, relative_path, entry.name, dir_name))
+                elif entry.name.endswith('.java') and self.is_selected(relative_path, os.path.abspath(entry_path)):
+                    java_files.append(entry_path)
+                elif dir_name == 'docs' and entry.name.endswith('.md') and \
+                        not any(fnmatch(relative_path, pattern) for pattern in self.exclude):
+                    markdown_files.append(entry_path)
+        self.files += len(java_files)
+        self.markdown_files = sorted(markdown_files)
+        self.seconds += time.time() - start_time
+        # Validate in path order so serial and parallel runs produce identical output
+        return sorted(java_files)
+
+    def summary(self):
+        return ('Discovery: found ' + str(self.files) + ' Java files in ' + str(self.directories) + ' directories (' +
+                str(self.entries) + ' entries scanned, ' + str(self.pruned) + ' directories pruned) in ' +
+                '%.3f' % self.seconds + 's.')
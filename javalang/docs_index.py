@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+
+from git_changes import plugin_from_markdown_path
+
+
+class DocsIndex(object):
+    # Map of (plugin name, plugin type) -> <name>-<type>.md files found in docs/ directories during discovery.
+    # A docs/ directory documents the plugins below the directory holding it, so a plugin resolves to the matching
+    # file of the nearest docs/ directory above it, whatever the layout of the module in between.
+
+    def __init__(self, plugin_types, markdown_files=None):
+        self.plugin_types = plugin_types
+        self.docs = {}
+        self.roots = set()
+        for markdown_path in markdown_files or []:
+            self.add(markdown_path)
+
+    def add(self, markdown_path):
+        self.roots.add(documented_root(markdown_path))
+        plugin = plugin_from_markdown_path(markdown_path, self.plugin_types)
+        if plugin is not None:
+            self.docs.setdefault(plugin, []).append(markdown_path)
+
+    def find(self, plugin_path, plugin_name, plugin_type):
+        candidates = [markdown_path for markdown_path in self.docs.get((plugin_name, plugin_type), [])
+                      if plugin_path.startswith(documented_root(markdown_path))]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda markdown_path: len(documented_root(markdown_path)))
+
+    def expected_path(self, plugin_path, plugin_name, plugin_type):
+        # Where the markdown file of an undocumented plugin belongs: the nearest docs/ directory above it, if any
+        roots = [root for root in self.roots if plugin_path.startswith(root)]
+        if not roots:
+            return None
+        return max(roots, key=len) + 'docs/' + plugin_name + '-' + plugin_type + '.md'
+
+    def orphans(self, plugins):
+        # Indexed files that none of the (plugin path, plugin name, plugin type) triples resolves to
+        claimed = set(self.find(plugin_path, plugin_name, plugin_type)
+                      for plugin_path, plugin_name, plugin_type in plugins)
+        return sorted(markdown_path for markdown_paths in self.docs.values() for markdown_path in markdown_paths
+                      if markdown_path not in claimed)
+
+
+def documented_root(markdown_path):
+    # The directory holding docs/, with a trailing separator so that "core" does not match "core-plugins". A docs/
+    # directory at the top of a relative path, as normalised from "./docs", documents every relative path.
+    root_path = os.path.dirname(os.path.dirname(markdown_path))
+    return root_path + '/' if root_path else ''
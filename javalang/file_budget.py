@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import signal
+
+from profiling import clock
+
+# Every Java file is extracted under a wall-clock and a memory budget. Files that exceed one, or whose extraction
+# raises, are quarantined: the run reports them and moves on to the next file. The wall clock is enforced with
+# SIGALRM where the platform has it and the file is extracted on the main thread, which is the case both in a serial
+# run and in the workers of the pool, and is checked once the file is done everywhere else. The memory budget caps how
+# far the address space of the process may grow while the file is extracted (Linux only). The cap applies to every
+# thread of the process, so runs with a memory budget read their files in line.
+
+DEFAULT_FILE_TIMEOUT = 60.0
+# The alarm fires again this often in case the parser swallowed the first one
+ALARM_INTERVAL = 1.0
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class FileFailure(Exception):
+    # Why a file was quarantined and how long it was worked on. Pickled back from the workers with its arguments.
+
+    def __init__(self, reason, seconds=0.0):
+        Exception.__init__(self, reason, seconds)
+        self.reason = reason
+        self.seconds = seconds
+
+    def __str__(self):
+        return self.reason
+
+
+def describe_error(error):
+    # Some parser exceptions carry no message, so the class name stands in for it
+    return str(error) or error.__class__.__name__
+
+
+def as_file_failure(error):
+    if isinstance(error, FileFailure):
+        return error
+    return FileFailure(describe_error(error))
+
+
+def memory_budget_supported():
+    try:
+        import resource
+    except ImportError:
+        return False
+    return hasattr(resource, 'RLIMIT_AS') and os.path.exists('/proc/self/statm')
+
+
+def address_space_bytes():
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+
+
+class FileBudget(object):
+
+    def __init__(self, seconds=DEFAULT_FILE_TIMEOUT, memory_mib=0):
+        self.seconds = seconds
+        self.memory_mib = memory_mib
+        self.armed = False
+
+    def on_alarm(self, signal_number, frame):
+        if self.armed:
+            raise BudgetExceeded()
+
+    def start_alarm(self):
+        # Returns the handler to restore, or None when the alarm cannot be used here
+        if not self.seconds or not hasattr(signal, 'setitimer'):
+            return None
+        try:
+            previous_handler = signal.signal(signal.SIGALRM, self.on_alarm)
+        except ValueError:
+            # Not on the main thread
+            return None
+        self.armed = True
+        signal.setitimer(signal.ITIMER_REAL, self.seconds, ALARM_INTERVAL)
+        # None stands for a handler installed outside of Python
+        return previous_handler if previous_handler is not None else signal.SIG_DFL
+
+    def stop_alarm(self, previous_handler):
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+    def limit_memory(self):
+        # Returns the limits to restore, or None when memory is not budgeted
+        if not self.memory_mib:
+            return None
+        import resource
+        limits = resource.getrlimit(resource.RLIMIT_AS)
+        soft_limit = address_space_bytes() + self.memory_mib * 1024 * 1024
+        for limit in limits:
+            if limit != resource.RLIM_INFINITY:
+                soft_limit = min(soft_limit, limit)
+        resource.setrlimit(resource.RLIMIT_AS, (soft_limit, limits[1]))
+        return limits
+
+    def restore_memory(self, limits):
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, limits)
+
+    def run(self, function, *args):
+        # Returns what function(*args) returns, or raises FileFailure
+        start_time = clock()
+        previous_handler = self.start_alarm()
+        limits = self.limit_memory()
+        try:
+            try:
+                result = function(*args)
+            finally:
+                # From here on a late alarm is ignored. The limit covers the whole process, so it is lifted before
+                # anything else, the failure included, allocates.
+                self.armed = False
+                if limits is not None:
+                    self.restore_memory(limits)
+                if previous_handler is not None:
+                    self.stop_alarm(previous_handler)
+        except BudgetExceeded:
+            raise FileFailure('Parsing took longer than the ' + format_seconds(self.seconds) + ' budget.',
+                              clock() - start_time)
+        except (MemoryError, SystemError) as e:
+            # C code that fails to allocate under the limit sometimes returns without setting MemoryError
+            if limits is None:
+                raise FileFailure(describe_error(e), clock() - start_time)
+            raise FileFailure('Parsing needed more than the ' + str(self.memory_mib) + ' MiB memory budget.',
+                              clock() - start_time)
+        except Exception as e:
+            raise FileFailure(describe_error(e), clock() - start_time)
+        seconds = clock() - start_time
+        # Covers runs without the alarm and parsers that held on to the interpreter past it
+        if self.seconds and seconds > self.seconds:
+            raise FileFailure('Parsing took longer than the ' + format_seconds(self.seconds) + ' budget.', seconds)
+        return result
+
+
+def format_seconds(seconds):
+    return ('%g' % seconds) + 's'
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+
+
+def run_git(repository_path, git_args):
+    import subprocess
+    try:
+        output = subprocess.check_output(['git', '-C', repository_path] + git_args)
+    except (OSError, subprocess.CalledProcessError) as e:
+        raise Exception('Unable to run "git ' + ' '.join(git_args) + '" in "' + repository_path + '": ' + str(e))
+    return output.decode('utf-8')
+
+
+def split_paths(output):
+    return [path for path in output.split('\0') if path]
+
+
+def git_changed_files(repository_path, since=None, staged=False):
+    # Returns the changed files as paths under repository_path, in the same form os.walk(repository_path) would
+    top_level = run_git(repository_path, ['rev-parse', '--show-toplevel']).strip()
+    if staged:
+        changed = split_paths(run_git(repository_path, ['diff', '--name-only', '-z', '--cached']))
+    else:
+        changed = split_paths(run_git(repository_path, ['diff', '--name-only', '-z', since, '--']))
+        # New files the diff against a revision does not know about yet
+        changed += split_paths(run_git(top_level, ['ls-files', '-z', '--others', '--exclude-standard']))
+
+    base_path = os.path.realpath(repository_path)
+    changed_files = set()
+    for changed_path in changed:
+        relative_path = os.path.relpath(os.path.join(top_level, changed_path), base_path)
+        if relative_path == '..' or relative_path.startswith('..' + os.sep):
+            continue
+        changed_files.add(os.path.join(repository_path, relative_path))
+    return sorted(changed_files)
+
+
+def plugin_from_markdown_path(markdown_path, plugin_types):
+    # Inverse of the <name>-<type>.md naming convention; plugin types never contain a hyphen but names may
+    markdown_filename = os.path.basename(markdown_path)[:-len('.md')]
+    separator_index = markdown_filename.rfind('-')
+    if separator_index <= 0 or markdown_filename[separator_index + 1:] not in plugin_types:
+        return None
+    return markdown_filename[:separator_index], markdown_filename[separator_index + 1:]
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import re
+
+# Markdown Constants
+PROPERTIES_DELIMITERS = ['Properties\n----------', 'Configuration\n-------------']
+EXAMPLE_DELIMITERS = ['Example\n-------', 'Examples\n--------']
+
+# A property is "**name:**" followed by its description, which runs until the next blank line (a line holding only
+# whitespace counts as blank) or the end of the section
+PROPERTY_PATTERN = re.compile(r'\*\*([^*\n]+?):\*\*(.*?)(?:\n[ \t]*\n|\Z)', re.DOTALL)
+
+
+def heading_pattern(delimiters):
+    # Matches every delimiter as a setext heading with any underline length, or as an ATX "## Title" heading
+    titles = '|'.join(re.escape(delimiter.split('\n')[0]) for delimiter in delimiters)
+    return re.compile(r'(?:' + titles + r')[ \t]*\n[-=]{3,}[ \t]*$|^#{1,6}[ \t]*(?:' + titles + r')[ \t]*#*[ \t]*$',
+                      re.MULTILINE)
+
+
+PROPERTIES_HEADING_PATTERN = heading_pattern(PROPERTIES_DELIMITERS)
+EXAMPLE_HEADING_PATTERN = heading_pattern(EXAMPLE_DELIMITERS)
+
+
+def find_heading(contents, pattern):
+    # Returns the start and end offsets of the first matching heading, or (-1, -1) when there is none
+    match = pattern.search(contents)
+    if match is None:
+        return -1, -1
+    return match.start(), match.end()
+
+
+def find_properties_section(contents):
+    # Returns (properties heading index, example heading index, properties section)
+    property_index, property_end = find_heading(contents, PROPERTIES_HEADING_PATTERN)
+    example_index, example_end = find_heading(contents, EXAMPLE_HEADING_PATTERN)
+    section_start = property_end if property_index != -1 else 0
+    section_end = example_index if example_index > section_start else len(contents)
+    return property_index, example_index, contents[section_start:section_end]
+
+
+def parse_property_names_from_markdown(properties_section):
+    markdown_properties = {}
+    for match in PROPERTY_PATTERN.finditer(properties_section):
+        markdown_properties[match.group(1)] = match.group(2)
+    return markdown_properties
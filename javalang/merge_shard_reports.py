@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Combines the "--format events" reports of "validate_plugin_docs.py --shard I/N" runs into the report a single run
+# over the whole tree would have written: plugins and quarantined files in path order, then the findings about
+# markdown files alone. Exits with status 1 when a shard failed, did not finish, or is missing.
+
+import json
+import sys
+
+from argparse import ArgumentParser
+from reporters import REPORT_FORMATS, Finding, create_reporter
+
+
+def setup_args():
+    parser = ArgumentParser(description='Merge the reports of validate_plugin_docs.py --shard runs')
+    parser.add_argument('reports', nargs='+', metavar='REPORT',
+                        help='Reports written by the shards with --format events.')
+    parser.add_argument('--showdiff', action='store_true', help='Prints descriptions of markdown property ' +
+                                                                'inconsistencies to output.')
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='text',
+                        help='Output format of the merged report (default: text).')
+    parser.add_argument('--output', metavar='FILE', help='Write the merged report to FILE instead of stdout.')
+    return parser.parse_args()
+
+
+class ShardReport(object):
+
+    def __init__(self, report_path):
+        self.path = report_path
+        self.shard = None
+        # (plugin, findings) in the order the shard validated them
+        self.plugins = []
+        # Quarantined Java files, reported in path order along with the plugins
+        self.quarantined = []
+        # Other findings outside of any plugin, like orphan docs
+        self.findings = []
+        self.failures = []
+        self.finished = False
+        self.read()
+
+    def read(self):
+        plugin_findings = None
+        with open(self.path) as report_file:
+            for line in report_file:
+                if not line.strip():
+                    continue
+                event = json.loads(line)
+                if event['event'] == 'shard':
+                    self.shard = (event['index'], event['count'])
+                elif event['event'] == 'begin_plugin':
+                    plugin_findings = []
+                    self.plugins.append((event['plugin'], plugin_findings))
+                elif event['event'] == 'finding':
+                    finding = Finding.from_dict(event['finding'])
+                    if plugin_findings is not None:
+                        plugin_findings.append(finding)
+                    elif finding.rule == 'file-quarantined':
+                        self.quarantined.append(finding)
+                    else:
+                        self.findings.append(finding)
+                elif event['event'] == 'end_plugin':
+                    plugin_findings = None
+                elif event['event'] == 'failed':
+                    self.failures.append(event['message'])
+                elif event['event'] == 'end':
+                    self.finished = True
+
+
+def check_shards(reports):
+    # Problems that make the merged report incomplete
+    problems = []
+    for report in reports:
+        if report.shard is None:
+            problems.append('"' + report.path + '" is not the report of a --shard run.')
+        if not report.finished:
+            problems.append('"' + report.path + '" is incomplete, its shard did not finish.')
+        for message in report.failures:
+            problems.append('Shard in "' + report.path + '" failed: ' + message)
+    shards = [report.shard for report in reports if report.shard is not None]
+    shard_counts = set(shard_count for shard_index, shard_count in shards)
+    if len(shard_counts) > 1:
+        problems.append('The reports come from runs with different shard counts: ' +
+                        ', '.join(str(shard_count) for shard_count in sorted(shard_counts)) + '.')
+    elif shard_counts:
+        shard_count = shard_counts.pop()
+        indexes = [shard_index for shard_index, count in shards]
+        missing = [str(shard_index) for shard_index in range(1, shard_count + 1) if shard_index not in indexes]
+        if missing:
+            problems.append('Missing reports for shards ' + ', '.join(missing) + ' of ' + str(shard_count) + '.')
+        duplicates = sorted(set(str(shard_index) for shard_index in indexes if indexes.count(shard_index) > 1))
+        if duplicates:
+            problems.append('More than one report for shards ' + ', '.join(duplicates) + '.')
+    return problems
+
+
+def merge(reports, reporter):
+    # (path, plugin or None for a quarantined file, findings)
+    entries = [(plugin['path'], plugin, findings) for report in reports for plugin, findings in report.plugins]
+    entries += [(finding.file, None, [finding]) for report in reports for finding in report.quarantined]
+    entries.sort(key=lambda entry: entry[0])
+    for path, plugin, findings in entries:
+        if plugin is None:
+            reporter.finding(findings[0])
+            continue
+        reporter.begin_plugin(plugin['path'], plugin['class_name'], plugin['name'], plugin['type'],
+                              plugin['markdown_path'])
+        for finding in findings:
+            reporter.finding(finding)
+        reporter.end_plugin()
+    for finding in sorted((finding for report in reports for finding in report.findings),
+                          key=lambda finding: finding.file):
+        reporter.finding(finding)
+    return sum(1 for path, plugin, findings in entries if plugin is not None)
+
+
+def main():
+    args = setup_args()
+    reports = [ShardReport(report_path) for report_path in args.reports]
+    problems = check_shards(reports)
+
+    reporter = create_reporter(args.format, args.output, args.showdiff)
+    try:
+        plugin_count = merge(reports, reporter)
+        reporter.note('Merged ' + str(len(reports)) + ' shard reports covering ' + str(plugin_count) + ' plugins.')
+    finally:
+        reporter.close()
+
+    for problem in problems:
+        sys.stderr.write('ERROR: ' + problem + '\n')
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
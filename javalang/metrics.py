@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import os
+import time
+
+from pipeline import HISTOGRAM_STAGES, LATENCY_BUCKETS, PIPELINE_STAGES
+from reporters import RULES
+
+# Metrics of one validation run, written when it exits in the Prometheus text format, for the textfile collector of
+# the node exporter, and as JSON. They are built from the counters every run keeps anyway: the pipeline counters
+# with their latency histograms, which the workers of --jobs send back with each file, the cache and pre-filter
+# counters, and the plugins and findings counted on their way to the reporter. Every value describes the last run
+# only, so all of them are gauges apart from the latency histograms.
+
+METRIC_PREFIX = 'plugin_docs_'
+
+
+class RunMetrics(object):
+
+    def __init__(self, reporter):
+        # reporter is the CountingReporter of the run
+        self.reporter = reporter
+        self.run = None
+        self.succeeded = False
+        self.start_time = time.time()
+
+    def families(self):
+        # [(name, type, help, samples)] where samples are (labels, value) pairs, or (labels, (bucket counts, sum))
+        # pairs for histograms
+        end_time = time.time()
+        duration = end_time - self.start_time
+        families = [
+            ('run_success', 'gauge', 'Whether the run finished without an error.', [((), int(self.succeeded))]),
+            ('run_duration_seconds', 'gauge', 'Wall-clock time of the run.', [((), duration)]),
+            ('run_end_timestamp_seconds', 'gauge', 'Unix time at which the run ended.', [((), end_time)]),
+            ('plugins_validated', 'gauge', 'Plugins validated.', [((), self.reporter.plugins)]),
+            ('findings', 'gauge', 'Findings reported, by rule.',
+             [((('rule', rule),), self.reporter.findings.get(rule, 0)) for rule in sorted(RULES)])
+        ]
+        run = self.run
+        if run is None:
+            return families
+
+        counters = run.counters
+        java_files = counters.items['discover']
+        families += [
+            ('java_files', 'gauge', 'Java files discovered.', [((), java_files)]),
+            ('files_per_second', 'gauge', 'Java files discovered per second of the run.',
+             [((), java_files / duration if duration else 0.0)]),
+            ('stage_files', 'gauge', 'Files that went through each pipeline stage.',
+             [((('stage', stage),), counters.items[stage]) for stage in PIPELINE_STAGES]),
+            ('stage_bytes', 'gauge', 'Bytes read by each pipeline stage.',
+             [((('stage', stage),), counters.bytes[stage]) for stage in PIPELINE_STAGES]),
+            ('stage_busy_seconds', 'gauge', 'Time spent in each pipeline stage, summed over threads and workers.',
+             [((('stage', stage),), counters.seconds[stage]) for stage in PIPELINE_STAGES]),
+            ('stage_latency_seconds', 'histogram', 'Time spent on one file in each stage.',
+             [((('stage', stage),), (counters.histograms[stage], counters.histogram_seconds[stage]))
+              for stage in HISTOGRAM_STAGES]),
+            ('quarantined_files', 'gauge', 'Java files quarantined.', [((), len(run.quarantined))])
+        ]
+        if run.prefilter:
+            families += [
+                ('prefilter_scanned_files', 'gauge', 'Java files scanned by the pre-filter.',
+                 [((), run.prefilter.scanned)]),
+                ('prefilter_skipped_files', 'gauge', 'Java files the pre-filter kept from the parser.',
+                 [((), run.prefilter.skipped)])
+            ]
+        if run.cache:
+            lookups = run.cache.hits + run.cache.misses
+            families += [
+                ('cache_hits', 'gauge', 'Plugin model cache hits.', [((), run.cache.hits)]),
+                ('cache_misses', 'gauge', 'Plugin model cache misses.', [((), run.cache.misses)]),
+                ('cache_hit_ratio', 'gauge', 'Share of cache lookups that hit.',
+                 [((), float(run.cache.hits) / lookups if lookups else 0.0)])
+            ]
+        return families
+
+    def write(self, prometheus_path=None, json_path=None):
+        families = self.families()
+        if prometheus_path:
+            write_atomically(prometheus_path, render_prometheus(families))
+        if json_path:
+            write_atomically(json_path, render_json(families))
+
+
+def format_value(value):
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def escape_label_value(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(name + '="' + escape_label_value(value) + '"' for name, value in labels) + '}'
+
+
+def render_prometheus(families):
+    lines = []
+    for name, metric_type, help_text, samples in families:
+        name = METRIC_PREFIX + name
+        lines.append('# HELP ' + name + ' ' + help_text)
+        lines.append('# TYPE ' + name + ' ' + metric_type)
+        for labels, value in samples:
+            if metric_type != 'histogram':
+                lines.append(name + format_labels(labels) + ' ' + format_value(value))
+                continue
+            bucket_counts, total_seconds = value
+            cumulative = 0
+            for bound, count in zip([format_value(bound) for bound in LATENCY_BUCKETS] + ['+Inf'], bucket_counts):
+                cumulative += count
+                lines.append(name + '_bucket' + format_labels(labels + (('le', bound),)) + ' ' + str(cumulative))
+            lines.append(name + '_sum' + format_labels(labels) + ' ' + format_value(total_seconds))
+            lines.append(name + '_count' + format_labels(labels) + ' ' + str(cumulative))
+    return '\n'.join(lines) + '\n'
+
+
+def render_json(families):
+    metrics = {}
+    for name, metric_type, help_text, samples in families:
+        rendered = []
+        for labels, value in samples:
+            sample = {'labels': dict(labels)}
+            if metric_type == 'histogram':
+                # Unlike the cumulative Prometheus buckets, each count here is of its own bucket only
+                bucket_counts, total_seconds = value
+                sample['buckets'] = [[bound, count] for bound, count in zip(LATENCY_BUCKETS + ['+Inf'], bucket_counts)]
+                sample['sum'] = total_seconds
+                sample['count'] = sum(bucket_counts)
+            else:
+                sample['value'] = value
+            rendered.append(sample)
+        metrics[METRIC_PREFIX + name] = {'type': metric_type, 'help': help_text, 'samples': rendered}
+    return json.dumps(metrics, indent=2, sort_keys=True) + '\n'
+
+
+def write_atomically(path, text):
+    # The textfile collector may read the file at any moment, so it is renamed into place once complete. The
+    # temporary name does not end in .prom, which the collector would pick up.
+    temp_path = path + '.' + str(os.getpid()) + '.tmp'
+    with open(temp_path, 'w') as metrics_file:
+        metrics_file.write(text)
+    os.rename(temp_path, path)
@@ -0,0 +1,426 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Parser backends turn Java source into one neutral model of classes, fields and annotations, so that the tools work
+# the same whether javalang or plyj (which does not support Java 8 syntax) did the parsing.
+
+import os
+import sys
+
+from constant_values import ConstantResolver, evaluate_expression, render_parts
+from profiling import clock
+
+BACKENDS = ['javalang', 'plyj']
+DEFAULT_BACKEND = 'javalang'
+
+# Generated parser tables outlive a single run, so they go to a per-user cache rather than the working directory
+DEFAULT_TABLE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'plugin-parser')
+
+# plyj parsers by table directory, shared by every PlyjBackend of the process
+PLYJ_PARSERS = {}
+
+# Canonical Java modifier order, so that modifiers print the same whichever backend collected them
+MODIFIER_ORDER = ['public', 'protected', 'private', 'abstract', 'static', 'final', 'transient', 'volatile',
+                  'synchronized', 'native', 'strictfp', 'default']
+
+
+class JavaFile(object):
+
+    def __init__(self, package, imports, types):
+        self.package = package
+        self.imports = imports
+        self.types = types
+
+
+class JavaClass(object):
+    # kind is one of 'class', 'interface', 'enum' or 'annotation'; classes holds the nested type declarations and
+    # constants the evaluated static final String fields by name
+
+    def __init__(self, kind, name, modifiers, annotations, extends, implements, fields, classes, constants=None):
+        self.kind = kind
+        self.name = name
+        self.modifiers = modifiers
+        self.annotations = annotations
+        self.extends = extends
+        self.implements = implements
+        self.fields = fields
+        self.classes = classes
+        self.constants = constants or {}
+
+
+class JavaField(object):
+
+    def __init__(self, type_name, names, modifiers, annotations):
+        self.type = type_name
+        self.names = names
+        self.modifiers = modifiers
+        self.annotations = annotations
+
+
+class JavaAnnotation(object):
+    # Arguments are evaluated while converting the tree. Unsupported expressions only fail when the argument is
+    # actually used, since most annotations in a file are never looked at. parts keeps the references to constants
+    # declared in other files, which argument renders as qualifier.member.
+
+    def __init__(self, name, parts, error=None):
+        self.name = name
+        self.error = error
+        self.set_parts(parts)
+
+    def set_parts(self, parts):
+        self.parts = parts
+        self.argument = render_parts(parts) if parts is not None else None
+
+    def value(self):
+        if self.error is not None:
+            raise Exception(self.error)
+        return self.argument
+
+
+def sort_modifiers(modifiers):
+    return sorted(modifiers, key=lambda modifier: MODIFIER_ORDER.index(modifier)
+                  if modifier in MODIFIER_ORDER else len(MODIFIER_ORDER))
+
+
+def simple_name(type_name):
+    return type_name[type_name.rfind('.') + 1:] if type_name else type_name
+
+
+def create_annotation(name, expression, evaluate):
+    if expression is None:
+        return JavaAnnotation(name, ())
+    try:
+        return JavaAnnotation(name, evaluate(expression))
+    except Exception as e:
+        return JavaAnnotation(name, None, str(e))
+
+
+def is_string_constant(kind, modifiers, type_name):
+    # Interface fields are implicitly static and final
+    return simple_name(type_name) == 'String' and \
+        (kind in ('interface', 'annotation') or ('static' in modifiers and 'final' in modifiers))
+
+
+def resolve_file_constants(java_file):
+    # Replaces references to constants declared in the same file: unqualified names are looked up in the enclosing
+    # classes from the innermost out, qualified ones in the classes of the file with that simple name
+    scopes = []
+    pending = [(java_class,) for java_class in reversed(java_file.types)]
+    while pending:
+        scope = pending.pop()
+        scopes.append(scope)
+        pending.extend(scope + (nested_class,) for nested_class in reversed(scope[-1].classes))
+    if not any(scope[-1].constants for scope in scopes):
+        return java_file
+
+    scopes_by_name = {}
+    for scope in scopes:
+        scopes_by_name.setdefault(scope[-1].name, []).append(scope)
+
+    def lookup(qualifier, member, scope):
+        if qualifier:
+            candidates = scopes_by_name.get(simple_name(qualifier), [])
+        else:
+            candidates = [scope[:length] for length in range(len(scope), 0, -1)]
+        for candidate in candidates:
+            if member in candidate[-1].constants:
+                return (tuple(java_class.name for java_class in candidate), member), \
+                    candidate[-1].constants[member], candidate
+        return None
+
+    resolver = ConstantResolver(lookup)
+    for scope in scopes:
+        java_class = scope[-1]
+        for member in java_class.constants:
+            java_class.constants[member] = resolver.resolve(java_class.constants[member], scope)
+        annotations = java_class.annotations + [annotation for field in java_class.fields
+                                                for annotation in field.annotations]
+        for annotation in annotations:
+            if annotation.parts is not None:
+                annotation.set_parts(resolver.resolve(annotation.parts, scope))
+    return java_file
+
+
+class ParserBackend(object):
+    # parse() takes the decoded contents of a Java file and returns a JavaFile or raises an exception.
+    # startup_seconds is the time the constructor spent getting the parser ready.
+
+    name = None
+    startup_seconds = 0.0
+    tables = None
+
+    def version(self):
+        raise NotImplementedError()
+
+    def parse(self, file_path, contents):
+        raise NotImplementedError()
+
+
+class JavalangBackend(ParserBackend):
+    name = 'javalang'
+
+    def __init__(self, table_dir=None):
+        start_time = clock()
+        import javalang
+        self.javalang = javalang
+        self.startup_seconds = clock() - start_time
+
+    def version(self):
+        return self.javalang.__version__
+
+    def parse(self, file_path, contents):
+        try:
+            tree = self.javalang.parse.parse(contents)
+        except self.javalang.parser.JavaSyntaxError as e:
+            # The exception itself has no message
+            position = getattr(e.at, 'position', None)
+            where = 'line ' + str(position[0]) + ', column ' + str(position[1]) if position else 'the end of the file'
+            raise Exception('Syntax error: ' + e.description + ' at ' + where + '.')
+        return resolve_file_constants(JavaFile(
+            tree.package.name if tree.package else None,
+            [('static ' if imported.static else '') + imported.path + ('.*' if imported.wildcard else '')
+             for imported in tree.imports],
+            [self.convert_type(type_declaration) for type_declaration in tree.types]))
+
+    def convert_type(self, type_declaration):
+        kind = {'ClassDeclaration': 'class', 'InterfaceDeclaration': 'interface', 'EnumDeclaration': 'enum',
+                'AnnotationDeclaration': 'annotation'}[type_declaration.__class__.__name__]
+        extends = type_declaration.extends
+        implements = getattr(type_declaration, 'implements', None) or []
+        if isinstance(extends, list):
+            # Interfaces extend a list of interfaces
+            implements = extends
+            extends = None
+        body = type_declaration.body
+        if kind == 'enum':
+            body = body.declarations
+        field_declarations = [member for member in body
+                              if member.__class__.__name__ in ('FieldDeclaration', 'ConstantDeclaration')]
+        return JavaClass(kind, type_declaration.name, sort_modifiers(type_declaration.modifiers),
+                         self.convert_annotations(type_declaration.annotations),
+                         self.type_name(extends) if extends is not None else None,
+                         [self.type_name(interface) for interface in implements],
+                         [self.convert_field(member) for member in field_declarations],
+                         [self.convert_type(member) for member in body
+                          if member.__class__.__name__ in ('ClassDeclaration', 'InterfaceDeclaration',
+                                                           'EnumDeclaration', 'AnnotationDeclaration')],
+                         self.get_constants(kind, field_declarations))
+
+    def get_constants(self, kind, field_declarations):
+        constants = {}
+        for field_declaration in field_declarations:
+            if not is_string_constant(kind, field_declaration.modifiers, self.type_name(field_declaration.type)):
+                continue
+            for declarator in field_declaration.declarators:
+                if declarator.initializer is not None:
+                    # Constants that cannot be evaluated simply stay unresolved where they are used
+                    try:
+                        constants[declarator.name] = self.evaluate(declarator.initializer)
+                    except Exception:
+                        pass
+        return constants
+
+    def convert_field(self, field_declaration):
+        return JavaField(self.type_name(field_declaration.type),
+                         [declarator.name for declarator in field_declaration.declarators],
+                         sort_modifiers(field_declaration.modifiers),
+                         self.convert_annotations(field_declaration.annotations))
+
+    def convert_annotations(self, annotations):
+        return [create_annotation(annotation.name, annotation.element, self.evaluate) for annotation in annotations]
+
+    def type_name(self, type_reference):
+        # Qualified names are nested as sub types
+        names = [type_reference.name]
+        while getattr(type_reference, 'sub_type', None) is not None:
+            type_reference = type_reference.sub_type
+            names.append(type_reference.name)
+        return '.'.join(names)
+
+    def evaluate(self, expression):
+        return evaluate_expression(expression, self.expand)
+
+    def expand(self, expression):
+        expression_type = expression.__class__.__name__
+        if expression_type == 'Literal':
+            # strip opening and closing double quotes
+            return 'text', expression.value[1:-1]
+        elif expression_type == 'BinaryOperation' and expression.operator == '+':
+            return 'operands', [expression.operandl, expression.operandr]
+        elif expression_type == 'MemberReference':
+            return 'reference', (expression.qualifier or '', expression.member)
+        elif expression_type == 'list':
+            # Assumed to be ElementValuePair where element of interest is on right-hand-side
+            return 'operands', [expression[0].value]
+        raise Exception('Unsupported annotation operation: ' + expression_type)
+
+
+class PlyjBackend(ParserBackend):
+    # Building plyj's LALR tables takes seconds, far longer than parsing a config class, so the parser is built once
+    # per process and the generated tables are pickled to table_dir for later processes to load
+    name = 'plyj'
+
+    def __init__(self, table_dir=None):
+        try:
+            import plyj.parser
+        except ImportError:
+            raise Exception('The plyj backend requires the plyj package (pip install plyj).')
+        self.plyj = plyj
+        self.table_dir = table_dir or DEFAULT_TABLE_DIR
+        start_time = clock()
+        if self.table_dir in PLYJ_PARSERS:
+            self.parser = PLYJ_PARSERS[self.table_dir]
+            self.tables = 'reused'
+        else:
+            self.parser, self.tables = self.build_parser()
+            PLYJ_PARSERS[self.table_dir] = self.parser
+        self.startup_seconds = clock() - start_time
+
+    def version(self):
+        return getattr(self.plyj, '__version__', 'unknown')
+
+    def build_parser(self):
+        from ply import lex
+        # Same lexer and parser plyj.parser.Parser() builds, but with the tables in a location of our choosing
+        parser = self.plyj.parser.Parser.__new__(self.plyj.parser.Parser)
+        parser.lexer = lex.lex(module=self.plyj.parser.MyLexer(), errorlog=lex.NullLogger())
+        table_path = os.path.join(self.table_dir, 'plyj-parsetab-py' + str(sys.version_info[0]) + '.pickle')
+        if os.path.exists(table_path):
+            try:
+                # Tables whose grammar signature no longer matches are regenerated by yacc itself
+                parser.parser = self.create_yacc(table_path)
+                return parser, 'loaded'
+            except Exception:
+                pass
+
+        # Generate into a private file and rename it so that concurrent processes never load a partial table
+        try:
+            if not os.path.isdir(self.table_dir):
+                os.makedirs(self.table_dir)
+        except OSError:
+            pass
+        temp_path = table_path + '.' + str(os.getpid())
+        parser.parser = self.create_yacc(temp_path)
+        try:
+            os.rename(temp_path, table_path)
+        except OSError:
+            pass
+        return parser, 'generated'
+
+    def create_yacc(self, table_path):
+        from ply import yacc
+        return yacc.yacc(module=self.plyj.parser.MyParser(), start='goal', picklefile=table_path, debug=False,
+                         errorlog=yacc.NullLogger())
+
+    def parse(self, file_path, contents):
+        tree = self.parser.parse_string(contents)
+        if tree is None:
+            raise Exception('Syntax error: Unable to parse "' + file_path + '".')
+        return resolve_file_constants(JavaFile(
+            tree.package_declaration.name.value if tree.package_declaration else None,
+            [('static ' if imported.static else '') + imported.name.value + ('.*' if imported.on_demand else '')
+             for imported in tree.import_declarations],
+            [self.convert_type(type_declaration) for type_declaration in tree.type_declarations
+             if type_declaration is not None]))
+
+    def convert_type(self, type_declaration):
+        kind = {'ClassDeclaration': 'class', 'InterfaceDeclaration': 'interface', 'EnumDeclaration': 'enum',
+                'AnnotationTypeDeclaration': 'annotation'}[type_declaration.__class__.__name__]
+        extends = getattr(type_declaration, 'extends', None)
+        implements = getattr(type_declaration, 'implements', None) or []
+        if isinstance(extends, list):
+            implements = extends
+            extends = None
+        modifiers, annotations = self.split_modifiers(type_declaration.modifiers)
+        field_declarations = [member for member in type_declaration.body
+                              if member.__class__.__name__ in ('FieldDeclaration', 'ConstantDeclaration')]
+        return JavaClass(kind, type_declaration.name, modifiers, annotations,
+                         self.type_name(extends) if extends is not None else None,
+                         [self.type_name(interface) for interface in implements],
+                         [self.convert_field(member) for member in field_declarations],
+                         [self.convert_type(member) for member in type_declaration.body
+                          if member.__class__.__name__ in ('ClassDeclaration', 'InterfaceDeclaration',
+                                                           'EnumDeclaration', 'AnnotationTypeDeclaration')],
+                         self.get_constants(kind, field_declarations))
+
+    def get_constants(self, kind, field_declarations):
+        constants = {}
+        for field_declaration in field_declarations:
+            modifiers = [modifier for modifier in field_declaration.modifiers
+                         if modifier.__class__.__name__ != 'Annotation']
+            if not is_string_constant(kind, modifiers, self.type_name(field_declaration.type)):
+                continue
+            for declarator in field_declaration.variable_declarators:
+                if declarator.initializer is not None:
+                    # Constants that cannot be evaluated simply stay unresolved where they are used
+                    try:
+                        constants[declarator.variable.name] = self.evaluate(declarator.initializer)
+                    except Exception:
+                        pass
+        return constants
+
+    def convert_field(self, field_declaration):
+        modifiers, annotations = self.split_modifiers(field_declaration.modifiers)
+        return JavaField(self.type_name(field_declaration.type),
+                         [declarator.variable.name for declarator in field_declaration.variable_declarators],
+                         modifiers, annotations)
+
+    def split_modifiers(self, modifiers):
+        # plyj keeps annotations in the modifier list
+        annotations = []
+        keywords = []
+        for modifier in modifiers:
+            if modifier.__class__.__name__ == 'Annotation':
+                expression = modifier.members if modifier.members else modifier.single_member
+                annotations.append(create_annotation(modifier.name.value, expression, self.evaluate))
+            else:
+                keywords.append(modifier)
+        return sort_modifiers(keywords), annotations
+
+    def type_name(self, type_reference):
+        # Primitive types are plain strings
+        if not hasattr(type_reference, 'name'):
+            return type_reference
+        return type_reference.name.value if hasattr(type_reference.name, 'value') else type_reference.name
+
+    def evaluate(self, expression):
+        return evaluate_expression(expression, self.expand)
+
+    def expand(self, expression):
+        expression_type = expression.__class__.__name__
+        if expression_type == 'Literal':
+            # strip opening and closing double quotes
+            return 'text', expression.value[1:-1]
+        elif expression_type == 'Additive' and expression.operator == '+':
+            return 'operands', [expression.lhs, expression.rhs]
+        elif expression_type == 'Name':
+            # Same shape as a javalang member reference: qualifier.member
+            qualifier, separator, member = expression.value.rpartition('.')
+            return 'reference', (qualifier, member)
+        elif expression_type == 'list':
+            # Assumed to be AnnotationMember where element of interest is the value
+            return 'operands', [expression[0].value]
+        raise Exception('Unsupported annotation operation: ' + expression_type)
+
+
+def create_backend(name=DEFAULT_BACKEND, table_dir=None):
+    if name == 'javalang':
+        return JavalangBackend(table_dir)
+    elif name == 'plyj':
+        return PlyjBackend(table_dir)
+    raise Exception('Unknown parser backend "' + name + '", expected one of: ' + ', '.join(BACKENDS))
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# A validation run is a chain of generator stages: discover -> read -> parse -> extract -> pair -> compare. Reading is
+# the only stage that waits on the disk, so it runs ahead of the others on a few threads; everything else runs in the
+# calling thread (or in the worker processes of --jobs) and pulls one file at a time from the stage before it.
+
+import threading
+
+from bisect import bisect_left
+from profiling import clock
+
+try:
+    from queue import Full, Queue
+except ImportError:
+    from Queue import Full, Queue
+
+PIPELINE_STAGES = ['discover', 'read', 'parse', 'extract', 'pair', 'compare']
+
+# Profiler stages folded into each pipeline stage. Cache lookups and markdown parsing add to the time of their stage
+# but do not count as a file passing through it.
+PROFILER_STAGES = {'prefilter': 'read', 'read': 'read', 'java_parse': 'parse', 'cache': 'extract',
+                   'extract': 'extract', 'markdown': 'compare', 'compare': 'compare'}
+UNCOUNTED_STAGES = ['cache', 'markdown']
+
+# Profiler stages whose per file latencies are kept as histograms, and the upper bounds of their buckets in seconds.
+# The last bucket takes everything slower.
+HISTOGRAM_STAGES = ['java_parse', 'extract', 'markdown', 'compare']
+LATENCY_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+DEFAULT_READ_THREADS = 4
+DEFAULT_READ_AHEAD = 64
+# How often a feeder blocked on a full queue checks whether the consumer stopped
+FEED_POLL_SECONDS = 0.1
+
+
+class PipelineCounters(object):
+    # Files, bytes and busy seconds per pipeline stage. It takes the place of the stage profiler in the extraction
+    # and validation functions, so that the counters are kept on every run, and passes each sample on to the real
+    # profiler when --profile was given.
+
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+        self.items = dict((stage, 0) for stage in PIPELINE_STAGES)
+        self.bytes = dict((stage, 0) for stage in PIPELINE_STAGES)
+        self.seconds = dict((stage, 0.0) for stage in PIPELINE_STAGES)
+        self.read_waits = 0.0
+        # Samples per latency bucket and their total seconds, by histogram stage
+        self.histograms = dict((stage, [0] * (len(LATENCY_BUCKETS) + 1)) for stage in HISTOGRAM_STAGES)
+        self.histogram_seconds = dict((stage, 0.0) for stage in HISTOGRAM_STAGES)
+
+    def record(self, stage, file_path, start_time):
+        self.add_sample(stage, file_path, clock() - start_time)
+
+    def add_sample(self, stage, file_path, seconds, byte_count=0):
+        pipeline_stage = PROFILER_STAGES.get(stage, stage)
+        if stage not in UNCOUNTED_STAGES:
+            self.items[pipeline_stage] += 1
+        self.bytes[pipeline_stage] += byte_count
+        self.seconds[pipeline_stage] += seconds
+        if stage in self.histograms:
+            self.histograms[stage][bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self.histogram_seconds[stage] += seconds
+        if self.profiler:
+            self.profiler.samples.append((stage, file_path, seconds))
+
+    def count(self, stage, item_count, seconds):
+        # Stages that work on the whole run at once, like discovery
+        self.items[stage] += item_count
+        self.seconds[stage] += seconds
+
+    def counters(self):
+        return tuple([self.items[stage] for stage in PIPELINE_STAGES] +
+                     [self.bytes[stage] for stage in PIPELINE_STAGES] +
+                     [self.seconds[stage] for stage in PIPELINE_STAGES] + [self.read_waits] +
+                     [count for stage in HISTOGRAM_STAGES for count in self.histograms[stage]] +
+                     [self.histogram_seconds[stage] for stage in HISTOGRAM_STAGES])
+
+    def add_counters(self, counters):
+        stage_count = len(PIPELINE_STAGES)
+        for index, stage in enumerate(PIPELINE_STAGES):
+            self.items[stage] += counters[index]
+            self.bytes[stage] += counters[stage_count + index]
+            self.seconds[stage] += counters[2 * stage_count + index]
+        self.read_waits += counters[3 * stage_count]
+        offset = 3 * stage_count + 1
+        bucket_count = len(LATENCY_BUCKETS) + 1
+        for index, stage in enumerate(HISTOGRAM_STAGES):
+            histogram = self.histograms[stage]
+            for bucket in range(bucket_count):
+                histogram[bucket] += counters[offset + index * bucket_count + bucket]
+            self.histogram_seconds[stage] += counters[offset + len(HISTOGRAM_STAGES) * bucket_count + index]
+
+    def summary(self):
+        lines = ['Pipeline:', '%-10s %8s %10s %10s %10s' % ('stage', 'files', 'MiB', 'busy (s)', 'files/s')]
+        for stage in PIPELINE_STAGES:
+            seconds = self.seconds[stage]
+            lines.append('%-10s %8d %10.1f %10.3f %10s' %
+                         (stage, self.items[stage], self.bytes[stage] / 1048576.0, seconds,
+                          '%.1f' % (self.items[stage] / seconds) if seconds else '-'))
+        lines.append('Waited %.3fs for file reads.' % self.read_waits)
+        return '\n'.join(lines)
+
+
+class PendingRead(object):
+    __slots__ = ['path', 'done', 'result', 'error', 'seconds']
+
+    def __init__(self, path):
+        self.path = path
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.seconds = 0.0
+
+
+def read_ahead(paths, read, threads=DEFAULT_READ_THREADS, read_ahead_count=DEFAULT_READ_AHEAD, counters=None):
+    # Yields (path, read(path), error, seconds) in the order of paths. Up to read_ahead_count reads are queued or
+    # finished but not yet consumed; the feeder blocks on the bounded queue beyond that, so a slow consumer holds
+    # the readers back instead of letting file contents pile up in memory.
+    if threads <= 0:
+        for path in paths:
+            start_time = clock()
+            try:
+                yield path, read(path), None, clock() - start_time
+            except Exception as e:
+                yield path, None, e, clock() - start_time
+        return
+
+    pending = Queue(read_ahead_count)
+    work = Queue()
+    stopped = threading.Event()
+
+    def offer(item):
+        # A consumer that stopped early no longer drains the queue, so the feeder must not block on it for good: in
+        # the daemon that would leak a thread per aborted request
+        while not stopped.is_set():
+            try:
+                pending.put(item, timeout=FEED_POLL_SECONDS)
+                return True
+            except Full:
+                pass
+        return False
+
+    def feed():
+        for path in paths:
+            pending_read = PendingRead(path)
+            work.put(pending_read)
+            if not offer(pending_read):
+                break
+        for thread_index in range(threads):
+            work.put(None)
+        offer(None)
+
+    def read_files():
+        while True:
+            pending_read = work.get()
+            if pending_read is None:
+                return
+            if not stopped.is_set():
+                start_time = clock()
+                try:
+                    pending_read.result = read(pending_read.path)
+                except Exception as e:
+                    pending_read.error = e
+                pending_read.seconds = clock() - start_time
+            pending_read.done.set()
+
+    workers = [threading.Thread(target=feed)] + [threading.Thread(target=read_files) for index in range(threads)]
+    for worker in workers:
+        # A consumer that stops early must not keep the process alive
+        worker.daemon = True
+        worker.start()
+    try:
+        while True:
+            pending_read = pending.get()
+            if pending_read is None:
+                break
+            if not pending_read.done.is_set():
+                start_time = clock()
+                pending_read.done.wait()
+                if counters is not None:
+                    counters.read_waits += clock() - start_time
+            yield pending_read.path, pending_read.result, pending_read.error, pending_read.seconds
+    finally:
+        # Unblock the feeder if the consumer stopped before the end
+        stopped.set()
+        while not pending.empty():
+            pending.get()
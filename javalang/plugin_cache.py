@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import os
+
+# Bump whenever the shape of the cached plugin model changes
+CACHE_FORMAT_VERSION = '5'
+DEFAULT_CACHE_DIR = '.plugin-parser-cache'
+RUN_MARKER = 'last-run'
+
+
+class PluginCache(object):
+    # Content-addressed store of extracted plugin models. Entries are keyed by a hash of the Java source plus the
+    # cache format and parser versions, so edited files and parser upgrades simply miss instead of going stale.
+
+    def __init__(self, cache_dir, parser_version):
+        self.cache_dir = cache_dir
+        self.version = CACHE_FORMAT_VERSION + ':' + parser_version
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, file_contents):
+        import hashlib
+        digest = hashlib.sha1(self.version.encode('utf-8'))
+        digest.update(file_contents)
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.json')
+
+    def get(self, key):
+        entry_path = self.entry_path(key)
+        try:
+            with open(entry_path, 'r') as entry_file:
+                entry = json.load(entry_file)
+        except (IOError, OSError, ValueError):
+            self.misses += 1
+            return False, None
+        # Refresh the modification time so prune() can tell which entries are still in use
+        try:
+            os.utime(entry_path, None)
+        except OSError:
+            pass
+        self.hits += 1
+        return True, entry['model']
+
+    def put(self, key, model):
+        entry_path = self.entry_path(key)
+        entry_dir = os.path.dirname(entry_path)
+        if not os.path.isdir(entry_dir):
+            try:
+                os.makedirs(entry_dir)
+            except OSError:
+                # Another worker may have created it first
+                if not os.path.isdir(entry_dir):
+                    raise
+        # Write to a temporary file and rename so concurrent workers never observe a partial entry
+        import tempfile
+        fd, temp_path = tempfile.mkstemp(dir=entry_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w') as entry_file:
+            json.dump({'model': model}, entry_file)
+        os.rename(temp_path, entry_path)
+
+    def mark_run_start(self):
+        # File timestamps come from a coarser clock than time.time(), so compare entries against a marker file
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+        marker_path = os.path.join(self.cache_dir, RUN_MARKER)
+        with open(marker_path, 'w'):
+            pass
+        return os.path.getmtime(marker_path)
+
+    def prune(self, unused_since):
+        removed = 0
+        for root_dir, sub_dirs, files in os.walk(self.cache_dir):
+            for filename in files:
+                if filename == RUN_MARKER and root_dir == self.cache_dir:
+                    continue
+                entry_path = os.path.join(root_dir, filename)
+                try:
+                    if os.path.getmtime(entry_path) < unused_since:
+                        os.remove(entry_path)
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+    def counters(self):
+        return self.hits, self.misses
+
+    def add_counters(self, counters):
+        self.hits += counters[0]
+        self.misses += counters[1]
+
+    def summary(self):
+        return 'Cache: ' + str(self.hits) + ' hits, ' + str(self.misses) + ' misses.'
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+# Thin client for "validate_plugin_docs.py --serve". It deliberately imports nothing but the standard library so
+# that a query costs a socket round trip instead of loading javalang and re-parsing the repository.
+
+import json
+import socket
+import sys
+
+from argparse import ArgumentParser
+
+REPORT_FORMATS = ['text', 'jsonl', 'junit', 'sarif']
+
+
+def setup_args():
+    parser = ArgumentParser(description='Query a running validate_plugin_docs.py --serve daemon')
+    parser.add_argument('--socket', required=True, help='The Unix socket the daemon listens on.')
+    parser.add_argument('--strict', action='store_true',
+                        help='Fail with the first inconsistency, like validate_plugin_docs.py --strict.')
+    parser.add_argument('--showdiff', action='store_true', help='Prints descriptions of markdown property ' +
+                                                                'inconsistencies to output.')
+    parser.add_argument('--max-findings', type=int, default=0, metavar='N',
+                        help='Stop once N findings were reported and fail, like validate_plugin_docs.py ' +
+                             '--max-findings (default: no limit).')
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='text',
+                        help='Output format for findings (default: text).')
+    parser.add_argument('--output', metavar='FILE', help='Write findings to FILE instead of stdout.')
+    commands = parser.add_mutually_exclusive_group()
+    commands.add_argument('--status', action='store_true', help='Print the state of the daemon.')
+    commands.add_argument('--shutdown', action='store_true', help='Stop the daemon.')
+    args = parser.parse_args()
+    if args.max_findings < 0:
+        parser.error('--max-findings cannot be negative')
+    return args
+
+
+def send_request(socket_path, request):
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        connection.connect(socket_path)
+        connection.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        chunks = []
+        while True:
+            chunk = connection.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        connection.close()
+    return json.loads(b''.join(chunks).decode('utf-8'))
+
+
+def main():
+    args = setup_args()
+    if args.status:
+        request = {'command': 'status'}
+    elif args.shutdown:
+        request = {'command': 'shutdown'}
+    else:
+        request = {'command': 'validate', 'format': args.format, 'strict': args.strict, 'showdiff': args.showdiff,
+                   'max_findings': args.max_findings}
+    response = send_request(args.socket, request)
+
+    if 'output' not in response:
+        if response.get('error'):
+            sys.stderr.write(response['error'] + '\n')
+            sys.exit(1)
+        print(json.dumps(response, indent=2, sort_keys=True))
+        return
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(response['output'])
+    else:
+        sys.stdout.write(response['output'])
+    sys.stderr.write(response['notes'])
+    if response['error']:
+        sys.stderr.write(response['error'] + '\n')
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from constant_values import parts_from_state, parts_to_state
+
+# Compact records of what validation needs from a Java file. One FileModel is kept per file for the whole run, so
+# the records use __slots__, tuples instead of dicts, and share one copy of every property and annotation name.
+
+INTERNED_NAMES = {}
+
+
+def intern_name(name):
+    # Works for the unicode names javalang produces on Python 2, which the intern() builtin rejects
+    return INTERNED_NAMES.setdefault(name, name)
+
+
+class SlottedRecord(object):
+    __slots__ = []
+
+    def __getstate__(self):
+        return [getattr(self, name) for name in self.__slots__]
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __eq__(self, other):
+        return self.__class__ is other.__class__ and self.__getstate__() == other.__getstate__()
+
+    def __ne__(self, other):
+        return not self == other
+
+
+class ClassRecord(SlottedRecord):
+    # fields is None for classes that do not look like configs, otherwise a tuple of
+    # (property name, ((annotation name, value), ...)) pairs, where values that still reference constants of other
+    # files are tuples of parts. error holds a failure to evaluate the fields, raised only when a plugin actually
+    # uses the class.
+    __slots__ = ['name', 'extends', 'fields', 'error']
+
+    def __init__(self, name, extends, fields=None, error=None):
+        self.name = intern_name(name)
+        self.extends = intern_name(extends) if extends else None
+        self.fields = fields
+        self.error = error
+
+    def resolved_fields(self, resolve_value):
+        if self.error is not None:
+            raise Exception(self.error)
+        return tuple((name, tuple((annotation, resolve_value(value)) for annotation, value in annotations))
+                     for name, annotations in self.fields or ())
+
+    def to_state(self):
+        fields = None
+        if self.fields is not None:
+            fields = [[name, [[annotation, parts_to_state(value)] for annotation, value in annotations]]
+                      for name, annotations in self.fields]
+        return [self.name, self.extends, fields, self.error]
+
+    @classmethod
+    def from_state(cls, state):
+        name, extends, fields, error = state
+        if fields is not None:
+            fields = compact_fields((property_name, [(annotation, parts_from_state(value))
+                                                     for annotation, value in annotations])
+                                    for property_name, annotations in fields)
+        return cls(name, extends, fields, error)
+
+
+class PluginRecord(SlottedRecord):
+    # config_class names a nested config class; otherwise field_types lists the candidates declared elsewhere. name
+    # and type are tuples of parts while they reference constants of other files, like the values of ClassRecord.
+    __slots__ = ['class_name', 'name', 'type', 'config_class', 'field_types']
+
+    def __init__(self, class_name, name, plugin_type, config_class, field_types):
+        self.class_name = class_name
+        self.name = name
+        self.type = intern_name(plugin_type)
+        self.config_class = intern_name(config_class) if config_class else None
+        self.field_types = tuple(intern_name(field_type) for field_type in field_types)
+
+    def to_state(self):
+        return [self.class_name, parts_to_state(self.name), parts_to_state(self.type), self.config_class,
+                list(self.field_types)]
+
+    @classmethod
+    def from_state(cls, state):
+        class_name, name, plugin_type, config_class, field_types = state
+        return cls(class_name, parts_from_state(name), parts_from_state(plugin_type), config_class, field_types)
+
+
+class FileModel(SlottedRecord):
+    # constants is a tuple of (class name, ((constant name, parts), ...)) for the classes declaring String constants
+    __slots__ = ['classes', 'plugin', 'constants']
+
+    def __init__(self, classes, plugin, constants=()):
+        self.classes = tuple(classes)
+        self.plugin = plugin
+        self.constants = tuple(constants)
+
+    def unresolved_classes(self):
+        # Simple names of the classes declaring constants that the file references but could not resolve itself
+        values = [value for class_record in self.classes for name, annotations in class_record.fields or ()
+                  for annotation, value in annotations]
+        values += [parts for class_name, constants in self.constants for name, parts in constants]
+        if self.plugin is not None:
+            values += [self.plugin.name, self.plugin.type]
+        return set(part[0][part[0].rfind('.') + 1:] for value in values if isinstance(value, tuple)
+                   for part in value if isinstance(part, tuple) and part[0])
+
+    def to_state(self):
+        return [[class_record.to_state() for class_record in self.classes],
+                self.plugin.to_state() if self.plugin is not None else None,
+                [[class_name, [[name, parts_to_state(parts)] for name, parts in constants]]
+                 for class_name, constants in self.constants]]
+
+    @classmethod
+    def from_state(cls, state):
+        classes, plugin, constants = state
+        return cls([ClassRecord.from_state(class_state) for class_state in classes],
+                   PluginRecord.from_state(plugin) if plugin is not None else None,
+                   [(class_name, tuple((name, parts_from_state(parts)) for name, parts in class_constants))
+                    for class_name, class_constants in constants])
+
+
+def compact_fields(config_properties):
+    # Turns (property name, [(annotation name, value), ...]) pairs into the nested tuples stored in
+    # ClassRecord.fields, keeping declaration order so that rebuilt dicts iterate like the original ones
+    return tuple((intern_name(name), tuple((intern_name(annotation), value) for annotation, value in annotations))
+                 for name, annotations in config_properties)
+
+
+def merge_config_layers(config_layers):
+    # Builds the property dict of a config from the resolved fields of its classes, base class first. Plugin models
+    # carry the layers rather than the dict so that the --jobs workers rebuild it with the same updates, and iterate
+    # it in the same order, as the parent process.
+    config_properties = {}
+    for fields in config_layers:
+        config_properties.update(dict((name, dict(annotations)) for name, annotations in fields))
+    return config_properties
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import mmap
+import os
+import re
+
+# Only plugin classes and the classes of a config hierarchy contribute to the class index, so any file that neither
+# carries @Plugin nor declares or extends a class whose name ends in "Config" can be skipped without changing the
+# validation results
+CONFIG_CLASS_PATTERN = re.compile(br'@Plugin\b|\bclass\s+\w*Config\b|\bextends\s+[\w.]*Config\b')
+MMAP_THRESHOLD = 1024 * 1024
+
+
+class PluginPreFilter(object):
+    # Cheap byte-level scan run before javalang so that tests, utilities and other non-plugin classes are never
+    # fully parsed
+
+    def __init__(self):
+        self.scanned = 0
+        self.skipped = 0
+
+    def scan(self, file_path):
+        # Returns whether the file may hold a plugin, plus its contents when they were read whole
+        is_candidate, file_contents = scan_file(file_path)
+        self.count(is_candidate)
+        return is_candidate, file_contents
+
+    def count(self, is_candidate):
+        # Files scanned by scan_file() on another thread are counted by the thread that owns the pre-filter
+        self.scanned += 1
+        if not is_candidate:
+            self.skipped += 1
+
+    def counters(self):
+        return self.scanned, self.skipped
+
+    def add_counters(self, counters):
+        self.scanned += counters[0]
+        self.skipped += counters[1]
+
+    def summary(self):
+        return 'Pre-filter: skipped ' + str(self.skipped) + ' of ' + str(self.scanned) + ' Java files.'
+
+
+def scan_file(file_path):
+    # Keeps no state, so that reader threads can scan files concurrently
+    with open(file_path, 'rb') as java_file:
+        file_size = os.fstat(java_file.fileno()).st_size
+        if file_size >= MMAP_THRESHOLD:
+            mapped_file = mmap.mmap(java_file.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                is_candidate = CONFIG_CLASS_PATTERN.search(mapped_file) is not None
+            finally:
+                mapped_file.close()
+            file_contents = None
+        else:
+            file_contents = java_file.read()
+            is_candidate = CONFIG_CLASS_PATTERN.search(file_contents) is not None
+    return is_candidate, file_contents
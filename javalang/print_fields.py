@@ -1,72 +1,170 @@
-#!/usr/bin/env python2
+#!/usr/bin/env python
 
 import ParserExceptions
-import javalang
+import json
+import os
 import sys
 
-
-def parse_file():
-    with open(sys.argv[1], 'r') as java_file:
-        file_contents = java_file.read()
-    tree = javalang.parse.parse(file_contents)
-    if len(tree.types) is 0:
-        raise ParserExceptions.ClassNotFoundException('Unable to find Java class in ' + sys.argv[1])
+from argparse import ArgumentParser
+from discovery import JavaFileDiscovery
+from itertools import chain
+from parser_backends import BACKENDS, DEFAULT_BACKEND, create_backend
+
+
+def setup_args(argv=None):
+    parser = ArgumentParser(description='Print the signature and annotated fields of Java classes')
+    parser.add_argument('paths', nargs='*', metavar='PATH',
+                        help='Java (.java) files, or directories to search for Java files.')
+    parser.add_argument('--stdin', action='store_true', help='Also read newline separated paths from stdin.')
+    parser.add_argument('--ndjson', action='store_true',
+                        help='Write one JSON object per class (and per failed file) instead of text.')
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help='Java parser to use (default: ' + DEFAULT_BACKEND + ').')
+    parser.add_argument('--imports', action='store_true', help='Also print the imports of the file.')
+    args = parser.parse_args(argv)
+    if not args.paths and not args.stdin:
+        parser.error('no Java files given')
+    return args
+
+
+def parse_file(file_path, backend):
+    with open(file_path, 'rb') as java_file:
+        file_contents = java_file.read().decode('utf-8')
+    tree = backend.parse(file_path, file_contents)
+    if len(tree.types) == 0:
+        raise ParserExceptions.ClassNotFoundException('Unable to find Java class in ' + file_path)
     return tree
 
 
 def get_class_signature(class_declaration):
     class_signature = class_declaration.name
     if class_declaration.extends is not None:
-        class_signature += ' extends ' + class_declaration.extends.name
-    if class_declaration.implements is not None:
-        class_signature += ' implements ' + ', '.join([interface.name for interface in class_declaration.implements])
+        class_signature += ' extends ' + class_declaration.extends
+    if class_declaration.implements:
+        class_signature += ' implements ' + ', '.join(class_declaration.implements)
     return class_signature
 
 
-def reconstruct_argument(argument_piece):
-    if argument_piece.__class__.__name__ is 'Literal':
-        return argument_piece.value[1:-1]  #strip opening and closing double quotes
-    elif argument_piece.__class__.__name__ is not 'BinaryOperation':
-        raise ParserExceptions.UnsupportedAnnotationOperationException('UNSUPPORTED ANNOTATION OPERATION: '
-                                                                       + argument_piece.__class__.__name__)
-    else:
-        return reconstruct_argument(argument_piece.operandl) + reconstruct_argument(argument_piece.operandr)
-
-
-def get_annotation_argument(children):
-    if children[1] is None:
+def get_annotation_argument(annotation):
+    if annotation.error is not None:
+        raise ParserExceptions.UnsupportedAnnotationOperationException('UNSUPPORTED ANNOTATION OPERATION: ' +
+                                                                       annotation.error)
+    if not annotation.argument:
         return ''
     else:
-        return '("' + reconstruct_argument(children[1]) + '")'  # children[1] is the first argument
+        return '("' + annotation.argument + '")'
 
 
 def get_annotation_string(annotation):
-    return annotation.name + get_annotation_argument(annotation.children)
+    return annotation.name + get_annotation_argument(annotation)
 
 
-def get_field_string(field_declaration):
-    field_string = ' '.join([modifier for modifier in field_declaration.modifiers]) + ' '
-    field_string += field_declaration.type.name + ' ' + field_declaration.declarators[0].name
+def get_field_string(field_declaration, field_name):
+    field_string = ' '.join(field_declaration.modifiers + [field_declaration.type, field_name])
     return field_string
 
 
-def main():
-    # Parse the Java file
-    tree = parse_file()
+def get_annotation_record(annotation):
+    if annotation.error is not None:
+        return {'name': annotation.name, 'error': annotation.error}
+    return {'name': annotation.name, 'argument': annotation.argument}
+
+
+def get_class_records(file_path, tree, class_declaration, outer_name=None):
+    # One record per class, nested classes following their outer class under a dotted name
+    class_name = outer_name + '.' + class_declaration.name if outer_name else class_declaration.name
+    fields = []
+    for field_declaration in class_declaration.fields:
+        for field_name in field_declaration.names:
+            fields.append({'name': field_name, 'type': field_declaration.type,
+                           'modifiers': field_declaration.modifiers,
+                           'annotations': [get_annotation_record(annotation)
+                                           for annotation in field_declaration.annotations]})
+    records = [{'file': file_path, 'package': tree.package, 'class': class_name, 'kind': class_declaration.kind,
+                'signature': get_class_signature(class_declaration), 'imports': tree.imports,
+                'annotations': [get_annotation_record(annotation) for annotation in class_declaration.annotations],
+                'fields': fields}]
+    for nested_class in class_declaration.classes:
+        records += get_class_records(file_path, tree, nested_class, class_name)
+    return records
+
+
+def get_class_lines(tree, print_imports):
+    lines = []
+
+    # Imports
+    if print_imports:
+        for imported in tree.imports:
+            lines.append('import ' + imported + ';')
+        lines.append('')
 
     # Get class information
     class_declaration = tree.types[0]
 
-    # Print class information
-    print(get_class_signature(class_declaration))
-    print
+    # Class information
+    lines.append(get_class_signature(class_declaration))
+    lines.append('')
 
-    # Print fields
+    # Fields
     for field_declaration in class_declaration.fields:
-        for annotation in field_declaration.annotations:
-            print('\t@' + get_annotation_string(annotation))
-        print('\t' + get_field_string(field_declaration))
-        print
+        for field_name in field_declaration.names:
+            for annotation in field_declaration.annotations:
+                lines.append('\t@' + get_annotation_string(annotation))
+            lines.append('\t' + get_field_string(field_declaration, field_name))
+            lines.append('')
+    return lines
+
+
+def iterate_paths(args):
+    # Paths are expanded lazily so that a long list on stdin starts producing output right away
+    discovery = JavaFileDiscovery()
+    paths = iter(args.paths)
+    if args.stdin:
+        paths = chain(paths, (line.strip() for line in sys.stdin))
+    for path in paths:
+        if not path:
+            continue
+        if os.path.isdir(path):
+            for file_path in discovery.find_java_files(path):
+                yield file_path
+        else:
+            yield path
+
+
+def main(argv=None):
+    args = setup_args(argv)
+    backend = create_backend(args.backend)
+    failures = 0
+    printed = 0
+
+    show_paths = len(args.paths) != 1 or args.stdin or os.path.isdir(args.paths[0])
+    for file_path in iterate_paths(args):
+        # Failures are reported per file so that one bad file does not abort the batch
+        try:
+            tree = parse_file(file_path, backend)
+            if args.ndjson:
+                output = ''.join(json.dumps(record, sort_keys=True) + '\n'
+                                 for class_declaration in tree.types
+                                 for record in get_class_records(file_path, tree, class_declaration))
+            else:
+                lines = get_class_lines(tree, args.imports)
+                if show_paths:
+                    lines.insert(0, '// ' + file_path)
+                if printed:
+                    lines.insert(0, '')
+                output = '\n'.join(lines) + '\n'
+            printed += 1
+        except Exception as e:
+            failures += 1
+            error = e.__class__.__name__ + ': ' + str(e)
+            if not args.ndjson:
+                sys.stderr.write(file_path + ': ' + error + '\n')
+                continue
+            output = json.dumps({'file': file_path, 'error': error}, sort_keys=True) + '\n'
+        sys.stdout.write(output)
+
+    if failures:
+        sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+from timeit import default_timer as clock
+
+# Stages of a run in the order they happen; startup is recorded once per process that builds a parser
+STAGES = ['startup', 'prefilter', 'read', 'cache', 'java_parse', 'extract', 'pair', 'markdown', 'compare']
+PERCENTILES = [50, 90, 99]
+
+
+class StageProfiler(object):
+    # Collects one (stage, file, seconds) sample per stage and file. Samples reach it through the pipeline counters,
+    # which keep only per stage totals when no profiler was requested.
+
+    def __init__(self):
+        self.samples = []
+
+    def record(self, stage, file_path, start_time):
+        self.samples.append((stage, file_path, clock() - start_time))
+
+    def take_samples(self):
+        samples = self.samples
+        self.samples = []
+        return samples
+
+    def add_samples(self, samples):
+        self.samples.extend(samples)
+
+    def summary(self, top_count=5):
+        by_stage = {}
+        for stage, file_path, seconds in self.samples:
+            by_stage.setdefault(stage, []).append((seconds, file_path))
+
+        lines = ['Profile:', '%-12s %8s %10s %10s %10s %10s %10s' % ('stage', 'files', 'total (s)', 'p50 (ms)',
+                                                                    'p90 (ms)', 'p99 (ms)', 'max (ms)')]
+        stages = [stage for stage in STAGES if stage in by_stage] + sorted(set(by_stage) - set(STAGES))
+        for stage in stages:
+            timings = sorted(by_stage[stage])
+            total = sum(seconds for seconds, file_path in timings)
+            lines.append('%-12s %8d %10.3f ' % (stage, len(timings), total) +
+                         ' '.join('%10.3f' % (percentile(timings, rank) * 1000) for rank in PERCENTILES) +
+                         ' %10.3f' % (timings[-1][0] * 1000))
+        for stage in stages:
+            lines.append('Slowest files for ' + stage + ':')
+            for seconds, file_path in sorted(by_stage[stage], reverse=True)[:top_count]:
+                lines.append('  %10.3f ms  %s' % (seconds * 1000, file_path))
+        return '\n'.join(lines)
+
+
+def percentile(sorted_timings, rank):
+    # Nearest-rank percentile over (seconds, file) pairs sorted by seconds
+    index = max(0, min(len(sorted_timings) - 1, int(round(rank / 100.0 * len(sorted_timings))) - 1))
+    return sorted_timings[index][0]
@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import os
+import sys
+
+REPORT_FORMATS = ['text', 'jsonl', 'junit', 'sarif', 'events']
+WRITE_BUFFER_SIZE = 64 * 1024
+TOOL_NAME = 'validate_plugin_docs'
+
+# Rule ids attached to every finding, with the short description published in SARIF output
+RULES = {
+    'markdown-file-missing': 'The markdown file for the plugin could not be found.',
+    'properties-section-missing': 'The markdown file has no properties section.',
+    'example-section-missing': 'The markdown file has no example section.',
+    'example-before-properties': 'The example section comes before the properties section.',
+    'property-not-documented': 'A config property is not present in the markdown file.',
+    'property-not-in-config': 'A documented property is not present in the config class.',
+    'config-description-missing': 'A config property has no @Description.',
+    'markdown-description-missing': 'A documented property has no description.',
+    'description-mismatch': 'The markdown description does not begin with the @Description text.',
+    'orphan-doc': 'A markdown file in a docs directory is not used by any plugin.',
+    'file-quarantined': 'A Java file failed to parse, or exceeded its time or memory budget, and was skipped.'
+}
+
+
+class Finding(object):
+    __slots__ = ['rule', 'severity', 'message', 'file', 'plugin', 'plugin_type', 'class_name', 'property', 'details']
+
+    def __init__(self, rule, severity, message, file_path, plugin, plugin_type, class_name, property_name=None,
+                 details=None):
+        self.rule = rule
+        self.severity = severity
+        self.message = message
+        self.file = file_path
+        self.plugin = plugin
+        self.plugin_type = plugin_type
+        self.class_name = class_name
+        self.property = property_name
+        self.details = details
+
+    def __getstate__(self):
+        return [getattr(self, name) for name in self.__slots__]
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def to_dict(self):
+        finding = dict((name, getattr(self, name)) for name in self.__slots__)
+        if finding['details'] is None:
+            del finding['details']
+        return finding
+
+    @classmethod
+    def from_dict(cls, finding):
+        return cls(finding['rule'], finding['severity'], finding['message'], finding['file'], finding['plugin'],
+                   finding['plugin_type'], finding['class_name'], finding['property'], finding.get('details'))
+
+
+class BufferedOutput(object):
+    # Collects small writes and hands them to the underlying stream in large blocks
+
+    def __init__(self, stream, buffer_size=WRITE_BUFFER_SIZE, owns_stream=False):
+        self.stream = stream
+        self.owns_stream = owns_stream
+        self.buffer_size = buffer_size
+        self.chunks = []
+        self.buffered = 0
+
+    def write(self, text):
+        self.chunks.append(text)
+        self.buffered += len(text)
+        if self.buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self.chunks:
+            text = ''.join(self.chunks)
+            if not isinstance(text, str):
+                # Python 2 streams take bytes, and findings quote Java and markdown text decoded as UTF-8
+                text = text.encode('utf-8')
+            self.stream.write(text)
+            self.chunks = []
+            self.buffered = 0
+        self.stream.flush()
+
+    def close(self):
+        self.flush()
+        if self.owns_stream:
+            self.stream.close()
+
+
+class Reporter(object):
+    # Receives the events of a validation run in path order. Subclasses render them to their own format.
+
+    def __init__(self, output):
+        self.output = output
+        self.note_output = sys.stderr
+        self.plugin = None
+
+    def begin_shard(self, shard_index, shard_count):
+        pass
+
+    def begin_plugin(self, plugin_path, class_name, plugin_name, plugin_type, markdown_path):
+        self.plugin = {'path': plugin_path, 'class_name': class_name, 'name': plugin_name, 'type': plugin_type,
+                       'markdown_path': markdown_path}
+
+    def finding(self, finding):
+        pass
+
+    def end_plugin(self):
+        self.plugin = None
+
+    def note(self, text):
+        # Run statistics go to stderr so that structured output stays machine readable
+        self.note_output.write(text + '\n')
+
+    def run_failed(self, message):
+        pass
+
+    def close(self):
+        self.output.close()
+
+
+class TextReporter(Reporter):
+    # The original human readable console output
+
+    def __init__(self, output, showdiff=False):
+        Reporter.__init__(self, output)
+        self.showdiff = showdiff
+
+    def begin_plugin(self, plugin_path, class_name, plugin_name, plugin_type, markdown_path):
+        Reporter.begin_plugin(self, plugin_path, class_name, plugin_name, plugin_type, markdown_path)
+        header = 'Validating ' + class_name + ' against ' + os.path.basename(markdown_path)
+        self.output.write('=' * len(header) + '\n' + header + '\n' + '=' * len(header) + '\n\n')
+
+    def finding(self, finding):
+        # In strict mode the raised exception carries the message instead
+        if finding.severity == 'error':
+            return
+        self.output.write('WARNING: ' + finding.message + '\n\n')
+        if self.showdiff and finding.details:
+            # A word diff when the descriptions are close enough to align, both of them in full otherwise
+            if finding.details.get('word_diff') is not None:
+                self.output.write('\t* Diff:\t' + finding.details['word_diff'] + '\n\n')
+            else:
+                self.output.write('\t* Plugin:\t' + finding.details['plugin_description'] + '\n')
+                self.output.write('\t* Markdown:\t' + finding.details['markdown_description'] + '\n\n')
+
+    def end_plugin(self):
+        Reporter.end_plugin(self)
+        self.output.write('Done.\n\n')
+
+    def note(self, text):
+        self.output.write(text + '\n')
+
+
+class JsonLinesReporter(Reporter):
+    # One JSON object per finding
+
+    def finding(self, finding):
+        self.output.write(json.dumps(finding.to_dict(), sort_keys=True) + '\n')
+
+
+class EventsReporter(Reporter):
+    # Every event of the run, one JSON object per line, including whether the run failed and whether it finished.
+    # This is what the shards of a --shard run write for merge_shard_reports.py, which replays the events of all
+    # shards in path order into any other format.
+
+    def write_event(self, event):
+        self.output.write(json.dumps(event, sort_keys=True) + '\n')
+
+    def begin_shard(self, shard_index, shard_count):
+        self.write_event({'event': 'shard', 'index': shard_index, 'count': shard_count})
+
+    def begin_plugin(self, plugin_path, class_name, plugin_name, plugin_type, markdown_path):
+        Reporter.begin_plugin(self, plugin_path, class_name, plugin_name, plugin_type, markdown_path)
+        self.write_event({'event': 'begin_plugin', 'plugin': self.plugin})
+
+    def finding(self, finding):
+        self.write_event({'event': 'finding', 'finding': finding.to_dict()})
+
+    def end_plugin(self):
+        Reporter.end_plugin(self)
+        self.write_event({'event': 'end_plugin'})
+
+    def run_failed(self, message):
+        self.write_event({'event': 'failed', 'message': message})
+
+    def close(self):
+        self.write_event({'event': 'end'})
+        Reporter.close(self)
+
+
+class JUnitReporter(Reporter):
+    # Every validated plugin is a passing test case and every finding a failing one, so the document can be written
+    # incrementally without knowing the totals up front
+
+    def __init__(self, output):
+        Reporter.__init__(self, output)
+        # xml.sax pulls in urllib on Python 3, so only the junit format pays for importing it
+        from xml.sax.saxutils import escape, quoteattr
+        self.escape = escape
+        self.quoteattr = quoteattr
+        self.output.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n<testsuite name=' +
+                          self.quoteattr(TOOL_NAME) + '>\n')
+
+    def begin_plugin(self, plugin_path, class_name, plugin_name, plugin_type, markdown_path):
+        Reporter.begin_plugin(self, plugin_path, class_name, plugin_name, plugin_type, markdown_path)
+        self.output.write('<testcase classname=' + self.quoteattr(class_name) + ' name="validate" file=' +
+                          self.quoteattr(plugin_path) + '/>\n')
+
+    def finding(self, finding):
+        name = finding.rule + (' ' + finding.property if finding.property else '')
+        # Findings about a markdown file alone, like orphan docs, have no class
+        self.output.write('<testcase classname=' + self.quoteattr(finding.class_name or finding.file) + ' name=' +
+                          self.quoteattr(name) + ' file=' + self.quoteattr(finding.file) + '><failure type=' +
+                          self.quoteattr(finding.rule) + ' message=' + self.quoteattr(finding.message) + '>' +
+                          self.escape(finding.message) + '</failure></testcase>\n')
+
+    def close(self):
+        self.output.write('</testsuite>\n</testsuites>\n')
+        Reporter.close(self)
+
+
+class SarifReporter(Reporter):
+    # SARIF 2.1.0 log whose results array is streamed as findings arrive
+
+    def __init__(self, output):
+        Reporter.__init__(self, output)
+        self.results = 0
+        rules = [{'id': rule, 'shortDescription': {'text': RULES[rule]}} for rule in sorted(RULES)]
+        header = json.dumps({
+            'version': '2.1.0',
+            '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+            'runs': [{'tool': {'driver': {'name': TOOL_NAME, 'rules': rules}}, 'results': []}]
+        }, sort_keys=True)
+        # Split the skeleton at the empty results array so results can be written between the two halves
+        split_index = header.index('"results": []') + len('"results": [')
+        self.output.write(header[:split_index])
+        self.footer = header[split_index:] + '\n'
+
+    def finding(self, finding):
+        result = {
+            'ruleId': finding.rule,
+            'level': finding.severity,
+            'message': {'text': finding.message},
+            'locations': [{'physicalLocation': {'artifactLocation': {'uri': finding.file}}}],
+            'properties': {'plugin': finding.plugin, 'pluginType': finding.plugin_type,
+                           'className': finding.class_name, 'property': finding.property}
+        }
+        if finding.details:
+            result['properties'].update(finding.details)
+        self.output.write((',' if self.results else '') + '\n' + json.dumps(result, sort_keys=True))
+        self.results += 1
+
+    def close(self):
+        self.output.write(self.footer)
+        Reporter.close(self)
+
+
+class RecordingReporter(Reporter):
+    # Records events in a worker process so the parent can replay them into its reporter in path order
+
+    def __init__(self):
+        Reporter.__init__(self, None)
+        self.events = []
+
+    def begin_plugin(self, plugin_path, class_name, plugin_name, plugin_type, markdown_path):
+        Reporter.begin_plugin(self, plugin_path, class_name, plugin_name, plugin_type, markdown_path)
+        self.events.append(('begin_plugin', (plugin_path, class_name, plugin_name, plugin_type, markdown_path)))
+
+    def finding(self, finding):
+        self.events.append(('finding', (finding,)))
+
+    def end_plugin(self):
+        Reporter.end_plugin(self)
+        self.events.append(('end_plugin', ()))
+
+    def note(self, text):
+        self.events.append(('note', (text,)))
+
+    def take_events(self):
+        events = self.events
+        self.events = []
+        return events
+
+
+class CountingReporter(Reporter):
+    # Passes every event on to another reporter, counting validated plugins and findings by rule for the metrics of
+    # the run and --max-findings
+
+    def __init__(self, reporter):
+        Reporter.__init__(self, reporter.output)
+        self.reporter = reporter
+        self.plugins = 0
+        self.findings = {}
+        self.finding_count = 0
+
+    def begin_shard(self, shard_index, shard_count):
+        self.reporter.begin_shard(shard_index, shard_count)
+
+    def begin_plugin(self, plugin_path, class_name, plugin_name, plugin_type, markdown_path):
+        Reporter.begin_plugin(self, plugin_path, class_name, plugin_name, plugin_type, markdown_path)
+        self.plugins += 1
+        self.reporter.begin_plugin(plugin_path, class_name, plugin_name, plugin_type, markdown_path)
+
+    def finding(self, finding):
+        self.findings[finding.rule] = self.findings.get(finding.rule, 0) + 1
+        self.finding_count += 1
+        self.reporter.finding(finding)
+
+    def end_plugin(self):
+        Reporter.end_plugin(self)
+        self.reporter.end_plugin()
+
+    def note(self, text):
+        self.reporter.note(text)
+
+    def run_failed(self, message):
+        self.reporter.run_failed(message)
+
+    def close(self):
+        self.reporter.close()
+
+
+def replay(events, reporter):
+    for method_name, event_args in events:
+        getattr(reporter, method_name)(*event_args)
+
+
+def create_reporter(report_format, output_path=None, showdiff=False, stream=None):
+    if output_path:
+        output = BufferedOutput(open(output_path, 'w'), owns_stream=True)
+    else:
+        output = BufferedOutput(stream or sys.stdout)
+    if report_format == 'jsonl':
+        return JsonLinesReporter(output)
+    elif report_format == 'junit':
+        return JUnitReporter(output)
+    elif report_format == 'sarif':
+        return SarifReporter(output)
+    elif report_format == 'events':
+        return EventsReporter(output)
+    return TextReporter(output, showdiff)
@@ -16,19 +16,15 @@
 #  limitations under the License.
 
 
-import javalang
-import sys
+import io
 
 from argparse import ArgumentParser
-from BeautifulSoup import BeautifulSoup
-from markdown import markdown
+from description_text import markdown_to_text
+from markdown_properties import EXAMPLE_DELIMITERS, PROPERTIES_DELIMITERS, find_properties_section, \
+    parse_property_names_from_markdown
+from parser_backends import BACKENDS, DEFAULT_BACKEND, create_backend
 
 # Constants
-PROPERTIES_DELIMITER = 'Properties\n----------'
-PROPERTY_NAME_START = '**'
-PROPERTY_NAME_END = ':**'
-NEXT_PROPERTY_DELIMITER = '\n\n'
-EXAMPLE_DELIMITER = 'Example\n-------'
 TERMINAL_SUPERCLASS = 'PluginConfig'
 
 
@@ -40,96 +36,52 @@ def setup_args():
                         help='Causes the validator to throw an exception when encountering an inconsistency.')
     parser.add_argument('--showdiff', action='store_true', help='Prints descriptions of markdown property ' +
                                                                 'inconsistencies to output.')
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help='Java parser to use (default: ' + DEFAULT_BACKEND + ').')
     return parser.parse_args()
 
 
-def parse_file(config_class_file_path):
-    with open(config_class_file_path, 'r') as java_file:
-        file_contents = java_file.read()
-    tree = javalang.parse.parse(file_contents)
+def parse_file(config_class_file_path, backend):
+    with open(config_class_file_path, 'rb') as java_file:
+        file_contents = java_file.read().decode('utf-8')
+    tree = backend.parse(config_class_file_path, file_contents)
     if len(tree.types) == 0:
-        raise Exception('Class not found: Unable to find Java class in ' + sys.argv[1])
+        raise Exception('Class not found: Unable to find Java class in ' + config_class_file_path)
     return tree
 
 
-def get_class_signature(class_declaration):
-    class_signature = class_declaration.name
-    if class_declaration.extends is not None:
-        class_signature += ' extends ' + class_declaration.extends.name
-    if class_declaration.implements is not None:
-        class_signature += ' implements ' + ', '.join([interface.name for interface in class_declaration.implements])
-    return class_signature
-
-
-def reconstruct_argument(argument_piece):
-    if argument_piece.__class__.__name__ == 'Literal':
-        # strip opening and closing double quotes
-        return argument_piece.value[1:-1]
-    elif argument_piece.__class__.__name__ != 'BinaryOperation':
-        raise Exception('Unsupported annotation operation: ' + argument_piece.__class__.__name__)
-    else:
-        return reconstruct_argument(argument_piece.operandl) + reconstruct_argument(argument_piece.operandr)
-
-
-def get_annotation_argument(children):
-    if children[1] is None:
-        return ''
-    else:
-        return reconstruct_argument(children[1])  # children[1] is the first and assumed only argument
-
-
 def get_plugin_properties(class_declaration):
     plugin_properties = {}
     for field_declaration in class_declaration.fields:
         field_annotations = {}
         for annotation in field_declaration.annotations:
-            field_annotations[annotation.name] = get_annotation_argument(annotation.children)
-        plugin_properties[field_declaration.declarators[0].name] = field_annotations
+            field_annotations[annotation.name] = annotation.value()
+        plugin_properties[field_declaration.names[0]] = field_annotations
     return plugin_properties
 
 
-def parse_property_names_from_markdown(properties_section):
-    markdown_properties = {}
-
-    while properties_section:
-        # Find property name
-        name_start_index = properties_section.find(PROPERTY_NAME_START)
-        name_end_index = properties_section.find(PROPERTY_NAME_END)
-        if name_end_index is -1 or name_end_index is -1:
-            raise Exception('Unable to match valid property syntax: **propertyName:**')
-        property_name = properties_section[name_start_index + len(PROPERTY_NAME_START):name_end_index]
-
-        # Find property description
-        next_property_index = properties_section.find(NEXT_PROPERTY_DELIMITER)
-        property_description = properties_section[name_end_index + len(PROPERTY_NAME_END):next_property_index]
-        markdown_properties[property_name] = property_description
-
-        # Finish searching remainder of section
-        properties_section = properties_section[next_property_index + len(NEXT_PROPERTY_DELIMITER):]
-    return markdown_properties
-
-
 def parse_markdown_file(markdown_file_path):
     # Read file contents
-    with open(markdown_file_path, 'r') as markdown_file:
+    with io.open(markdown_file_path, encoding='utf-8', errors='replace') as markdown_file:
         file_contents = markdown_file.read()
 
     # Find property section
-    property_index = file_contents.find(PROPERTIES_DELIMITER)
-    example_index = file_contents.find(EXAMPLE_DELIMITER)
+    property_index, example_index, properties_section = find_properties_section(file_contents)
 
     markdown_filename = markdown_file_path[markdown_file_path.rfind('/') + 1:]
-    if property_index is -1:
+    if property_index == -1:
         raise Exception('Properties section not found: Unable to find property section in ' +
-                        markdown_filename + ' delimited by ' + PROPERTIES_DELIMITER + '.')
-    elif example_index is -1:
+                        markdown_filename + ' delimited by ' + ' or '.join(PROPERTIES_DELIMITERS) + '.')
+    elif example_index == -1:
         raise Exception('Example section not found: Unable to find example section in ' +
-                        markdown_filename + ' delimited by ' + EXAMPLE_DELIMITER + '.')
+                        markdown_filename + ' delimited by ' + ' or '.join(EXAMPLE_DELIMITERS) + '.')
     elif example_index < property_index:
         raise Exception('Example section found before properties section in ' + markdown_filename)
 
-    properties_section = file_contents[property_index + len(PROPERTIES_DELIMITER):example_index]
-    return parse_property_names_from_markdown(properties_section)
+    markdown_properties = parse_property_names_from_markdown(properties_section)
+    if properties_section.strip() and not markdown_properties:
+        raise Exception('Unable to match valid property syntax: **propertyName:**')
+    return markdown_properties
 
 
 def print_notice(strict, description):
@@ -137,7 +89,7 @@ def print_notice(strict, description):
         raise Exception('ERROR: ' + description)
     else:
         print('WARNING: ' + description)
-    print
+    print('')
 
 
 def validate_properties_present(config_filename, markdown_filename, plugin_properties, markdown_properties, args):
@@ -162,8 +114,7 @@ def validate_descriptions_match(config_filename, markdown_filename, plugin_prope
                              'class' + config_filename + '.')
             else:
                 # Strip markdown format from description
-                raw_markdown_description = markdown(markdown_properties[plugin_property])
-                markdown_description = ''.join(BeautifulSoup(raw_markdown_description).findAll(text=True))
+                markdown_description = markdown_to_text(markdown_properties[plugin_property])
                 if not markdown_description:
                     print_notice(args.strict, 'Property ' + plugin_property + ' has no description specified in ' +
                                  'markdown file ' + markdown_filename)
@@ -176,7 +127,7 @@ def validate_descriptions_match(config_filename, markdown_filename, plugin_prope
                     if args.showdiff:
                         print('\t* Plugin:\t' + plugin_description)
                         print('\t* Markdown:\t' + markdown_description)
-                        print
+                        print('')
 
 
 def main():
@@ -185,7 +136,7 @@ def main():
 
     # Parse the Java file
     config_class_file_path = args.plugin
-    tree = parse_file(config_class_file_path)
+    tree = parse_file(config_class_file_path, create_backend(args.backend))
 
     # Get class information
     class_declaration = tree.types[0]
@@ -16,15 +16,37 @@
 #  limitations under the License.
 
 
-import javalang
+import io
 import os
-
-from argparse import ArgumentParser
-from BeautifulSoup import BeautifulSoup
-from markdown import markdown
+import re
+
+from argparse import ArgumentParser, ArgumentTypeError
+from collections import deque
+from class_index import TERMINAL_SUPERCLASS, ClassIndex
+from constant_values import is_resolved
+from description_similarity import DEFAULT_SIMILARITY_THRESHOLD, compare_descriptions, word_limit
+from description_text import markdown_to_text
+from discovery import JavaFileDiscovery
+from docs_index import DocsIndex, documented_root
+from file_budget import DEFAULT_FILE_TIMEOUT, FileBudget, FileFailure, as_file_failure, memory_budget_supported
+from git_changes import git_changed_files, plugin_from_markdown_path
+from markdown_properties import EXAMPLE_DELIMITERS, PROPERTIES_DELIMITERS, find_properties_section, \
+    parse_property_names_from_markdown
+from metrics import RunMetrics
+from parser_backends import BACKENDS, DEFAULT_BACKEND, create_backend, simple_name
+from plugin_cache import DEFAULT_CACHE_DIR, PluginCache
+from pipeline import DEFAULT_READ_AHEAD, DEFAULT_READ_THREADS, PipelineCounters, read_ahead
+from plugin_model import ClassRecord, FileModel, PluginRecord, compact_fields, merge_config_layers
+from prefilter import PluginPreFilter, scan_file
+from profiling import StageProfiler, clock
+from reporters import REPORT_FORMATS, CountingReporter, Finding, RecordingReporter, create_reporter, replay
 
 # Plugin Constants
 IGNORED_FILES = ['package-info.java']
+# @Name annotations whose argument is not a string literal
+CONSTANT_NAME_ANNOTATION = re.compile(br'@Name\(\s*[^"\s]')
+# Quarantined files listed at the end of a run
+SLOWEST_QUARANTINED = 10
 
 # Redundant key-value pairs required because code is not consistent in how annotation arguments are specified
 PLUGIN_TYPES = {
@@ -59,63 +81,130 @@ PLUGIN_TYPES = {
     "postaction": "postaction"
 }
 
-# Markdown Constants
-PROPERTIES_DELIMITERS = ['Properties\n----------', 'Configuration\n-------------']
-PROPERTY_NAME_START = '**'
-PROPERTY_NAME_END = ':**'
-NEXT_PROPERTY_DELIMITER = '\n\n'
-EXAMPLE_DELIMITERS = ['Example\n-------', 'Examples\n--------']
-TERMINAL_SUPERCLASS = 'PluginConfig'
+# Field annotations that mark a class as holding plugin properties
+PROPERTY_ANNOTATIONS = ['Name', 'Description', 'Macro']
 
 
-def setup_args():
+def setup_args(argv=None):
     parser = ArgumentParser(description='Validate Hydrator Plugin Markdown Consistency')
     parser.add_argument('--path', help='The path to the Hydrator Plugins repository.')
     parser.add_argument('--strict', action='store_true',
                         help='Causes the validator to throw an exception when encountering an inconsistency.')
     parser.add_argument('--showdiff', action='store_true', help='Prints descriptions of markdown property ' +
                                                                 'inconsistencies to output.')
-    return parser.parse_args()
-
-
-def parse_file(config_class_file_path, class_filename):
-    with open(config_class_file_path, 'r') as java_file:
-        file_contents = java_file.read()
-    tree = javalang.parse.parse(file_contents)
-    if len(tree.types) == 0:
+    parser.add_argument('--similarity-threshold', type=float, metavar='SCORE',
+                        help='Only report description mismatches whose word similarity, from 0 to 1, is below SCORE; ' +
+                             '1 drops the mismatches only in case, punctuation or spacing (default: every mismatch ' +
+                             'is reported).')
+    parser.add_argument('--max-findings', type=int, default=0, metavar='N',
+                        help='Stop once N findings were reported: the plugin at hand is finished, the files still ' +
+                             'queued or in the --jobs workers are dropped, and the run writes its summary and exits ' +
+                             'with an error (default: no limit). Every --shard counts its own findings.')
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='text',
+                        help='Output format for findings (default: text).')
+    parser.add_argument('--output', metavar='FILE', help='Write findings to FILE instead of stdout.')
+    parser.add_argument('--cache', action='store_true',
+                        help='Reuse plugin models extracted from unchanged Java files across runs.')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help='Directory holding the plugin model cache (default: ' + DEFAULT_CACHE_DIR + ').')
+    parser.add_argument('--prune-cache', action='store_true',
+                        help='Remove cache entries that were not used by this run.')
+    changes = parser.add_mutually_exclusive_group()
+    changes.add_argument('--since', metavar='REV',
+                         help='Only validate plugins whose Java or markdown files changed since the git revision.')
+    changes.add_argument('--staged', action='store_true',
+                         help='Only validate plugins whose Java or markdown files are staged in git.')
+    parser.add_argument('--shard', type=shard_spec, metavar='I/N',
+                        help='Only validate the plugins of shard I of N, picked by a hash of their path relative to ' +
+                             '--path. Use --format events and merge_shard_reports.py to combine the shards.')
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB',
+                        help='Only validate Java files whose path relative to --path matches the glob (repeatable).')
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help='Skip files and directories whose path relative to --path matches the glob (repeatable).')
+    parser.add_argument('--main-only', action='store_true',
+                        help='Only discover Java files under src/main/java trees.')
+    parser.add_argument('--no-default-prune', action='store_true',
+                        help='Also descend into VCS, node_modules and generated source directories, and into ' +
+                             'the target and build directories next to a pom.xml or build.gradle.')
+    parser.add_argument('--report-orphan-docs', action='store_true',
+                        help='Also report markdown files in docs/ directories that no plugin resolves to (only in ' +
+                             'runs over the whole tree, without --since, --staged or --include). With --shard, each ' +
+                             'shard extracts the whole tree and reports the files hashed to it.')
+    parser.add_argument('--no-prefilter', action='store_true',
+                        help='Fully parse every Java file instead of skipping files without a config class.')
+    parser.add_argument('--profile', action='store_true',
+                        help='Time every validation stage per file and print a summary at the end of the run.')
+    parser.add_argument('--profile-top', type=int, default=5, metavar='N',
+                        help='Number of slowest files listed per stage in the profile summary (default: 5).')
+    parser.add_argument('--profile-dump', metavar='FILE',
+                        help='Run under cProfile and write pstats data to FILE (covers the parent process only).')
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='Write throughput, stage latency histograms, cache and finding counts of the run to ' +
+                             'FILE in the Prometheus text format when it exits (name it *.prom for the textfile ' +
+                             'collector of the node exporter).')
+    parser.add_argument('--metrics-json', metavar='FILE', help='Write the same metrics to FILE as JSON.')
+    parser.add_argument('--backend', choices=BACKENDS, default=DEFAULT_BACKEND,
+                        help='Java parser used to read plugin and config classes (default: ' + DEFAULT_BACKEND + ').')
+    parser.add_argument('--file-timeout', type=float, default=DEFAULT_FILE_TIMEOUT, metavar='SECONDS',
+                        help='Quarantine Java files that take longer than SECONDS to parse (0 disables; default: ' +
+                             '%g' % DEFAULT_FILE_TIMEOUT + ').')
+    parser.add_argument('--file-memory', type=int, default=0, metavar='MIB',
+                        help='Quarantine Java files whose parsing grows the address space of the process by more ' +
+                             'than MIB (Linux only; default: no limit). Java files are then read without ' +
+                             '--read-threads.')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of worker processes used to validate plugins in parallel (0 uses all CPUs).')
+    parser.add_argument('--read-threads', type=int, default=DEFAULT_READ_THREADS, metavar='N',
+                        help='Threads reading Java files ahead of the parser (0 reads them in line; default: ' +
+                             str(DEFAULT_READ_THREADS) + ').')
+    parser.add_argument('--read-ahead', type=int, default=DEFAULT_READ_AHEAD, metavar='N',
+                        help='Most Java files read but not yet parsed at any time (default: ' +
+                             str(DEFAULT_READ_AHEAD) + ').')
+    parser.add_argument('--serve', metavar='SOCKET',
+                        help='Run as a daemon that keeps the repository indexed in memory and answers validation ' +
+                             'requests from plugin_docs_client.py on the Unix socket SOCKET.')
+    parser.add_argument('--poll-interval', type=float, default=2.0, metavar='SECONDS',
+                        help='How often the daemon polls the tree for changed files (default: 2).')
+    args = parser.parse_args(argv)
+    if args.similarity_threshold is not None and not 0.0 <= args.similarity_threshold <= 1.0:
+        parser.error('--similarity-threshold must be between 0 and 1')
+    if args.file_timeout < 0 or args.file_memory < 0:
+        parser.error('--file-timeout and --file-memory cannot be negative')
+    if args.max_findings < 0:
+        parser.error('--max-findings cannot be negative')
+    if args.file_memory and not memory_budget_supported():
+        parser.error('--file-memory is only supported on Linux')
+    return args
+
+
+def shard_spec(value):
+    match = re.match(r'(\d+)/(\d+)\Z', value)
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise ArgumentTypeError('expected I/N with 1 <= I <= N, got "' + value + '"')
+    return int(match.group(1)), int(match.group(2))
+
+
+def shard_of(relative_path, shard_count):
+    # An md5 of the path rather than hash(), which is salted per process on Python 3, so that every CI node
+    # computes the same partition
+    import hashlib
+    if not isinstance(relative_path, bytes):
+        relative_path = relative_path.encode('utf-8')
+    return int(hashlib.md5(relative_path).hexdigest()[:8], 16) % shard_count + 1
+
+
+def read_file(file_path):
+    with open(file_path, 'rb') as source_file:
+        return source_file.read()
+
+
+def parse_file(config_class_file_path, class_filename, backend, file_contents=None):
+    if file_contents is None:
+        file_contents = read_file(config_class_file_path)
+    java_file = backend.parse(config_class_file_path, file_contents.decode('utf-8'))
+    if len(java_file.types) == 0:
         raise Exception('Class not found: Unable to find Java class in "' + class_filename + ".")
-    return tree
-
-
-def get_class_signature(class_declaration):
-    class_signature = class_declaration.name
-    if class_declaration.extends is not None:
-        class_signature += ' extends ' + class_declaration.extends.name
-    if class_declaration.implements is not None:
-        class_signature += ' implements ' + ', '.join([interface.name for interface in class_declaration.implements])
-    return class_signature
-
-
-def reconstruct_argument(argument_piece):
-    if argument_piece.__class__.__name__ == 'Literal':
-        # strip opening and closing double quotes
-        return argument_piece.value[1:-1]
-    elif argument_piece.__class__.__name__ == 'BinaryOperation':
-        return reconstruct_argument(argument_piece.operandl) + reconstruct_argument(argument_piece.operandr)
-    elif argument_piece.__class__.__name__ == 'MemberReference':
-        return argument_piece.qualifier + '.' + argument_piece.member
-    elif argument_piece.__class__.__name__ == 'list':
-        # Assumed to be ElementValuePair where element of interest is on right-hand-side
-        return reconstruct_argument(argument_piece[0].children[1])
-    else:
-        raise Exception('Unsupported annotation operation: ' + argument_piece.__class__.__name__)
-
-
-def get_annotation_argument(children):
-    if children[1] is None:
-        return ''
-    else:
-        return reconstruct_argument(children[1])  # children[1] is the first and assumed only argument
+    return java_file
 
 
 def get_config_class(class_declaration):
@@ -124,39 +213,44 @@ def get_config_class(class_declaration):
         return class_declaration
     elif class_name.endswith('Test'):
         return None
-    for child_declaration in class_declaration.children:
-        if isinstance(child_declaration, list):
-            for item in child_declaration:
-                if item.__class__.__name__ == 'ClassDeclaration' and unicode_to_ascii(item.name).endswith('Config'):
-                    return item
+    for item in class_declaration.classes:
+        if item.kind == 'class' and unicode_to_ascii(item.name).endswith('Config'):
+            return item
     return None
 
 
 def unicode_to_ascii(u_str):
-    return u_str.encode('ascii', 'ignore')
+    return u_str.encode('ascii', 'ignore').decode('ascii')
 
 
 def is_abstract(plugin_class_declaration):
-    for modifier in plugin_class_declaration.modifiers:
-        if unicode_to_ascii(modifier) == 'abstract':
-            return True
+    return 'abstract' in plugin_class_declaration.modifiers
 
 
 def plugin_type_from_annotation(annotation):
-    plugin_type = unicode_to_ascii(get_annotation_argument(annotation.children))
-    result = PLUGIN_TYPES[plugin_type]
+    plugin_type = unicode_to_ascii(annotation.value())
+    if plugin_type not in PLUGIN_TYPES and not is_resolved(annotation.parts):
+        # A constant declared in another file, resolved once the class index is built
+        return annotation.parts
+    return plugin_type_from_value(plugin_type)
+
+
+def plugin_type_from_value(plugin_type):
+    result = PLUGIN_TYPES.get(plugin_type)
     if result is None:
         raise Exception("Encountered invalid plugin type " + plugin_type + " is not valid.")
     return result
 
 
 def get_plugin_properties(plugin_class_declaration):
+    # Values referencing constants of other files keep their parts, like config properties do
     plugin_properties = {}
     for annotation in plugin_class_declaration.annotations:
         if annotation.name == 'Plugin':
             plugin_properties['type'] = plugin_type_from_annotation(annotation)
         elif annotation.name == 'Name':
-            plugin_properties['name'] = get_annotation_argument(annotation.children)
+            value = annotation.value()
+            plugin_properties['name'] = value if is_resolved(annotation.parts) else annotation.parts
     if 'type' not in plugin_properties:
         raise Exception('Unable to parse "plugin" property for plugin ' + plugin_class_declaration.name)
     if 'name' not in plugin_properties:
@@ -165,193 +259,932 @@ def get_plugin_properties(plugin_class_declaration):
 
 
 def get_plugin_config_properties(config_class_declaration):
-    plugin_properties = {}
+    # (property name, [(annotation name, value), ...]) pairs in declaration order. Values referencing constants of
+    # other files keep their parts until the class index can resolve them.
+    plugin_properties = []
     for field_declaration in config_class_declaration.fields:
-        field_annotations = {}
+        # Static fields are constants, not properties
+        if 'static' in field_declaration.modifiers:
+            continue
+        field_annotations = []
         for annotation in field_declaration.annotations:
-            field_annotations[annotation.name] = get_annotation_argument(annotation.children)
-        plugin_properties[field_declaration.declarators[0].name] = field_annotations
+            value = annotation.value()
+            field_annotations.append((annotation.name, value if is_resolved(annotation.parts) else annotation.parts))
+        plugin_properties.append((field_declaration.names[0], field_annotations))
     return plugin_properties
 
 
-def parse_property_names_from_markdown(properties_section):
-    markdown_properties = {}
-
-    while properties_section and properties_section != '\n':
-        # Find property name
-        name_start_index = properties_section.find(PROPERTY_NAME_START)
-        name_end_index = properties_section.find(PROPERTY_NAME_END)
-        if name_end_index is -1 or name_end_index is -1:
-            break
-        property_name = properties_section[name_start_index + len(PROPERTY_NAME_START):name_end_index]
-
-        # Find property description
-        next_property_index = properties_section.find(NEXT_PROPERTY_DELIMITER)
-        property_description = properties_section[name_end_index + len(PROPERTY_NAME_END):next_property_index]
-        markdown_properties[property_name] = property_description
-
-        # Finish searching remainder of section
-        properties_section = properties_section[next_property_index + len(NEXT_PROPERTY_DELIMITER):]
-    return markdown_properties
-
-
-def find_markdown_file(plugin_path, plugin_properties):
+def resolve_plugin_properties(plugin, plugin_path, class_index, used_files=None):
+    # The name and type of the plugin, with the constants of other files they reference resolved through the class
+    # index. The files declaring those constants are added to used_files.
+    used_files = set() if used_files is None else used_files
+    plugin_type = plugin.type
+    if isinstance(plugin_type, tuple):
+        plugin_type = plugin_type_from_value(unicode_to_ascii(class_index.resolve_value(plugin_type, plugin_path,
+                                                                                        used_files)))
+    return {'name': class_index.resolve_value(plugin.name, plugin_path, used_files), 'type': plugin_type}
+
+
+def find_markdown_file(plugin_path, plugin_properties, docs_index=None):
+    # The file the docs index resolves the plugin to, otherwise where it is expected: the nearest indexed docs
+    # directory, or next to the module's src directory
+    if docs_index is not None:
+        markdown_file_path = docs_index.find(plugin_path, plugin_properties['name'], plugin_properties['type']) or \
+            docs_index.expected_path(plugin_path, plugin_properties['name'], plugin_properties['type'])
+        if markdown_file_path is not None:
+            return markdown_file_path
     docs_path = plugin_path[:plugin_path.rfind('/src')] + '/docs/'
     return docs_path + plugin_properties['name'] + '-' + plugin_properties['type'] + '.md'
 
 
-def try_to_find(contents, delims):
-    for delimiter in delims:
-        index = contents.find(delimiter)
-        if index != -1:
-            return index
-    return -1
-
-
-def parse_markdown_file(markdown_file_path, markdown_filename, args):
+def parse_markdown_file(markdown_file_path, markdown_filename, args, reporter):
     try:
         # Read file contents
-        with open(markdown_file_path, 'r') as markdown_file:
+        with io.open(markdown_file_path, encoding='utf-8', errors='replace') as markdown_file:
             file_contents = markdown_file.read()
 
         # Find property section
-        property_index = try_to_find(file_contents, PROPERTIES_DELIMITERS)
-        example_index = try_to_find(file_contents, EXAMPLE_DELIMITERS)
+        property_index, example_index, properties_section = find_properties_section(file_contents)
 
         if property_index == -1:
-            print_notice(args.strict, 'Unable to find property section in "' + markdown_filename +
-                         '" delimited by:\n' + '\nor\n'.join(PROPERTIES_DELIMITERS) + '')
+            report_notice(args, reporter, 'properties-section-missing', 'Unable to find property section in "' +
+                          markdown_filename + '" delimited by:\n' + '\nor\n'.join(PROPERTIES_DELIMITERS) + '',
+                          in_markdown=True)
         elif example_index == -1:
-            print_notice(args.strict, 'Unable to find example section in "' + markdown_filename +
-                         '" delimited by:\n' + '\nor\n'.join(EXAMPLE_DELIMITERS) + '')
+            report_notice(args, reporter, 'example-section-missing', 'Unable to find example section in "' +
+                          markdown_filename + '" delimited by:\n' + '\nor\n'.join(EXAMPLE_DELIMITERS) + '',
+                          in_markdown=True)
         elif example_index < property_index:
-            print_notice(args.strict, 'Example section found before properties section in "' + markdown_filename + '".')
+            report_notice(args, reporter, 'example-before-properties', 'Example section found before properties ' +
+                          'section in "' + markdown_filename + '".', in_markdown=True)
 
-        # TODO: change to length of specific delimiter found
-        properties_section = file_contents[property_index + len(PROPERTIES_DELIMITERS[0]):example_index]
         return parse_property_names_from_markdown(properties_section)
     except IOError:
-        print_notice(args.strict, 'Unable to find markdown file "' + markdown_file_path + '".')
+        report_markdown_missing(markdown_file_path, args, reporter)
         return None
 
 
-def print_notice(strict, description):
-    if strict:
+def report_markdown_missing(markdown_file_path, args, reporter):
+    report_notice(args, reporter, 'markdown-file-missing', 'Unable to find markdown file "' + markdown_file_path +
+                  '".', in_markdown=True)
+
+
+def report_notice(args, reporter, rule, description, property_name=None, in_markdown=False, details=None):
+    plugin = reporter.plugin
+    file_path = plugin['markdown_path'] if in_markdown else plugin['path']
+    reporter.finding(Finding(rule, 'error' if args.strict else 'warning', description, file_path, plugin['name'],
+                             plugin['type'], plugin['class_name'], property_name, details))
+    if args.strict:
         raise Exception('ERROR: ' + description)
-    else:
-        print('WARNING: ' + description)
-    print
 
 
-def validate_properties_present(config_filename, markdown_filename, plugin_properties, markdown_properties, args):
+def validate_properties_present(config_filename, markdown_filename, plugin_properties, markdown_properties, args,
+                                reporter):
     # Validate plugin properties are in markdown file
     for plugin_property in plugin_properties:
         if plugin_property not in markdown_properties:
-            print_notice(args.strict, 'Property "' + plugin_property + '" in "' + config_filename +
-                         '" not present in markdown file "' + markdown_filename + '".')
+            report_notice(args, reporter, 'property-not-documented', 'Property "' + plugin_property + '" in "' +
+                          config_filename + '" not present in markdown file "' + markdown_filename + '".',
+                          plugin_property)
 
     # Validate markdown properties are in plugin config
     for markdown_property in markdown_properties:
         if markdown_property not in plugin_properties:
-            print_notice(args.strict, 'Property "' + markdown_property + '" in "' + markdown_filename +
-                         '" not present in config class "' + config_filename + '".')
+            report_notice(args, reporter, 'property-not-in-config', 'Property "' + markdown_property + '" in "' +
+                          markdown_filename + '" not present in config class "' + config_filename + '".',
+                          markdown_property, in_markdown=True)
 
 
-def validate_descriptions_match(config_filename, markdown_filename, plugin_properties, markdown_properties, args):
+def validate_descriptions_match(config_filename, markdown_filename, plugin_properties, markdown_properties, args,
+                                reporter):
         for plugin_property in plugin_properties:
             try:
                 plugin_description = plugin_properties[plugin_property]['Description']
             except KeyError:
-                print_notice(args.strict, 'Property "' + plugin_property + '" has no description specified in "' +
-                             config_filename + '".')
+                report_notice(args, reporter, 'config-description-missing', 'Property "' + plugin_property +
+                              '" has no description specified in "' + config_filename + '".', plugin_property)
                 continue
 
             if not plugin_description:
-                print_notice(args.strict, 'Property "' + plugin_property + '" has no description specified in config ' +
-                             'class "' + config_filename + '".')
+                report_notice(args, reporter, 'config-description-missing', 'Property "' + plugin_property +
+                              '" has no description specified in config class "' + config_filename + '".',
+                              plugin_property)
             else:
                 try:
                     # Strip markdown format from description
-                    raw_markdown_description = markdown(markdown_properties[plugin_property])
-                    markdown_description = ''.join(BeautifulSoup(raw_markdown_description).findAll(text=True))
+                    markdown_description = markdown_to_text(markdown_properties[plugin_property])
                     if not markdown_description:
-                        print_notice(args.strict, 'Property ' + plugin_property + ' has no description specified in ' +
-                                     'markdown file "' + markdown_filename + '".')
+                        report_notice(args, reporter, 'markdown-description-missing', 'Property ' + plugin_property +
+                                      ' has no description specified in markdown file "' + markdown_filename + '".',
+                                      plugin_property, in_markdown=True)
 
                     markdown_description = markdown_description.replace('\n', ' ')
                     if not markdown_description.startswith(plugin_description):
-                        print_notice(args.strict, 'Description of property "' + plugin_property + '" in markdown ' +
-                                     'file "' + markdown_filename + '" does not begin with the same description ' +
-                                     'found in the config class "' + config_filename + '".')
-                        if args.showdiff:
-                            print('\t* Plugin:\t' + plugin_description)
-                            print('\t* Markdown:\t' + markdown_description)
-                            print
+                        # Mismatches are only dropped by an explicit --similarity-threshold; the score is always given
+                        threshold = args.similarity_threshold
+                        if threshold is None:
+                            threshold = DEFAULT_SIMILARITY_THRESHOLD
+                        similarity, word_diff = compare_descriptions(plugin_description, markdown_description,
+                                                                     threshold)
+                        if args.similarity_threshold is not None and similarity is not None and \
+                                similarity >= args.similarity_threshold:
+                            continue
+                        if similarity is not None:
+                            score = 'similarity %.2f' % similarity
+                        else:
+                            word_count = len(plugin_description.split())
+                            score = 'more than ' + str(word_limit(word_count, threshold)) + ' words differ'
+                        report_notice(args, reporter, 'description-mismatch', 'Description of property "' +
+                                      plugin_property + '" in markdown file "' + markdown_filename + '" does not ' +
+                                      'begin with the same description found in the config class "' +
+                                      config_filename + '" (' + score + ').', plugin_property, in_markdown=True,
+                                      details={'plugin_description': plugin_description,
+                                               'markdown_description': markdown_description,
+                                               'similarity': similarity, 'word_diff': word_diff})
                 except KeyError:
-                    print_notice(args.strict, 'Property "' + plugin_property + '" has no description specified in ' +
-                                 'markdown file "' + markdown_filename + '".')
+                    report_notice(args, reporter, 'markdown-description-missing', 'Property "' + plugin_property +
+                                  '" has no description specified in markdown file "' + markdown_filename + '".',
+                                  plugin_property, in_markdown=True)
                     continue
 
 
-def validate(args, plugin_path):
+def has_property_annotations(class_declaration):
+    for field_declaration in class_declaration.fields:
+        for annotation in field_declaration.annotations:
+            if annotation.name in PROPERTY_ANNOTATIONS:
+                return True
+    return False
+
+
+def get_class_records(class_declaration, class_records):
+    # Records every class that may take part in a config hierarchy; fields are only evaluated for classes that look
+    # like configs because annotation arguments elsewhere may use unsupported expressions
+    if class_declaration.kind != 'class':
+        return class_records
+    extends = simple_name(class_declaration.extends)
+    class_record = ClassRecord(class_declaration.name, extends)
+    if class_declaration.name.endswith('Config') or (extends and extends.endswith('Config')) or \
+            has_property_annotations(class_declaration):
+        # Failures only matter once a plugin uses this class, so they are kept with the record until then
+        try:
+            class_record.fields = compact_fields(get_plugin_config_properties(class_declaration))
+        except Exception as e:
+            class_record.error = str(e)
+    class_records.append(class_record)
+    for member in class_declaration.classes:
+        get_class_records(member, class_records)
+    return class_records
+
+
+def get_file_constants(java_file):
+    # (class name, ((constant name, parts), ...)) for every class of the file declaring String constants
+    file_constants = []
+    pending = list(reversed(java_file.types))
+    while pending:
+        java_class = pending.pop()
+        if java_class.constants:
+            file_constants.append((java_class.name, tuple(sorted(java_class.constants.items()))))
+        pending.extend(reversed(java_class.classes))
+    return file_constants
+
+
+def get_plugin(plugin_class_declaration):
+    # Returns the plugin class with the name of its nested config class, or the types of its fields when the config
+    # class is declared in another file
+    config_class_declaration = get_config_class(plugin_class_declaration)
+
+    # If no plugin class is found or the plugin class is abstract
+    if plugin_class_declaration is config_class_declaration or is_abstract(plugin_class_declaration):
+        return None
+
+    if config_class_declaration is None:
+        # Without a nested config class only fully annotated plugins can use a config from another file
+        annotation_names = set(annotation.name for annotation in plugin_class_declaration.annotations)
+        if plugin_class_declaration.name.endswith('Test') or not annotation_names.issuperset(['Plugin', 'Name']):
+            return None
+
+    plugin_properties = get_plugin_properties(plugin_class_declaration)
+    return PluginRecord(plugin_class_declaration.name, plugin_properties['name'], plugin_properties['type'],
+                        config_class_declaration.name if config_class_declaration is not None else None,
+                        [simple_name(field_declaration.type) for field_declaration in plugin_class_declaration.fields])
+
+
+def extract_file_model(plugin_path, class_filename, file_contents, backend, counters=None):
+    # Parse the Java file
+    if counters:
+        start_time = clock()
+    java_file = parse_file(plugin_path, class_filename, backend, file_contents)
+    if counters:
+        counters.record('java_parse', plugin_path, start_time)
+        start_time = clock()
+    try:
+        # Get class information
+        class_records = []
+        for type_declaration in java_file.types:
+            get_class_records(type_declaration, class_records)
+        file_model = FileModel(class_records, get_plugin(java_file.types[0]), get_file_constants(java_file))
+        # Only the compact model outlives extraction; drop the parsed tree before the next file is read
+        del java_file
+        return file_model
+    finally:
+        if counters:
+            counters.record('extract', plugin_path, start_time)
+
+
+def load_file_model(plugin_path, class_filename, backend, cache, file_contents=None, counters=None):
+    if file_contents is None:
+        if counters:
+            start_time = clock()
+        file_contents = read_file(plugin_path)
+        if counters:
+            counters.add_sample('read', plugin_path, clock() - start_time, len(file_contents))
+    if cache is None:
+        return extract_file_model(plugin_path, class_filename, file_contents, backend, counters)
+
+    # Unchanged files are served from the cache without invoking the parser
+    if counters:
+        start_time = clock()
+    key = cache.key(file_contents)
+    found, state = cache.get(key)
+    if counters:
+        counters.record('cache', plugin_path, start_time)
+    if found:
+        return FileModel.from_state(state)
+    file_model = extract_file_model(plugin_path, class_filename, file_contents, backend, counters)
+    cache.put(key, file_model.to_state())
+    return file_model
+
+
+def extract_file(plugin_path, backend, cache=None, prefilter=None, counters=None):
     # Check whether to parse this class
     class_filename = plugin_path[plugin_path.rfind('/') + 1:]
     if class_filename in IGNORED_FILES:
-        return
+        return None
 
-    # Parse the Java file
-    tree = parse_file(plugin_path, class_filename)
+    # Skip files that cannot declare a plugin or config class before paying for a full parse
+    file_contents = None
+    if prefilter is not None:
+        if counters:
+            start_time = clock()
+        is_candidate, file_contents = prefilter.scan(plugin_path)
+        if counters:
+            counters.add_sample('prefilter', plugin_path, clock() - start_time,
+                                len(file_contents) if file_contents else 0)
+        if not is_candidate:
+            return None
 
-    # Get class information
-    plugin_class_declaration = tree.types[0]
-    config_class_declaration = get_config_class(plugin_class_declaration)
+    return load_file_model(plugin_path, class_filename, backend, cache, file_contents, counters)
 
-    # If no config class is found
-    if config_class_declaration is None:
-        return
 
-    # If no plugin class is found or the plugin class is abstract
-    if plugin_class_declaration is config_class_declaration or is_abstract(plugin_class_declaration):
-        return
+def read_candidate(plugin_path, use_prefilter):
+    # Runs on the reader threads: returns whether the file may hold a plugin and its contents, when read whole
+    class_filename = plugin_path[plugin_path.rfind('/') + 1:]
+    if class_filename in IGNORED_FILES:
+        return False, None
+    if use_prefilter:
+        return scan_file(plugin_path)
+    return True, read_file(plugin_path)
 
-    # Get plugin and plugin config properties
-    plugin_properties = get_plugin_properties(plugin_class_declaration)
-    plugin_config_properties = get_plugin_config_properties(config_class_declaration)
+
+def resolve_plugin(plugin_path, file_model, class_index, docs_index=None):
+    # Combines the plugin with the effective fields of its config class, including inherited ones, and with its
+    # markdown file. markdown_missing is only known, without trying to open the file, when a docs index is given.
+    plugin = file_model.plugin if file_model else None
+    if plugin is None:
+        return None
+    config_class = class_index.find_config_class(plugin, plugin_path)
+    if config_class is None:
+        return None
+    config_layers, config_files = class_index.config_layers(config_class, plugin_path)
+    used_files = set()
+    plugin_properties = resolve_plugin_properties(plugin, plugin_path, class_index, used_files)
+    markdown_file_path = find_markdown_file(plugin_path, plugin_properties, docs_index)
+    return {
+        'class_name': plugin.class_name,
+        'plugin_properties': plugin_properties,
+        'config_layers': config_layers,
+        # Files declaring the constants of the name or type count as config files too
+        'config_files': config_files + sorted(used_files - set(config_files)),
+        'markdown_path': markdown_file_path,
+        'markdown_missing': docs_index is not None and docs_index.find(plugin_path, plugin_properties['name'],
+                                                                       plugin_properties['type']) is None
+    }
+
+
+def validate_plugin(args, plugin_path, plugin_model, reporter, counters=None):
+    class_filename = plugin_path[plugin_path.rfind('/') + 1:]
+    plugin_properties = plugin_model['plugin_properties']
+    plugin_config_properties = merge_config_layers(plugin_model['config_layers'])
 
     # Parse the markdown file
-    markdown_file_path = find_markdown_file(plugin_path, plugin_properties)
+    markdown_file_path = plugin_model['markdown_path']
     markdown_filename = markdown_file_path[markdown_file_path.rfind('/') + 1:]
 
-    # Print class information
-    header = 'Validating ' + plugin_class_declaration.name + ' against ' + markdown_filename
-    print('=' * len(header) + '\n' + header + '\n' + '=' * len(header) + '\n')
+    # Report class information
+    reporter.begin_plugin(plugin_path, plugin_model['class_name'], plugin_properties['name'],
+                          plugin_properties['type'], markdown_file_path)
 
-    markdown_properties = parse_markdown_file(markdown_file_path, markdown_filename, args)
+    if plugin_model['markdown_missing']:
+        report_markdown_missing(markdown_file_path, args, reporter)
+        markdown_properties = None
+    else:
+        if counters:
+            start_time = clock()
+        markdown_properties = parse_markdown_file(markdown_file_path, markdown_filename, args, reporter)
+        if counters:
+            counters.record('markdown', markdown_file_path, start_time)
 
     # If no markdown file was found
     if markdown_properties is None:
-        print('Done.')
-        print
+        reporter.end_plugin()
         return
 
     # Begin validating properties
-    validate_properties_present(class_filename, markdown_filename, plugin_config_properties, markdown_properties, args)
-    validate_descriptions_match(class_filename, markdown_filename, plugin_config_properties, markdown_properties, args)
+    if counters:
+        start_time = clock()
+    validate_properties_present(class_filename, markdown_filename, plugin_config_properties, markdown_properties, args,
+                                reporter)
+    validate_descriptions_match(class_filename, markdown_filename, plugin_config_properties, markdown_properties, args,
+                                reporter)
+    if counters:
+        counters.record('compare', plugin_path, start_time)
+
+    reporter.end_plugin()
+
 
-    print('Done.')
-    print
+def validate_or_quarantine(args, plugin_path, plugin_model, failure, reporter, counters=None):
+    if failure is not None:
+        report_quarantined(args, reporter, plugin_path, failure)
+    else:
+        validate_plugin(args, plugin_path, plugin_model, reporter, counters)
+
+
+def report_orphan_docs(args, reporter, docs_index, class_index, file_models, in_shard=None):
+    plugins = []
+    for plugin_path, (file_model, error) in file_models.items():
+        if file_model is None or file_model.plugin is None:
+            continue
+        try:
+            plugin_properties = resolve_plugin_properties(file_model.plugin, plugin_path, class_index)
+        except Exception:
+            # An invalid plugin type; the file is quarantined with it
+            continue
+        plugins.append((plugin_path, plugin_properties['name'], plugin_properties['type']))
+    for markdown_file_path in docs_index.orphans(plugins):
+        if in_shard is not None and not in_shard(markdown_file_path):
+            continue
+        plugin_name, plugin_type = plugin_from_markdown_path(markdown_file_path, PLUGIN_TYPES.values())
+        description = 'No plugin uses markdown file "' + markdown_file_path + '".'
+        reporter.finding(Finding('orphan-doc', 'error' if args.strict else 'warning', description, markdown_file_path,
+                                 plugin_name, plugin_type, None))
+        if args.strict:
+            raise Exception('ERROR: ' + description)
+
+
+def report_quarantined(args, reporter, plugin_path, failure):
+    description = 'Quarantined "' + plugin_path + '": ' + failure.reason
+    reporter.finding(Finding('file-quarantined', 'error' if args.strict else 'warning', description, plugin_path,
+                             None, None, None))
+    if args.strict:
+        raise Exception('ERROR: ' + description)
+
+
+def max_findings_error(finding_count, max_findings):
+    return 'ERROR: ' + str(finding_count) + ' findings reached --max-findings ' + str(max_findings) + '.'
+
+
+def quarantine_summary(quarantined):
+    lines = ['Quarantined ' + str(len(quarantined)) + ' Java files, the slowest first:']
+    for plugin_path, failure in sorted(quarantined, key=lambda item: -item[1].seconds)[:SLOWEST_QUARANTINED]:
+        lines.append('  %8.3fs  ' % failure.seconds + plugin_path + ': ' + failure.reason)
+    return '\n'.join(lines)
+
+
+def create_discovery(args):
+    return JavaFileDiscovery(args.include, args.exclude, args.main_only, not args.no_default_prune)
+
+
+def create_cache(args, load_backend):
+    if not args.cache and not args.prune_cache:
+        return None
+    # Entries are keyed by the parser version, so only runs with a cache load the parser up front
+    backend = load_backend()
+    return PluginCache(args.cache_dir, backend.name + '-' + backend.version())
+
+
+def create_budget(args):
+    return FileBudget(args.file_timeout, args.file_memory)
+
+
+def create_prefilter(args):
+    if args.no_prefilter:
+        return None
+    return PluginPreFilter()
+
+
+def cpu_count():
+    import multiprocessing
+    return multiprocessing.cpu_count()
+
+
+def create_profiler(args):
+    if not args.profile:
+        return None
+    return StageProfiler()
+
+
+def create_backend_profiled(args, profiler):
+    # Parser start-up is a fixed cost per process, so it is reported apart from the per file parse times
+    backend = create_backend(args.backend)
+    if profiler:
+        profiler.samples.append(('startup', backend.name + ' (' + (backend.tables or 'no tables') + ')',
+                                 backend.startup_seconds))
+    return backend
+
+
+def init_worker(args):
+    global worker_args, worker_backend, worker_reporter, worker_cache, worker_prefilter, worker_profiler, \
+        worker_counters, worker_budget
+    worker_args = args
+    worker_profiler = create_profiler(args)
+    worker_counters = PipelineCounters(worker_profiler)
+    worker_backend = create_backend_profiled(args, worker_profiler)
+    worker_reporter = RecordingReporter()
+    worker_cache = create_cache(args, lambda: worker_backend)
+    worker_prefilter = create_prefilter(args)
+    worker_budget = create_budget(args)
+
+
+def get_counters(*counted):
+    return [item.counters() if item else None for item in counted]
+
+
+def counter_deltas(before, after):
+    return [tuple(a - b for a, b in zip(item_after, item_before)) if item_after else None
+            for item_before, item_after in zip(before, after)]
+
+
+def extract_in_worker(plugin_path):
+    # Workers read their own files: sending the contents through the pool would only add pickling to the read
+    counters = get_counters(worker_cache, worker_prefilter, worker_counters)
+    try:
+        file_model = worker_budget.run(extract_file, plugin_path, worker_backend, worker_cache, worker_prefilter,
+                                       worker_counters)
+        error = None
+    except FileFailure as e:
+        file_model = None
+        error = e
+    samples = worker_profiler.take_samples() if worker_profiler else None
+    return file_model, error, counter_deltas(counters, get_counters(worker_cache, worker_prefilter,
+                                                                    worker_counters)), samples
+
+
+def validate_in_worker(job):
+    # Record everything validate_plugin() reports so the parent can replay it in path order
+    plugin_path, plugin_model, failure = job
+    counters = worker_counters.counters()
+    try:
+        validate_or_quarantine(worker_args, plugin_path, plugin_model, failure, worker_reporter, worker_counters)
+        error = None
+    except Exception as e:
+        error = e
+    samples = worker_profiler.take_samples() if worker_profiler else None
+    return worker_reporter.take_events(), error, counter_deltas([counters], [worker_counters.counters()])[0], samples
+
+
+def issue_jobs(jobs, issued):
+    # The pool takes jobs on a thread of its own; their paths and failures are queued so that the results, which
+    # imap returns in order, can be matched with them
+    for plugin_path, plugin_model, failure in jobs:
+        issued.append((plugin_path, failure))
+        yield plugin_path, plugin_model, failure
+
+
+class ValidatorRun(object):
+    # State shared by the stages of one run: extraction of file models, the class index built from them and
+    # validation of the resolved plugins, either in this process or in a pool of worker processes. The stages are
+    # generators pulling one file at a time, so only the read-ahead window and the compact file models grow with
+    # the size of the repository.
+
+    def __init__(self, args, reporter):
+        self.args = args
+        self.reporter = reporter
+        self.profiler = create_profiler(args)
+        self.counters = PipelineCounters(self.profiler)
+        self.backend = None
+        self.cache = create_cache(args, self.parser_backend)
+        self.prefilter = create_prefilter(args)
+        self.budget = create_budget(args)
+        self.discovery = create_discovery(args)
+        self.class_index = ClassIndex()
+        self.docs_index = None
+        self.file_models = {}
+        # (path, FileFailure) of the files reported as quarantined
+        self.quarantined = []
+        # (Java files checked, Java files to check) when --max-findings stopped the validation
+        self.stopped = None
+        self.pool = None
+        self.jobs = args.jobs if args.jobs > 0 else cpu_count()
+
+    def parser_backend(self):
+        # Loaded by the first file that has to be parsed, so runs that parse nothing never import the parser
+        if self.backend is None:
+            self.backend = create_backend_profiled(self.args, self.profiler)
+        return self.backend
+
+    def start_pool(self, file_count):
+        if self.jobs > 1 and file_count > 1:
+            # Imported here, like the parser and markdown modules, so that serial runs start without it
+            import multiprocessing
+            self.pool = multiprocessing.Pool(min(self.jobs, file_count), init_worker, (self.args,))
+
+    def stop_pool(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def in_shard(self, file_path):
+        if self.args.shard is None:
+            return True
+        shard_index, shard_count = self.args.shard
+        return shard_of(os.path.relpath(file_path, self.args.path), shard_count) == shard_index
+
+    def chunk_size(self, item_count):
+        return max(1, item_count // (self.jobs * 4))
+
+    def discover(self, path):
+        start_time = clock()
+        java_files = self.discovery.find_java_files(path)
+        self.docs_index = DocsIndex(PLUGIN_TYPES.values(), self.discovery.markdown_files)
+        self.counters.count('discover', len(java_files), clock() - start_time)
+        return java_files
+
+    def read_files(self, java_files, use_prefilter=True):
+        # Yields (path, may hold a plugin, contents, error) with the reads running ahead on the reader threads
+        use_prefilter = use_prefilter and self.prefilter is not None
+        # The memory budget of a file caps the whole process, so reader threads would allocate under it
+        read_threads = 0 if self.args.file_memory else self.args.read_threads
+        reads = read_ahead(java_files, lambda plugin_path: read_candidate(plugin_path, use_prefilter),
+                           read_threads, max(1, self.args.read_ahead), self.counters)
+        for plugin_path, result, error, seconds in reads:
+            if error is not None:
+                yield plugin_path, True, None, error
+                continue
+            is_candidate, file_contents = result
+            class_filename = plugin_path[plugin_path.rfind('/') + 1:]
+            if class_filename not in IGNORED_FILES:
+                if use_prefilter:
+                    self.prefilter.count(is_candidate)
+                self.counters.add_sample('prefilter' if use_prefilter else 'read', plugin_path, seconds,
+                                         len(file_contents) if file_contents else 0)
+            yield plugin_path, is_candidate, file_contents, None
+
+    def parse_files(self, reads):
+        # Yields (path, file model, error); parsing and extraction are timed per file through the counters
+        for plugin_path, is_candidate, file_contents, error in reads:
+            if error is not None or not is_candidate:
+                yield plugin_path, None, error
+                continue
+            class_filename = plugin_path[plugin_path.rfind('/') + 1:]
+            # Outside the try, so that a parser that fails to load stops the run rather than failing every file
+            backend = self.parser_backend()
+            try:
+                file_model = self.budget.run(load_file_model, plugin_path, class_filename, backend, self.cache,
+                                             file_contents, self.counters)
+                yield plugin_path, file_model, None
+            except FileFailure as e:
+                yield plugin_path, None, e
+
+    def extract_in_pool(self, java_files):
+        results = self.pool.imap(extract_in_worker, java_files, self.chunk_size(len(java_files)))
+        for plugin_path, (file_model, error, counters, samples) in zip(java_files, results):
+            if self.profiler:
+                self.profiler.add_samples(samples)
+            # Fold the worker's statistics into the parent's totals
+            for item, item_counters in zip((self.cache, self.prefilter, self.counters), counters):
+                if item:
+                    item.add_counters(item_counters)
+            yield plugin_path, file_model, error
+
+    def extract_files(self, java_files, use_prefilter=True):
+        # Extracts and indexes every file once; failures are kept so they surface at the file's turn in path order
+        java_files = [plugin_path for plugin_path in java_files if plugin_path not in self.file_models]
+        if self.pool is None or not use_prefilter:
+            file_models = self.parse_files(self.read_files(java_files, use_prefilter))
+        else:
+            file_models = self.extract_in_pool(java_files)
+        for plugin_path, file_model, error in file_models:
+            self.add_file_model(plugin_path, file_model, error)
+
+    def extract_referenced_classes(self, java_files):
+        # Indexes the declarations of config classes and superclasses referenced from the files extracted so far,
+        # which are missing when only part of the tree is extracted or when the pre-filter skipped them
+        searched = set()
+        while True:
+            referenced = set()
+            for file_model, error in self.file_models.values():
+                if file_model is None:
+                    continue
+                if file_model.plugin is not None:
+                    referenced.update(file_model.plugin.field_types)
+                referenced.update(class_record.extends for class_record in file_model.classes if class_record.extends)
+            missing = referenced - set(self.class_index.classes) - searched - set([TERMINAL_SUPERCLASS])
+            if not missing:
+                break
+            searched.update(missing)
+            self.extract_declaring_files(java_files, missing)
+
+    def extract_constant_classes(self, java_files):
+        # Classes holding nothing but constants are skipped by the pre-filter, so the declarations of classes whose
+        # constants are referenced from other files are searched for by name
+        searched = set()
+        while True:
+            referenced = set()
+            for file_model, error in self.file_models.values():
+                if file_model is not None:
+                    referenced.update(file_model.unresolved_classes())
+            missing = referenced - set(self.class_index.constants) - searched
+            if not missing:
+                break
+            searched.update(missing)
+            self.extract_declaring_files(java_files, missing)
+
+    def extract_declaring_files(self, java_files, class_names):
+        # The files declaring referenced classes are extracted without the pre-filter, which would skip a superclass
+        # or a class of constants whose source never mentions a config class, including files it skipped before
+        unextracted = [plugin_path for plugin_path in java_files
+                       if self.file_models.get(plugin_path, (None, None)) == (None, None)]
+        declaring_files = files_mentioning(unextracted, class_names, declarations_only=True)
+        for plugin_path in declaring_files:
+            self.forget_file(plugin_path)
+        self.extract_files(declaring_files, use_prefilter=False)
+
+    def add_file_model(self, plugin_path, file_model, error):
+        self.file_models[plugin_path] = (file_model, error)
+        if file_model is not None:
+            self.class_index.add_file(plugin_path, file_model.classes, file_model.constants)
+
+    def forget_file(self, plugin_path):
+        self.file_models.pop(plugin_path, None)
+        self.class_index.remove_file(plugin_path)
+
+    def resolve_plugins(self, java_files):
+        # Yields the resolved plugins one at a time, so that merged config properties only exist while a plugin is
+        # being validated, as (path, plugin model, None), and the files whose extraction or resolution failed as
+        # (path, None, failure) so that they are quarantined at their turn
+        for plugin_path in java_files:
+            file_model, error = self.file_models[plugin_path]
+            if error is not None:
+                yield plugin_path, None, as_file_failure(error)
+                continue
+            start_time = clock()
+            try:
+                plugin_model = resolve_plugin(plugin_path, file_model, self.class_index, self.docs_index)
+            except Exception as e:
+                yield plugin_path, None, as_file_failure(e)
+                continue
+            if plugin_model is not None:
+                self.counters.record('pair', plugin_path, start_time)
+                yield plugin_path, plugin_model, None
+
+    def quarantine(self, plugin_path, failure):
+        self.quarantined.append((plugin_path, failure))
+
+    def max_findings_reached(self):
+        return bool(self.args.max_findings) and self.reporter.finding_count >= self.args.max_findings
+
+    def validate_plugins(self, java_files):
+        # Quarantined files are reported in path order along with the plugins. Strict mode stops the run at the
+        # first finding, --max-findings once the plugin or file at hand is reported.
+        jobs = self.resolve_plugins(java_files)
+        if self.pool is None:
+            for plugin_path, plugin_model, failure in jobs:
+                if failure is not None:
+                    self.quarantine(plugin_path, failure)
+                validate_or_quarantine(self.args, plugin_path, plugin_model, failure, self.reporter, self.counters)
+                if self.max_findings_reached():
+                    self.stopped = (java_files.index(plugin_path) + 1, len(java_files))
+                    break
+        else:
+            chunk_size = self.chunk_size(len(java_files))
+            issued = deque()
+            results = self.pool.imap(validate_in_worker, issue_jobs(jobs, issued), chunk_size)
+            for events, job_error, counters, samples in results:
+                plugin_path, failure = issued.popleft()
+                if failure is not None:
+                    self.quarantine(plugin_path, failure)
+                replay(events, self.reporter)
+                self.counters.add_counters(counters)
+                if self.profiler:
+                    self.profiler.add_samples(samples)
+                if job_error is not None:
+                    raise job_error
+                if self.max_findings_reached():
+                    # Queued and running jobs are dropped when the pool is stopped
+                    self.stopped = (java_files.index(plugin_path) + 1, len(java_files))
+                    break
+
+    def report_statistics(self):
+        self.reporter.note(self.discovery.summary())
+        if self.prefilter:
+            self.reporter.note(self.prefilter.summary())
+        if self.cache:
+            self.reporter.note(self.cache.summary())
+        if self.quarantined:
+            self.reporter.note(quarantine_summary(self.quarantined))
+        if self.stopped:
+            checked_files, file_count = self.stopped
+            self.reporter.note('Stopped at --max-findings ' + str(self.args.max_findings) + ' with ' +
+                               str(self.reporter.finding_count) + ' findings: ' + str(self.reporter.plugins) +
+                               ' plugins validated, ' + str(checked_files) + ' of ' + str(file_count) +
+                               ' Java files checked.')
+
+
+def find_changed_java_files(args, backend, cache, docs_index, budget, all_java_files):
+    # Changed Java files count only when the discovery of the run selected them, so that --include, --exclude,
+    # --main-only and pruning apply to them as they do to a full run
+    discovered = dict((os.path.normpath(plugin_path), plugin_path) for plugin_path in all_java_files)
+    java_files = set()
+    changed_markdown = {}
+    for changed_path in git_changed_files(args.path, args.since, args.staged):
+        if changed_path.endswith('.java'):
+            if os.path.normpath(changed_path) in discovered:
+                java_files.add(discovered[os.path.normpath(changed_path)])
+        elif changed_path.endswith('.md') and os.path.basename(os.path.dirname(changed_path)) == 'docs':
+            plugin = plugin_from_markdown_path(changed_path, PLUGIN_TYPES.values())
+            if plugin is not None:
+                markdown_path = os.path.normpath(changed_path)
+                changed_markdown.setdefault(documented_root(markdown_path), {})[markdown_path] = plugin
+
+    # Map changed markdown files back to the plugins documented by them: any discovered Java file under the directory
+    # holding docs/ may be one, whatever the layout of its sources
+    for root_path, markdown_plugins in changed_markdown.items():
+        plugin_names = set(name for name, plugin_type in markdown_plugins.values())
+        for normalized_path, plugin_path in sorted(discovered.items()):
+            class_filename = plugin_path[plugin_path.rfind('/') + 1:]
+            if not normalized_path.startswith(root_path) or plugin_path in java_files or \
+                    class_filename in IGNORED_FILES:
+                continue
+            # Only parse files that could carry one of the @Name values in question, or a name held by a constant
+            file_contents = read_file(plugin_path)
+            if not any(('"' + name + '"').encode('utf-8') in file_contents for name in plugin_names) and \
+                    not CONSTANT_NAME_ANNOTATION.search(file_contents):
+                continue
+            try:
+                file_model = budget.run(load_file_model, plugin_path, class_filename, backend, cache)
+            except FileFailure:
+                # It may be the plugin of the changed markdown file, so it is extracted and quarantined in the run
+                java_files.add(plugin_path)
+                continue
+            if file_model is None or file_model.plugin is None:
+                continue
+            plugin = file_model.plugin
+            if isinstance(plugin.name, tuple) or isinstance(plugin.type, tuple):
+                # Constants of other files are only resolved once the class index is built, so the plugin is
+                # validated in case it is the one documented
+                java_files.add(plugin_path)
+                continue
+            markdown_file_path = find_markdown_file(plugin_path, {'name': plugin.name, 'type': plugin.type}, docs_index)
+            if os.path.normpath(markdown_file_path) in markdown_plugins:
+                java_files.add(plugin_path)
+    return sorted(java_files)
+
+
+def files_mentioning(java_files, class_names, declarations_only=False):
+    # Text search for files declaring (or merely mentioning) any of the class names. Files that are not UTF-8 are
+    # searched all the same; parsing them is what quarantines them.
+    if not class_names:
+        return []
+    names = '|'.join(re.escape(class_name) for class_name in sorted(class_names))
+    pattern = re.compile((r'\b(?:class|interface|enum)\s+(?:' if declarations_only else r'\b(?:') + names + r')\b')
+    return [plugin_path for plugin_path in java_files
+            if pattern.search(read_file(plugin_path).decode('utf-8', 'replace'))]
+
+
+def run_incremental(run, all_java_files):
+    changed_files = find_changed_java_files(run.args, run.parser_backend(), run.cache, run.docs_index, run.budget,
+                                            all_java_files)
+    run.start_pool(len(changed_files))
+    run.extract_files(changed_files)
+
+    # Plugins whose config hierarchy or constants go through a changed class are affected as well
+    changed_classes = set()
+    for plugin_path in changed_files:
+        file_model, error = run.file_models[plugin_path]
+        if file_model is not None:
+            changed_classes.update(class_record.name for class_record in file_model.classes)
+        elif error is None:
+            # Skipped by the pre-filter, like classes holding nothing but constants: such a class is public to be
+            # used from other files, so it is named after its file
+            changed_classes.add(os.path.basename(plugin_path)[:-len('.java')])
+    run.extract_files(files_mentioning(all_java_files, changed_classes))
+
+    run.extract_referenced_classes(all_java_files)
+    run.extract_constant_classes(all_java_files)
+
+    changed_paths = set(changed_files)
+    affected = []
+    for plugin_path in sorted(run.file_models):
+        file_model, error = run.file_models[plugin_path]
+        # Failed files are quarantined by validate_plugins() when they changed themselves
+        if error is None:
+            try:
+                plugin_model = resolve_plugin(plugin_path, file_model, run.class_index, run.docs_index)
+            except Exception:
+                if plugin_path in changed_paths:
+                    affected.append(plugin_path)
+                continue
+            if plugin_model is None or (plugin_path not in changed_paths and
+                                        not changed_paths.intersection(plugin_model['config_files'])):
+                continue
+        elif plugin_path not in changed_paths:
+            continue
+        affected.append(plugin_path)
+    run.validate_plugins([plugin_path for plugin_path in affected if run.in_shard(plugin_path)])
 
 
 def run_validator(args):
-    for root_dir, sub_dirs, files in os.walk(args.path):
-        for filename in files:
-            if filename.endswith('.java'):
-                validate(args, root_dir + '/' + filename)
+    reporter = create_reporter(args.format, args.output, args.showdiff)
+    metrics = None
+    if args.metrics or args.metrics_json or args.max_findings:
+        reporter = CountingReporter(reporter)
+    if args.metrics or args.metrics_json:
+        metrics = RunMetrics(reporter)
+    try:
+        if args.profile_dump:
+            import cProfile
+            profile = cProfile.Profile()
+            try:
+                profile.runcall(run_with_reporter, args, reporter, metrics)
+            finally:
+                profile.dump_stats(args.profile_dump)
+        else:
+            run_with_reporter(args, reporter, metrics)
+        if metrics:
+            metrics.succeeded = True
+    except Exception as e:
+        reporter.run_failed(str(e))
+        raise
+    finally:
+        reporter.close()
+        # Failed runs write their metrics too, with run_success at 0
+        if metrics:
+            metrics.write(args.metrics, args.metrics_json)
+
+
+def run_with_reporter(args, reporter, metrics=None):
+    run = ValidatorRun(args, reporter)
+    if metrics:
+        metrics.run = run
+    if run.cache and args.prune_cache:
+        run_start = run.cache.mark_run_start()
+    java_files = run.discover(args.path)
+    if args.shard:
+        reporter.begin_shard(*args.shard)
+    try:
+        if args.since or args.staged:
+            run_incremental(run, java_files)
+        elif args.shard and not args.report_orphan_docs:
+            # Only the shard's files and the classes they reference are extracted
+            shard_files = [plugin_path for plugin_path in java_files if run.in_shard(plugin_path)]
+            reporter.note('Shard ' + str(args.shard[0]) + '/' + str(args.shard[1]) + ': validating ' +
+                          str(len(shard_files)) + ' of ' + str(len(java_files)) + ' Java files.')
+            run.start_pool(len(shard_files))
+            run.extract_files(shard_files)
+            run.extract_referenced_classes(java_files)
+            run.extract_constant_classes(java_files)
+            run.validate_plugins(shard_files)
+        else:
+            # Orphan docs are only known once every plugin is, so a shard reporting them extracts the whole tree
+            run.start_pool(len(java_files))
+            run.extract_files(java_files)
+            run.extract_referenced_classes(java_files)
+            run.extract_constant_classes(java_files)
+            run.validate_plugins([plugin_path for plugin_path in java_files if run.in_shard(plugin_path)])
+            if args.report_orphan_docs and not args.include and not run.stopped:
+                report_orphan_docs(args, reporter, run.docs_index, run.class_index, run.file_models, run.in_shard)
+    finally:
+        run.stop_pool()
+
+    run.report_statistics()
+    if run.cache and args.prune_cache:
+        reporter.note('Pruned ' + str(run.cache.prune(run_start)) + ' unused cache entries.')
+    if run.profiler:
+        reporter.note(run.counters.summary())
+        reporter.note(run.profiler.summary(args.profile_top))
+    # Fails the run like --strict does, once its summary is written
+    if run.max_findings_reached():
+        raise Exception(max_findings_error(reporter.finding_count, args.max_findings))
 
 
 def main():
     args = setup_args()
-    run_validator(args)
+    if args.serve:
+        from validation_daemon import serve
+        serve(args)
+    else:
+        run_validator(args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import errno
+import json
+import os
+import select
+import socket
+import time
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from file_budget import as_file_failure
+from reporters import REPORT_FORMATS, CountingReporter, RecordingReporter, create_reporter, replay
+from validate_plugin_docs import ValidatorRun, max_findings_error, report_quarantined, resolve_plugin, validate_plugin
+
+MAX_REQUEST_SIZE = 64 * 1024
+
+
+def file_stamp(file_path):
+    # Modification time and size identify a version of a file without reading it
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime, stat.st_size
+
+
+class ValidationDaemon(object):
+    # Keeps the file models, class index and per plugin results of a repository in memory. The tree is polled for
+    # changed mtimes; only changed Java files are parsed again and only plugins whose Java, config or markdown files
+    # changed are validated again.
+
+    def __init__(self, args):
+        self.args = args
+        self.run = ValidatorRun(args, None)
+        self.stamps = {}
+        self.results = {}
+        self.refreshes = 0
+        self.reparsed = 0
+
+    def refresh(self):
+        # Returns the number of Java files that were added, changed or removed since the last refresh
+        java_files = self.run.discover(self.args.path)
+        stamps = dict((plugin_path, file_stamp(plugin_path)) for plugin_path in java_files)
+        changed = [plugin_path for plugin_path in java_files if self.stamps.get(plugin_path) != stamps[plugin_path]]
+        removed = [plugin_path for plugin_path in self.stamps if plugin_path not in stamps]
+        for plugin_path in changed + removed:
+            self.run.forget_file(plugin_path)
+        if changed:
+            self.run.start_pool(len(changed))
+            try:
+                self.run.extract_files(changed)
+                self.run.extract_constant_classes(java_files)
+            finally:
+                self.run.stop_pool()
+        self.stamps = stamps
+        self.refreshes += 1
+        self.reparsed += len(changed)
+        return len(changed) + len(removed)
+
+    def plugin_events(self, plugin_path, plugin_model, strict):
+        # Returns the recorded events and error of one plugin, validating it again only if one of its files changed
+        stamp = (tuple(self.stamps.get(file_path) for file_path in [plugin_path] + plugin_model['config_files']),
+                 file_stamp(plugin_model['markdown_path']))
+        key = (plugin_path, strict)
+        cached = self.results.get(key)
+        if cached is not None and cached[0] == stamp and cached[1] == plugin_model:
+            return cached[2], cached[3], True
+
+        reporter = RecordingReporter()
+        self.args.strict = strict
+        try:
+            validate_plugin(self.args, plugin_path, plugin_model, reporter)
+            error = None
+        except Exception as e:
+            error = str(e)
+        self.results[key] = (stamp, plugin_model, reporter.take_events(), error)
+        return self.results[key][2], error, False
+
+    def validate(self, request):
+        start_time = time.time()
+        changed = self.refresh()
+        report_format = request.get('format', 'text')
+        if report_format not in REPORT_FORMATS:
+            return {'error': 'Unknown format "' + str(report_format) + '".'}
+        output = StringIO()
+        notes = StringIO()
+        reporter = create_reporter(report_format, None, request.get('showdiff', False), output)
+        reporter.note_output = notes
+        reporter = CountingReporter(reporter)
+        max_findings = request.get('max_findings') or 0
+
+        plugins = 0
+        reused = 0
+        error = None
+        stopped = None
+        self.args.strict = bool(request.get('strict'))
+        plugin_paths = sorted(self.run.file_models)
+        for checked_files, plugin_path in enumerate(plugin_paths, 1):
+            if max_findings and reporter.finding_count >= max_findings:
+                stopped = checked_files - 1
+                break
+            file_model, failure = self.run.file_models[plugin_path]
+            if failure is None:
+                try:
+                    plugin_model = resolve_plugin(plugin_path, file_model, self.run.class_index, self.run.docs_index)
+                except Exception as e:
+                    failure = e
+            if failure is not None:
+                # Quarantined like in a command line run; only strict mode stops at it
+                try:
+                    report_quarantined(self.args, reporter, plugin_path, as_file_failure(failure))
+                except Exception as e:
+                    error = str(e)
+                    break
+                continue
+            if plugin_model is None:
+                continue
+            events, error, cached = self.plugin_events(plugin_path, plugin_model, bool(request.get('strict')))
+            replay(events, reporter)
+            plugins += 1
+            reused += 1 if cached else 0
+            if error is not None:
+                break
+
+        # Drop results of plugins that no longer exist
+        for key in [key for key in self.results if key[0] not in self.run.file_models]:
+            del self.results[key]
+
+        reporter.note('Daemon: ' + str(len(self.stamps)) + ' Java files indexed, ' + str(changed) +
+                      ' changed since the last poll, ' + str(reused) + ' of ' + str(plugins) +
+                      ' plugin results reused in ' + '%.3f' % (time.time() - start_time) + 's.')
+        if stopped is not None:
+            reporter.note('Stopped at --max-findings ' + str(max_findings) + ' with ' + str(reporter.finding_count) +
+                          ' findings: ' + str(plugins) + ' plugins validated, ' + str(stopped) + ' of ' +
+                          str(len(plugin_paths)) + ' Java files checked.')
+        if error is None and max_findings and reporter.finding_count >= max_findings:
+            error = max_findings_error(reporter.finding_count, max_findings)
+        reporter.close()
+        return {'output': output.getvalue(), 'notes': notes.getvalue(), 'error': error}
+
+    def status(self):
+        return {'path': self.args.path, 'java_files': len(self.stamps),
+                'indexed_classes': len(self.run.class_index.classes), 'cached_results': len(self.results),
+                'refreshes': self.refreshes, 'reparsed': self.reparsed}
+
+    def handle(self, request):
+        command = request.get('command')
+        if command == 'validate':
+            return self.validate(request)
+        elif command == 'status':
+            return self.status()
+        elif command == 'shutdown':
+            return {'stopping': True}
+        return {'error': 'Unknown command "' + str(command) + '".'}
+
+
+def read_message(connection):
+    # Messages are single JSON documents terminated by a newline
+    chunks = []
+    received = 0
+    while True:
+        chunk = connection.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        received += len(chunk)
+        if chunk.endswith(b'\n') or received > MAX_REQUEST_SIZE:
+            break
+    return json.loads(b''.join(chunks).decode('utf-8'))
+
+
+def write_message(connection, message):
+    connection.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+
+def bind_socket(socket_path):
+    # A socket file left behind by a daemon that is no longer running is replaced
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+            raise Exception('A daemon is already listening on "' + socket_path + '".')
+        except socket.error as e:
+            if e.errno not in (errno.ECONNREFUSED, errno.ENOENT):
+                raise
+            os.remove(socket_path)
+        finally:
+            probe.close()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(16)
+    return server
+
+
+def serve(args):
+    if args.since or args.staged or args.shard or args.metrics or args.metrics_json:
+        raise Exception('--serve validates the whole tree and cannot be combined with --since, --staged, --shard or ' +
+                        '--metrics.')
+    if args.max_findings:
+        raise Exception('--max-findings is set per request with plugin_docs_client.py --max-findings.')
+    daemon = ValidationDaemon(args)
+    daemon.refresh()
+    server = bind_socket(args.serve)
+    print('Serving ' + str(len(daemon.stamps)) + ' Java files from "' + args.path + '" on "' + args.serve + '".')
+    try:
+        running = True
+        while running:
+            # Poll the tree while idle so that requests find the index up to date
+            readable = select.select([server], [], [], args.poll_interval)[0]
+            if not readable:
+                daemon.refresh()
+                continue
+            connection = server.accept()[0]
+            try:
+                request = read_message(connection)
+                response = daemon.handle(request)
+                running = not response.get('stopping')
+                write_message(connection, response)
+            except (ValueError, socket.error) as e:
+                try:
+                    write_message(connection, {'error': 'Bad request: ' + str(e)})
+                except socket.error:
+                    pass
+            finally:
+                connection.close()
+    finally:
+        server.close()
+        os.remove(args.serve)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'javalang'))
+
+from validate_plugin_docs import run_validator, setup_args
+
+# A module with its docs/ directory right below the module directory
+FIXTURE_FILES = {
+    'plugins/src/main/java/co/cask/hydrator/plugin/TableSink.java': '''package co.cask.hydrator.plugin;
+
+@Plugin(type = "batchsink")
+@Name("Table")
+@Description("Writes records to a table.")
+public class TableSink extends BatchSink {
+  private final TableSinkConfig config;
+
+  public static class TableSinkConfig extends PluginConfig {
+    @Name("name")
+    @Description("Name of the table.")
+    private String name;
+  }
+}
+''',
+    'plugins/docs/Table-batchsink.md': '''# Table Batch Sink
+
+Properties
+----------
+**name:** Name of the table.
+
+Example
+-------
+Writes to a table.
+''',
+}
+
+
+class ChangedDocsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='plugin-parser-changed-')
+        for relative_path, contents in FIXTURE_FILES.items():
+            file_path = os.path.join(self.root, relative_path)
+            if not os.path.isdir(os.path.dirname(file_path)):
+                os.makedirs(os.path.dirname(file_path))
+            with open(file_path, 'w') as fixture_file:
+                fixture_file.write(contents)
+        self.git('init', '-q')
+        self.git('add', '.')
+        self.git('-c', 'user.name=test', '-c', 'user.email=test@example.com', 'commit', '-q', '-m', 'Fixture')
+        # Documents a property the config class does not have
+        markdown_path = os.path.join(self.root, 'plugins/docs/Table-batchsink.md')
+        with open(markdown_path) as markdown_file:
+            contents = markdown_file.read()
+        with open(markdown_path, 'w') as markdown_file:
+            markdown_file.write(contents.replace('\nExample', '\n**format:** Format of the records.\n\nExample'))
+        self.working_directory = os.getcwd()
+
+    def tearDown(self):
+        os.chdir(self.working_directory)
+        shutil.rmtree(self.root)
+
+    def git(self, *git_args):
+        subprocess.check_call(['git'] + list(git_args), cwd=self.root)
+
+    def findings(self, path, *extra_args):
+        output_path = os.path.join(self.root, 'findings.jsonl')
+        run_validator(setup_args(['--path', path, '--format', 'jsonl', '--output', output_path] + list(extra_args)))
+        with open(output_path) as output_file:
+            findings = [json.loads(line) for line in output_file]
+        os.remove(output_path)
+        return findings
+
+    def assert_validates_changed_docs(self, path, *extra_args):
+        findings = self.findings(path, *extra_args)
+        self.assertEqual(['property-not-in-config'], [finding['rule'] for finding in findings])
+        self.assertEqual('format', findings[0]['property'])
+
+    def test_since_from_parent_directory(self):
+        os.chdir(self.root)
+        self.assert_validates_changed_docs('plugins', '--since', 'HEAD')
+
+    def test_since_from_module_directory(self):
+        os.chdir(os.path.join(self.root, 'plugins'))
+        self.assert_validates_changed_docs('.', '--since', 'HEAD')
+
+    def test_staged_from_module_directory(self):
+        self.git('add', '.')
+        os.chdir(os.path.join(self.root, 'plugins'))
+        self.assert_validates_changed_docs('.', '--staged')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'javalang'))
+
+from description_text import DescriptionNormalizer, render_text
+
+# Descriptions that must go through markdown() + BeautifulSoup, and ones the normaliser strips without rendering
+RENDERED_DESCRIPTIONS = [
+    ' Columns to read:\n\n- name\n- age\n- address',
+    '- name\n- age',
+    ' Steps:\n\n1. Read the file.\n2. Write the table.',
+    ' # Heading\nThe name of the table.',
+    ' Heading\n-------\nThe name of the table.',
+    ' The name of the table.  \nDefaults to the plugin name.',
+    ' The *name* of the `table`, see [docs](http://example.com).',
+    ' A & B <b>bold</b> \\*escaped\\*',
+    ' > quoted name',
+]
+PLAIN_DESCRIPTIONS = [
+    ' The name of the table.',
+    ' The name of the table\nwritten to by the sink.\n',
+    'Comma-separated list of fields, e.g. a,b,c (optional).',
+    # Without a blank line before it, markdown keeps a list in the paragraph
+    ' Columns to read:\n- name\n- age',
+]
+
+
+class DescriptionNormalizerTest(unittest.TestCase):
+
+    def assert_parity(self, normalizer, description):
+        self.assertEqual(normalizer.normalize(description), render_text(description), repr(description))
+
+    def test_rendered_descriptions_match_markdown(self):
+        normalizer = DescriptionNormalizer()
+        for description in RENDERED_DESCRIPTIONS:
+            self.assert_parity(normalizer, description)
+        self.assertEqual(normalizer.rendered, len(RENDERED_DESCRIPTIONS))
+        self.assertEqual(normalizer.stripped, 0)
+
+    def test_plain_paragraphs_skip_rendering(self):
+        normalizer = DescriptionNormalizer()
+        for description in PLAIN_DESCRIPTIONS:
+            self.assert_parity(normalizer, description)
+        self.assertEqual(normalizer.stripped, len(PLAIN_DESCRIPTIONS))
+        self.assertEqual(normalizer.rendered, 0)
+
+    def test_memoised_results_match(self):
+        normalizer = DescriptionNormalizer()
+        for description in RENDERED_DESCRIPTIONS + PLAIN_DESCRIPTIONS:
+            self.assert_parity(normalizer, description)
+            self.assert_parity(normalizer, description)
+        self.assertEqual(normalizer.rendered + normalizer.stripped,
+                         len(RENDERED_DESCRIPTIONS) + len(PLAIN_DESCRIPTIONS))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'javalang'))
+
+from pipeline import read_ahead
+
+
+class ReadAheadTest(unittest.TestCase):
+
+    def wait_for_threads(self, thread_count):
+        deadline = time.time() + 5
+        while threading.active_count() > thread_count and time.time() < deadline:
+            time.sleep(0.01)
+        return threading.active_count()
+
+    def test_reads_in_order(self):
+        paths = ['file' + str(index) for index in range(50)]
+        reads = [(path, result) for path, result, error, seconds in read_ahead(paths, lambda path: path.upper(), 3, 2)]
+        self.assertEqual([(path, path.upper()) for path in paths], reads)
+
+    def test_threads_exit_when_consumer_stops_early(self):
+        thread_count = threading.active_count()
+        for attempt in range(20):
+            reads = read_ahead(['file' + str(index) for index in range(10)], lambda path: path, 2, 1)
+            next(reads)
+            # Like a strict failure or the --max-findings cutoff, which stop consuming mid-run
+            reads.close()
+        self.assertEqual(thread_count, self.wait_for_threads(thread_count))
+
+
+if __name__ == "__main__":
+    unittest.main()
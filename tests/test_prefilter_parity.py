@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#  Copyright © 2016 Cask Data, Inc.
+#
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'javalang'))
+
+from prefilter import scan_file
+from validate_plugin_docs import run_validator, setup_args
+
+PACKAGE_DIR = 'plugins/src/main/java/co/cask/hydrator/plugin/'
+
+# A small tree with everything the pre-filter has to get right: plugins with nested configs and configs declared in
+# other files, constants held by a class that is skipped, a config hierarchy whose intermediate classes are skipped,
+# and classes that are no plugins at all
+FIXTURE_FILES = {
+    PACKAGE_DIR + 'TableSink.java': '''package co.cask.hydrator.plugin;
+
+@Plugin(type = BatchSink.PLUGIN_TYPE)
+@Name("Table")
+@Description("Writes records to a table.")
+public class TableSink extends BatchSink {
+  private final TableSinkConfig config;
+
+  public static class TableSinkConfig extends PluginConfig {
+    @Name("name")
+    @Description("Name of the table.")
+    private String name;
+
+    @Name("schema")
+    @Description(Descriptions.SCHEMA)
+    private String schema;
+
+    @Name("rowField")
+    @Description("Field used as the row key.")
+    private String rowField;
+  }
+}
+''',
+    PACKAGE_DIR + 'FileSource.java': '''package co.cask.hydrator.plugin;
+
+@Plugin(type = "batchsource")
+@Name("File")
+@Description("Reads files.")
+public class FileSource extends BatchSource {
+  private final FileSourceConfig config;
+}
+''',
+    PACKAGE_DIR + 'FileSourceConfig.java': '''package co.cask.hydrator.plugin;
+
+public class FileSourceConfig extends PluginConfig {
+  @Name("path")
+  @Description("Path to read from, " + Descriptions.DEFAULTS)
+  private String path;
+
+  @Name("pattern")
+  @Description("Regular expression files must match.")
+  private String pattern;
+}
+''',
+    PACKAGE_DIR + 'Descriptions.java': '''package co.cask.hydrator.plugin;
+
+public final class Descriptions {
+  public static final String SCHEMA = "Schema of the records.";
+  public static final String DEFAULTS = "defaults to the working directory.";
+}
+''',
+    PACKAGE_DIR + 'RunAction.java': '''package co.cask.hydrator.plugin;
+
+@Plugin(type = "action")
+@Name("Run")
+@Description("Runs a command.")
+public class RunAction extends Action {
+  public static class RunActionConfig extends PluginConfig {
+    @Name("command")
+    @Description("Command to run.")
+    private String command;
+  }
+}
+''',
+    PACKAGE_DIR + 'RecordUtils.java': '''package co.cask.hydrator.plugin;
+
+public final class RecordUtils {
+  public static String key(String value) {
+    return value.trim();
+  }
+}
+''',
+    PACKAGE_DIR + 'FooSink.java': '''package co.cask.hydrator.plugin;
+
+@Plugin(type = "batchsink")
+@Name("Foo")
+@Description("Writes foo records.")
+public class FooSink extends BatchSink {
+  private final FooConfig config;
+}
+''',
+    PACKAGE_DIR + 'FooConfig.java': '''package co.cask.hydrator.plugin;
+
+public class FooConfig extends Middle {
+  @Name("foo")
+  @Description("Foo to write.")
+  private String foo;
+}
+''',
+    PACKAGE_DIR + 'Middle.java': '''package co.cask.hydrator.plugin;
+
+public abstract class Middle extends Base {
+  @Name("middle")
+  @Description("Middle of the hierarchy.")
+  private String middle;
+}
+''',
+    PACKAGE_DIR + 'Base.java': '''package co.cask.hydrator.plugin;
+
+public abstract class Base extends PluginConfig {
+  @Name("base")
+  @Description("Base of the hierarchy.")
+  private String base;
+}
+''',
+    'plugins/src/test/java/co/cask/hydrator/plugin/TableSinkTest.java': '''package co.cask.hydrator.plugin;
+
+public class TableSinkTest {
+  public void testWrite() {
+  }
+}
+''',
+    'plugins/docs/Table-batchsink.md': '''# Table Batch Sink
+
+Properties
+----------
+**name:** Name of the table to write to.
+
+**schema:** Schema of records.
+
+Example
+-------
+Writes to a table.
+''',
+    'plugins/docs/Foo-batchsink.md': '''# Foo Batch Sink
+
+Properties
+----------
+**foo:** Foo to write.
+
+Example
+-------
+Writes foo records.
+''',
+    'plugins/docs/File-batchsource.md': '''# File Batch Source
+
+Properties
+----------
+**path:** Path to read from, defaults to the working directory.
+
+**pattern:** Regular expression that files must match.
+
+**recursive:** Whether to read directories recursively.
+
+Example
+-------
+Reads files.
+''',
+}
+
+
+class PreFilterParityTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='plugin-parser-prefilter-')
+        for relative_path, contents in FIXTURE_FILES.items():
+            file_path = os.path.join(self.root, relative_path)
+            if not os.path.isdir(os.path.dirname(file_path)):
+                os.makedirs(os.path.dirname(file_path))
+            with open(file_path, 'w') as fixture_file:
+                fixture_file.write(contents)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def findings(self, *extra_args):
+        output_path = os.path.join(self.root, 'findings.jsonl')
+        run_validator(setup_args(['--path', self.root, '--format', 'jsonl', '--output', output_path,
+                                  '--read-threads', '0'] + list(extra_args)))
+        with open(output_path) as output_file:
+            findings = [json.loads(line) for line in output_file]
+        os.remove(output_path)
+        return findings
+
+    def test_fixture_exercises_the_pre_filter(self):
+        for class_name in ['Descriptions', 'RecordUtils', 'Middle']:
+            self.assertFalse(scan_file(os.path.join(self.root, PACKAGE_DIR + class_name + '.java'))[0])
+        for class_name in ['TableSink', 'FileSource', 'FileSourceConfig', 'RunAction', 'Base']:
+            self.assertTrue(scan_file(os.path.join(self.root, PACKAGE_DIR + class_name + '.java'))[0])
+
+    def test_findings_match_without_pre_filter(self):
+        findings = self.findings()
+        self.assertEqual(findings, self.findings('--no-prefilter'))
+        rules = set(finding['rule'] for finding in findings)
+        self.assertTrue(set(['description-mismatch', 'property-not-documented', 'property-not-in-config',
+                             'markdown-file-missing']) <= rules, rules)
+        # The constants of the skipped class are resolved in both runs
+        descriptions = [finding['details']['plugin_description'] for finding in findings if 'details' in finding]
+        self.assertIn('Schema of the records.', descriptions)
+        self.assertFalse([description for description in descriptions if 'Descriptions.' in description])
+
+    def test_inherited_properties_of_skipped_superclasses(self):
+        # FooConfig extends Middle extends Base, and the pre-filter skips Middle
+        findings = self.findings()
+        self.assertEqual(findings, self.findings('--no-prefilter'))
+        undocumented = set(finding['property'] for finding in findings
+                           if finding['rule'] == 'property-not-documented' and finding['plugin'] == 'Foo')
+        self.assertEqual(set(['middle', 'base']), undocumented)
+
+
+if __name__ == "__main__":
+    unittest.main()